@@ -0,0 +1,86 @@
+import time
+from hashlib import md5
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from core.metrics import CACHE_REQUESTS
+
+RECIPES_GENERATION_KEY = 'recipes:list:generation'
+RECIPES_HITS_KEY = 'recipes:list:hits'
+RECIPES_MISSES_KEY = 'recipes:list:misses'
+
+
+def _incr(key):
+    try:
+        return cache.incr(key)
+    except ValueError:
+        cache.add(key, 0, None)
+        return cache.incr(key)
+
+
+def get_recipes_generation():
+    """
+    Текущее поколение списка рецептов. Начальное значение берется
+    из времени, чтобы после вытеснения ключа не повторить старое поколение.
+    """
+    return cache.get_or_set(RECIPES_GENERATION_KEY, time.time_ns(), None)
+
+
+def bump_recipes_generation():
+    """
+    Делает недействительными все закэшированные страницы списка рецептов.
+    Поколение меняется после фиксации транзакции, чтобы параллельный
+    запрос не закэшировал под новым поколением старые данные.
+    """
+    def bump():
+        try:
+            cache.incr(RECIPES_GENERATION_KEY)
+        except ValueError:
+            get_recipes_generation()
+    transaction.on_commit(bump)
+
+
+def recipes_list_cache_key(request):
+    """Ключ страницы списка по нормализованным параметрам запроса."""
+    params = urlencode(sorted(
+        (name, value)
+        for name, values in request.query_params.lists()
+        for value in values
+    ))
+    digest = md5(f'{request.get_host()}?{params}'.encode()).hexdigest()
+    return f'recipes:list:{get_recipes_generation()}:{digest}'
+
+
+def get_cached_recipes_list(key):
+    """
+    Закэшированные данные страницы списка рецептов или None.
+    Ключ вычисляется один раз на запрос и передается и сюда,
+    и в cache_recipes_list: страница, собранная до смены поколения,
+    сохраняется под старым поколением и больше не читается.
+    """
+    data = cache.get(key)
+    _incr(RECIPES_MISSES_KEY if data is None else RECIPES_HITS_KEY)
+    CACHE_REQUESTS.labels(
+        'recipes_list', 'miss' if data is None else 'hit'
+    ).inc()
+    return data
+
+
+def cache_recipes_list(key, data):
+    cache.set(
+        key,
+        data,
+        settings.RECIPES_LIST_CACHE_TIMEOUT
+    )
+
+
+def recipes_list_cache_stats():
+    """Счетчики попаданий и промахов кэша списка рецептов."""
+    stats = cache.get_many((RECIPES_HITS_KEY, RECIPES_MISSES_KEY))
+    return {
+        'hits': stats.get(RECIPES_HITS_KEY, 0),
+        'misses': stats.get(RECIPES_MISSES_KEY, 0),
+    }
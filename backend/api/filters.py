@@ -1,30 +1,86 @@
+from django.contrib.postgres.search import (SearchHeadline, SearchQuery,
+                                            SearchRank)
+from django.db import connection
+from django import forms
+from django.db.models import (Case, CharField, Count, Exists, F, FloatField,
+                              IntegerField, OuterRef, Q, Value, When)
+from django.db.models.functions import Replace
 from django_filters import rest_framework as filters
 
-from recipes.models import Ingredient, Recipe, Tag
+from api.search import ingredient_name_index, recipe_text_index, tag_slug_map
+
+from recipes.constants import (RECIPE_SEARCH_CONFIGS,
+                               RECIPE_SEARCH_HEADLINE_WORDS,
+                               RECIPE_SEARCH_HIGHLIGHT, TAGS_MODE_ALL,
+                               TAGS_MODE_ANY)
+from recipes.models import Favorite, Ingredient, Recipe, ShoppingCart
+
+HTML_ESCAPES = (('&', '&amp;'), ('<', '&lt;'), ('>', '&gt;'))
+
+USER_RECIPE_LISTS = {
+    'is_favorited': Favorite,
+    'is_in_shopping_cart': ShoppingCart,
+}
 
 
 class IngredientFilter(filters.FilterSet):
     """
     Регистронезависимая фильтрация объектов модели Ingredient
-    по наименованию ингредиента.
+    по наименованию ингредиента для автодополнения.
     """
 
-    name = filters.CharFilter(field_name='name', lookup_expr='icontains')
+    name = filters.CharFilter(method='filter_name')
 
     class Meta:
         model = Ingredient
         fields = ('name',)
 
+    def filter_name(self, queryset, name, value):
+        """
+        Сначала ингредиенты, название которых начинается с value,
+        затем содержащие value; внутри групп - по частоте использования.
+        """
+        matches = Q(name__icontains=value)
+        prefix_matches = Q(name__istartswith=value)
+        if connection.vendor != 'postgresql':
+            prefix_ids, substring_ids = ingredient_name_index.search(value)
+            matches = Q(id__in=substring_ids)
+            prefix_matches = Q(id__in=prefix_ids)
+        return queryset.filter(matches).annotate(
+            match_rank=Case(
+                When(prefix_matches, then=Value(0)),
+                default=Value(1),
+                output_field=IntegerField()
+            )
+        ).order_by('match_rank', '-usage_count', 'name')
+
+
+class AnyValueMultipleChoiceField(forms.MultipleChoiceField):
+    """Поле со списком значений без сверки со списком вариантов."""
+
+    def valid_value(self, value):
+        return True
+
+
+class AnyValueMultipleChoiceFilter(filters.MultipleChoiceFilter):
+    """Фильтр по нескольким значениям без запроса вариантов к БД."""
+
+    field_class = AnyValueMultipleChoiceField
+
 
 class RecipeFilter(filters.FilterSet):
     """Фильтрация объектов модели Recipe по различным критериям."""
 
-    tags = filters.ModelMultipleChoiceFilter(
-        field_name='tags__slug',
-        to_field_name='slug',
-        queryset=Tag.objects.all(),
+    tags = AnyValueMultipleChoiceFilter(method='filter_tags')
+    tags_mode = filters.ChoiceFilter(
+        choices=(
+            (TAGS_MODE_ANY, 'Любой из тегов'),
+            (TAGS_MODE_ALL, 'Все теги'),
+        ),
+        method='filter_tags_mode'
     )
     author = filters.CharFilter(field_name='author')
+    search = filters.CharFilter(method='filter_search')
     is_favorited = filters.BooleanFilter(method='filter_favorites_or_cart')
     is_in_shopping_cart = filters.BooleanFilter(
         method='filter_favorites_or_cart'
@@ -35,18 +91,112 @@ class RecipeFilter(filters.FilterSet):
         fields = (
             'tags',
             'is_favorited',
-            'is_in_shopping_cart'
+            'is_in_shopping_cart',
+            'search'
         )
 
+    def filter_tags(self, queryset, name, value):
+        """
+        Фильтрация по slug тегов без JOIN и дублей рецептов:
+        в режиме any - EXISTS по связям с любым из тегов,
+        в режиме all - рецепты, у которых число найденных тегов
+        (GROUP BY ... HAVING) равно числу запрошенных.
+        """
+        slugs = set(value)
+        tag_ids = tag_slug_map.get_ids(slugs)
+        tags_through = Recipe.tags.through.objects.filter(
+            tag_id__in=tag_ids.values()
+        )
+        if self.form.cleaned_data.get('tags_mode') == TAGS_MODE_ALL:
+            if len(tag_ids) < len(slugs):
+                return queryset.none()
+            return queryset.filter(id__in=tags_through.values(
+                'recipe_id'
+            ).annotate(
+                tags_count=Count('tag_id')
+            ).filter(
+                tags_count=len(tag_ids)
+            ).values('recipe_id'))
+        return queryset.filter(
+            Exists(tags_through.filter(recipe_id=OuterRef('pk')))
+        )
+
+    def filter_tags_mode(self, queryset, name, value):
+        """Режим применяется в filter_tags."""
+        return queryset
+
+    def filter_search(self, queryset, name, value):
+        """
+        Полнотекстовый поиск по названию и описанию рецепта:
+        результаты упорядочены по релевантности и снабжены
+        фрагментом описания с выделенными словами запроса.
+        """
+        if not value.strip():
+            return queryset
+        if connection.vendor != 'postgresql':
+            return self._filter_search_in_memory(queryset, value)
+        query = None
+        for config in RECIPE_SEARCH_CONFIGS:
+            config_query = SearchQuery(
+                value, config=config, search_type='websearch'
+            )
+            query = config_query if query is None else query | config_query
+        text = F('text')
+        for char, entity in HTML_ESCAPES:
+            text = Replace(text, Value(char), Value(entity))
+        min_words, max_words = RECIPE_SEARCH_HEADLINE_WORDS
+        start_sel, stop_sel = RECIPE_SEARCH_HIGHLIGHT
+        return queryset.filter(search_vector=query).annotate(
+            search_rank=SearchRank(F('search_vector'), query),
+            search_headline=SearchHeadline(
+                text, query,
+                config=RECIPE_SEARCH_CONFIGS[0],
+                start_sel=start_sel,
+                stop_sel=stop_sel,
+                min_words=min_words,
+                max_words=max_words
+            )
+        ).order_by('-search_rank', '-pub_date', '-id')
+
+    def _filter_search_in_memory(self, queryset, value):
+        """Поиск через индекс в памяти процесса (SQLite)."""
+        ranks = recipe_text_index.search(value)
+        return queryset.filter(id__in=ranks).annotate(
+            search_rank=Case(
+                *(
+                    When(id=recipe_id, then=Value(rank))
+                    for recipe_id, rank in ranks.items()
+                ),
+                default=Value(0.0),
+                output_field=FloatField()
+            ),
+            search_headline=Case(
+                *(
+                    When(
+                        id=recipe_id,
+                        then=Value(recipe_text_index.headline(
+                            recipe_id, value
+                        ))
+                    )
+                    for recipe_id in ranks
+                ),
+                default=Value(''),
+                output_field=CharField()
+            )
+        ).order_by('-search_rank', '-pub_date', '-id')
+
     def filter_favorites_or_cart(self, queryset, name, value):
         """
         Общий метод для фильтрации
         по нахождению в избранном или в списке покупок.
+        Условие EXISTS строится здесь, поэтому фильтр не зависит
+        от аннотаций queryset.
         """
         user = self.request.user
         if value and user.is_authenticated:
-            if name == 'is_favorited':
-                return queryset.filter(favorite__user=user)
-            if name == 'is_in_shopping_cart':
-                return queryset.filter(shoppingcart__user=user)
+            return queryset.filter(Exists(
+                USER_RECIPE_LISTS[name].objects.filter(
+                    user_id=user.pk, recipe=OuterRef('pk')
+                )
+            ))
         return queryset
@@ -0,0 +1,179 @@
+import re
+from bisect import bisect_left
+from collections import defaultdict
+from html import escape
+from time import monotonic
+
+from django.db.models import Count, Max
+
+from recipes.constants import (RECIPE_SEARCH_HEADLINE_WORDS,
+                               RECIPE_SEARCH_HIGHLIGHT,
+                               RECIPE_SEARCH_NAME_WEIGHT,
+                               RECIPE_SEARCH_TEXT_WEIGHT,
+                               TAG_SLUGS_CACHE_TIMEOUT,
+                               TAG_SLUGS_MISS_REFRESH_INTERVAL)
+from recipes.models import Ingredient, Recipe, Tag
+
+WORD_RE = re.compile(r'\w+')
+
+
+class IngredientNameIndex:
+    """
+    Поиск ингредиентов по названию в памяти процесса.
+    Используется вместо индексов pg_trgm на СУБД, где LIKE
+    не умеет регистронезависимо сравнивать кириллицу (SQLite).
+    """
+
+    def __init__(self):
+        self.version = None
+        self.names = []
+        self.ids = []
+
+    def _refresh(self):
+        version = Ingredient.objects.aggregate(Count('id'), Max('id'))
+        if version == self.version:
+            return
+        rows = sorted(
+            (name.casefold(), ingredient_id) for ingredient_id, name
+            in Ingredient.objects.values_list('id', 'name').iterator()
+        )
+        self.names = [name for name, _ in rows]
+        self.ids = [ingredient_id for _, ingredient_id in rows]
+        self.version = version
+
+    def search(self, value):
+        """
+        Возвращает id ингредиентов, название которых начинается с value,
+        и id ингредиентов, название которых содержит value.
+        """
+        self._refresh()
+        value = value.casefold()
+        start = position = bisect_left(self.names, value)
+        while (position < len(self.names)
+               and self.names[position].startswith(value)):
+            position += 1
+        prefix_ids = self.ids[start:position]
+        substring_ids = [
+            ingredient_id
+            for name, ingredient_id in zip(self.names, self.ids)
+            if value in name
+        ]
+        return prefix_ids, substring_ids
+
+
+class RecipeTextIndex:
+    """
+    Полнотекстовый поиск рецептов в памяти процесса для СУБД
+    без tsvector (SQLite). Повторяет поведение поиска в Postgres
+    приближенно: слова запроса ищутся по началу слов рецепта
+    с отброшенным окончанием, все слова должны найтись.
+    """
+
+    def __init__(self):
+        self.version = None
+        self.words = {}
+        self.texts = {}
+
+    @staticmethod
+    def _tokens(text):
+        return WORD_RE.findall(text.casefold())
+
+    @staticmethod
+    def _stem(word):
+        """Грубое отбрасывание окончания вместо морфологии."""
+        return word[:-1] if len(word) > 4 and word[-1] in 'аяоеыиуюйь' \
+            else word
+
+    def _refresh(self):
+        version = Recipe.objects.aggregate(
+            Count('id'), Max('id'), Max('updated_at')
+        )
+        if version == self.version:
+            return
+        words = defaultdict(dict)
+        texts = {}
+        for recipe_id, name, text in Recipe.objects.values_list(
+                'id', 'name', 'text'
+        ).iterator():
+            texts[recipe_id] = text
+            for weight, value in (
+                (RECIPE_SEARCH_NAME_WEIGHT, name),
+                (RECIPE_SEARCH_TEXT_WEIGHT, text),
+            ):
+                for word in self._tokens(value):
+                    ranks = words[word]
+                    ranks[recipe_id] = ranks.get(recipe_id, 0) + weight
+        self.words = dict(words)
+        self.texts = texts
+        self.version = version
+
+    def search(self, value):
+        """Возвращает {id рецепта: ранг} для рецептов со всеми словами."""
+        self._refresh()
+        result = None
+        for term in map(self._stem, self._tokens(value)):
+            ranks = defaultdict(float)
+            for word, word_ranks in self.words.items():
+                if word.startswith(term):
+                    for recipe_id, rank in word_ranks.items():
+                        ranks[recipe_id] += rank
+            if result is None:
+                result = ranks
+            else:
+                result = {
+                    recipe_id: rank + ranks[recipe_id]
+                    for recipe_id, rank in result.items()
+                    if recipe_id in ranks
+                }
+        return dict(result or {})
+
+    def headline(self, recipe_id, value):
+        """Фрагмент текста рецепта с выделенными словами запроса."""
+        text = self.texts.get(recipe_id, '')
+        terms = tuple(map(self._stem, self._tokens(value)))
+        words = text.split()
+        matches = [
+            position for position, word in enumerate(words)
+            if any(token.startswith(terms) for token in self._tokens(word))
+        ]
+        min_words, max_words = RECIPE_SEARCH_HEADLINE_WORDS
+        start = max(matches[0] - min_words // 2, 0) if matches else 0
+        start_sel, stop_sel = RECIPE_SEARCH_HIGHLIGHT
+        return ' '.join(
+            f'{start_sel}{escape(word)}{stop_sel}' if position in matches
+            else escape(word)
+            for position, word in enumerate(
+                words[start:start + max_words], start
+            )
+        )
+
+
+class TagSlugMap:
+    """
+    Соответствие slug тега его id в памяти процесса.
+    Перечитывается раз в TAG_SLUGS_CACHE_TIMEOUT секунд, а при запросе
+    неизвестного slug - не чаще раза в TAG_SLUGS_MISS_REFRESH_INTERVAL.
+    """
+
+    def __init__(self):
+        self.ids = {}
+        self.loaded_at = None
+
+    def _load(self):
+        self.ids = dict(Tag.objects.values_list('slug', 'id'))
+        self.loaded_at = monotonic()
+
+    def get_ids(self, slugs):
+        """Возвращает {slug: id} для известных slug."""
+        age = None if self.loaded_at is None else monotonic() - self.loaded_at
+        if age is None or age > TAG_SLUGS_CACHE_TIMEOUT or (
+            age > TAG_SLUGS_MISS_REFRESH_INTERVAL
+            and any(slug not in self.ids for slug in slugs)
+        ):
+            self._load()
+        return {slug: self.ids[slug] for slug in slugs if slug in self.ids}
+
+
+ingredient_name_index = IngredientNameIndex()
+recipe_text_index = RecipeTextIndex()
+tag_slug_map = TagSlugMap()
@@ -1,17 +1,26 @@
+from collections import Counter
+
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.shortcuts import get_object_or_404
+from django.db import connection, transaction
+from django.db.models import prefetch_related_objects
 
-from core.serializers import Base64ImageField
+from core.counters import update_counter
+from core.serializers import (Base64ImageField, ImageSrcsetField,
+                              TimedRepresentationMixin)
 from recipes.constants import (MAX_COOKING_TIME, MAX_INGRDEINTS_AMOUNT,
-                               MIN_COOKING_TIME, MIN_INGRDEINTS_AMOUNT)
+                               MAX_RECIPES_IN_BATCH, MIN_COOKING_TIME,
+                               MIN_INGRDEINTS_AMOUNT, RECIPES_BULK_BATCH_SIZE)
 from recipes.models import (Favorite, Ingredient, IngredientsAmountInRecipe,
-                            Recipe, ShoppingCart, Tag)
+                            Recipe, ShoppingCart, ShoppingListIngredient, Tag)
+from recipes.tasks import enqueue_image_processing
 from rest_framework import serializers
 from rest_framework.exceptions import ValidationError
+from users.models import User
 from users.serializers import UserSerializer
 
 
-class IngredientSerializer(serializers.ModelSerializer):
+class IngredientSerializer(TimedRepresentationMixin,
+                           serializers.ModelSerializer):
     """Класс сериализатора для работы с ингредиентами."""
 
     measurement_unit = serializers.CharField(
@@ -28,7 +37,8 @@ class IngredientSerializer(serializers.ModelSerializer):
         read_only_fields = '__all__',
 
 
-class TagSerializer(serializers.ModelSerializer):
+class TagSerializer(TimedRepresentationMixin,
+                    serializers.ModelSerializer):
     """Класс сериализатора для работы с тэгами рецептов."""
 
     class Meta:
@@ -47,10 +57,10 @@ class IngredientsAmountInRecipeSerializer(serializers.ModelSerializer):
     отображения количества ингредиентов в рецепте.
     """
 
-    id = serializers.ReadOnlyField(source='ingredient.id')
-    name = serializers.ReadOnlyField(source='ingredient.name')
+    id = serializers.ReadOnlyField(source='ingredients.id')
+    name = serializers.ReadOnlyField(source='ingredients.name')
     measurement_unit = serializers.ReadOnlyField(
-        source='ingredient.measurement_unit.abbreviation'
+        source='ingredients.measurement_unit.abbreviation'
     )
 
     class Meta:
@@ -63,14 +73,9 @@ class IngredientsAmountInRecipeSerializer(serializers.ModelSerializer):
         )
         read_only_fields = ('id', 'name', 'measurement_unit')
 
-    def to_representation(self, instance):
-        representation = super().to_representation(instance)
-        ingredient_data = IngredientSerializer(instance.ingredients).data
-        representation.update(ingredient_data)
-        return representation
 
-
-class RecipeGetSerializer(serializers.ModelSerializer):
+class RecipeGetSerializer(TimedRepresentationMixin,
+                          serializers.ModelSerializer):
     """
     Класс сериализатора для корректного отображения рецептов
     при запросах GET, HEAD, OPTIONS.
@@ -88,6 +93,7 @@ class RecipeGetSerializer(serializers.ModelSerializer):
     is_favorited = serializers.SerializerMethodField()
     is_in_shopping_cart = serializers.SerializerMethodField()
     image = Base64ImageField()
+    image_srcset = ImageSrcsetField(source='image')
 
     class Meta:
         fields = (
@@ -97,8 +103,11 @@ class RecipeGetSerializer(serializers.ModelSerializer):
             'ingredients',
             'is_favorited',
             'is_in_shopping_cart',
+            'favorites_count',
+            'in_carts_count',
             'name',
             'image',
+            'image_srcset',
             'text',
             'cooking_time'
         )
@@ -109,6 +118,7 @@ class RecipeGetSerializer(serializers.ModelSerializer):
         """
         Базовый метод для отображения,
         находится ли рецепт в избранном и списке покупок.
+        Значение берется из аннотации queryset, если она есть.
         """
         request = self.context.get('request')
         if request is None or request.user.is_anonymous:
@@ -116,16 +126,27 @@ class RecipeGetSerializer(serializers.ModelSerializer):
         return model.objects.filter(user=request.user, recipe=obj).exists()
 
     def get_is_favorited(self, obj):
+        if hasattr(obj, 'is_favorited'):
+            return obj.is_favorited
         return self._in_list(obj, Favorite)
 
     def get_is_in_shopping_cart(self, obj):
+        if hasattr(obj, 'is_in_shopping_cart'):
+            return obj.is_in_shopping_cart
         return self._in_list(obj, ShoppingCart)
 
+    def to_representation(self, instance):
+        """При поиске добавляется фрагмент описания с найденными словами."""
+        representation = super().to_representation(instance)
+        if hasattr(instance, 'search_headline'):
+            representation['search_headline'] = instance.search_headline
+        return representation
+
 
 class AddIngredientsInRecipeSerializer(serializers.ModelSerializer):
     """Класс сериализатора для добавления ингредиентов в рецепт."""
 
-    id = serializers.PrimaryKeyRelatedField(queryset=Ingredient.objects.all())
+    id = serializers.IntegerField()
     amount = serializers.IntegerField(
         validators=(
             MinValueValidator(
@@ -146,6 +167,105 @@ class AddIngredientsInRecipeSerializer(serializers.ModelSerializer):
         fields = ('id', 'amount')
 
 
+def _valid_ids(values):
+    """Целочисленные id из необработанных данных запроса."""
+    ids = set()
+    for value in values:
+        try:
+            ids.add(int(value))
+        except (TypeError, ValueError):
+            continue
+    return ids
+
+
+class RecipeBulkListSerializer(serializers.ListSerializer):
+    """
+    Класс сериализатора для пакетного создания рецептов:
+    ингредиенты и теги всех рецептов загружаются двумя запросами,
+    рецепты и связи вставляются через bulk_create.
+    """
+
+    def to_internal_value(self, data):
+        if isinstance(data, list):
+            ingredient_ids, tag_ids = set(), set()
+            for item in data:
+                if not isinstance(item, dict):
+                    continue
+                ingredients = item.get('ingredients')
+                if isinstance(ingredients, list):
+                    ingredient_ids.update(
+                        ingredient.get('id') for ingredient in ingredients
+                        if isinstance(ingredient, dict)
+                    )
+                tags = item.get('tags')
+                if isinstance(tags, list):
+                    tag_ids.update(tags)
+            self.context['ingredients_by_id'] = Ingredient.objects.in_bulk(
+                _valid_ids(ingredient_ids)
+            )
+            self.context['tags_by_id'] = Tag.objects.in_bulk(
+                _valid_ids(tag_ids)
+            )
+        return super().to_internal_value(data)
+
+    @transaction.atomic
+    def create(self, validated_data):
+        recipes = []
+        for item in validated_data:
+            item = dict(item)
+            ingredients = item.pop('ingredients')
+            tags = item.pop('tags')
+            recipes.append((Recipe(**item), ingredients, tags))
+        if connection.features.can_return_rows_from_bulk_insert:
+            Recipe.objects.bulk_create(recipe for recipe, *_ in recipes)
+            # bulk_create не отправляет post_save, поэтому обработка
+            # изображений ставится в очередь здесь, а при save() -
+            # обработчиком сигнала.
+            enqueue_image_processing(
+                (recipe for recipe, *_ in recipes), 'image'
+            )
+        else:
+            for recipe, *_ in recipes:
+                recipe.save()
+        IngredientsAmountInRecipe.objects.bulk_create(
+            (
+                IngredientsAmountInRecipe(
+                    recipe=recipe,
+                    ingredients=ingredient['id'],
+                    amount=ingredient['amount']
+                )
+                for recipe, ingredients, _ in recipes
+                for ingredient in ingredients
+            ),
+            batch_size=RECIPES_BULK_BATCH_SIZE
+        )
+        Recipe.tags.through.objects.bulk_create(
+            (
+                Recipe.tags.through(recipe_id=recipe.id, tag_id=tag.id)
+                for recipe, _, tags in recipes
+                for tag in tags
+            ),
+            batch_size=RECIPES_BULK_BATCH_SIZE
+        )
+        usage = Counter(
+            ingredient['id'].id
+            for _, ingredients, _ in recipes
+            for ingredient in ingredients
+        )
+        ids_by_count = {}
+        for ingredient_id, count in usage.items():
+            ids_by_count.setdefault(count, []).append(ingredient_id)
+        for count, ingredient_ids in ids_by_count.items():
+            Ingredient.update_usage(ingredient_ids, count)
+        for author_id, count in Counter(
+            recipe.author_id for recipe, *_ in recipes
+        ).items():
+            update_counter(
+                User.objects.filter(id=author_id), 'recipes_count', count
+            )
+        return [recipe for recipe, *_ in recipes]
+
+
 class RecipeWriteSerializer(serializers.ModelSerializer):
     """
     Класс сериализатора для корректного отображения рецептов
@@ -155,9 +275,9 @@ class RecipeWriteSerializer(serializers.ModelSerializer):
     ingredients = AddIngredientsInRecipeSerializer(
         many=True,
         write_only=True)
-    tags = serializers.PrimaryKeyRelatedField(
-        queryset=Tag.objects.all(),
-        many=True)
+    tags = serializers.ListField(
+        child=serializers.IntegerField(),
+        write_only=True)
     image = Base64ImageField()
     author = serializers.HiddenField(
         default=serializers.CurrentUserDefault()
@@ -189,27 +309,49 @@ class RecipeWriteSerializer(serializers.ModelSerializer):
             'author'
         )
         read_only_fields = ('author', )
+        list_serializer_class = RecipeBulkListSerializer
 
     def to_representation(self, instance):
         representation = super().to_representation(instance)
+        prefetch_related_objects(
+            (instance,),
+            'tags',
+            'ingredients_in_recipe__ingredients__measurement_unit'
+        )
         recipe_data = RecipeGetSerializer(instance, context=self.context).data
         representation.update(recipe_data)
         return representation
 
+    def _in_bulk(self, model, ids, context_key, message):
+        """
+        Объекты по списку id одним запросом (или из контекста
+        пакетного создания); отсутствующие id - ошибка валидации.
+        """
+        objects = self.context.get(context_key)
+        if objects is None:
+            objects = model.objects.in_bulk(ids)
+        missing = [pk for pk in ids if pk not in objects]
+        if missing:
+            raise ValidationError({'errors': f'{message}: {missing}'})
+        return objects
+
     def validate_ingredients(self, value):
         """Проверка корректности введенных ингредиентов."""
         ingredients = value
         if not ingredients:
             raise ValidationError(
                 {'errors': 'Выберите ингредиенты!!!'})
-        ingredients_set = set()
-        for item in ingredients:
-            ingredient = get_object_or_404(Ingredient, name=item['id'])
-            if ingredient in ingredients_set:
-                raise ValidationError(
-                    {'errors': 'Ингредиенты дублируются!!!'})
-            ingredients_set.add(ingredient)
-        return value
+        ids = [item['id'] for item in ingredients]
+        if len(set(ids)) != len(ids):
+            raise ValidationError(
+                {'errors': 'Ингредиенты дублируются!!!'})
+        ingredients_by_id = self._in_bulk(
+            Ingredient, ids, 'ingredients_by_id', 'Ингредиенты не найдены'
+        )
+        return [
+            {**item, 'id': ingredients_by_id[item['id']]}
+            for item in ingredients
+        ]
 
     def validate_tags(self, value):
         """Проверка корректности указанных тэгов."""
@@ -217,13 +359,13 @@ class RecipeWriteSerializer(serializers.ModelSerializer):
         if not tags:
             raise ValidationError(
                 {'errors': 'Выберите теги!!!'})
-        tags_set = set()
-        for tag in tags:
-            if tag in tags_set:
-                raise ValidationError(
-                    {'errors': 'Теги дублируются!!!'})
-            tags_set.add(tag)
-        return value
+        if len(set(tags)) != len(tags):
+            raise ValidationError(
+                {'errors': 'Теги дублируются!!!'})
+        tags_by_id = self._in_bulk(
+            Tag, tags, 'tags_by_id', 'Теги не найдены'
+        )
+        return [tags_by_id[tag] for tag in tags]
 
     def _add_tags_ingredients(self, ingredients, tags, model):
         ingredients_amount = [
@@ -236,20 +378,118 @@ class RecipeWriteSerializer(serializers.ModelSerializer):
         IngredientsAmountInRecipe.objects.bulk_create(ingredients_amount)
         model.tags.set(tags)
 
+    @transaction.atomic
     def create(self, validated_data):
         ingredients = validated_data.pop('ingredients')
         tags = validated_data.pop('tags')
         recipe = super().create(validated_data)
         self._add_tags_ingredients(ingredients, tags, recipe)
+        Ingredient.update_usage(
+            [ingredient['id'].id for ingredient in ingredients], 1
+        )
+        update_counter(
+            User.objects.filter(id=recipe.author_id), 'recipes_count', 1
+        )
+        recipe.author.refresh_from_db(fields=('recipes_count',))
         return recipe
 
+    def _update_ingredients(self, instance, ingredients):
+        """
+        Обновление состава рецепта по разнице с текущими строками:
+        удаленные строки удаляются, новые вставляются, измененные
+        количества обновляются одним запросом.
+        """
+        rows = {
+            row.ingredients_id: row
+            for row in instance.ingredients_in_recipe.all()
+        }
+        amounts = {
+            ingredient['id'].id: ingredient['amount']
+            for ingredient in ingredients
+        }
+        removed_ids = [
+            ingredient_id for ingredient_id in rows
+            if ingredient_id not in amounts
+        ]
+        added_ids = [
+            ingredient_id for ingredient_id in amounts
+            if ingredient_id not in rows
+        ]
+        changed_rows = []
+        amounts_delta = {}
+        for ingredient_id, row in rows.items():
+            amount = amounts.get(ingredient_id, 0)
+            if amount != row.amount:
+                amounts_delta[ingredient_id] = amount - row.amount
+                row.amount = amount
+                changed_rows.append(row)
+        for ingredient_id in added_ids:
+            amounts_delta[ingredient_id] = amounts[ingredient_id]
+        if not amounts_delta:
+            return
+        if removed_ids:
+            IngredientsAmountInRecipe.objects.filter(
+                recipe=instance, ingredients_id__in=removed_ids
+            ).delete()
+        changed_rows = [
+            row for row in changed_rows
+            if row.ingredients_id not in removed_ids
+        ]
+        if changed_rows:
+            IngredientsAmountInRecipe.objects.bulk_update(
+                changed_rows, ('amount',)
+            )
+        if added_ids:
+            IngredientsAmountInRecipe.objects.bulk_create(
+                IngredientsAmountInRecipe(
+                    recipe=instance,
+                    ingredients_id=ingredient_id,
+                    amount=amounts[ingredient_id]
+                ) for ingredient_id in added_ids
+            )
+        ShoppingListIngredient.apply_delta(
+            ShoppingCart.objects.filter(
+                recipe=instance
+            ).values_list('user_id', flat=True),
+            amounts_delta
+        )
+        Ingredient.update_usage(removed_ids, -1)
+        Ingredient.update_usage(added_ids, 1)
+
+    @transaction.atomic
     def update(self, instance, validated_data):
-        ingredients = validated_data.get('ingredients', [])
-        self.validate_ingredients(ingredients)
-        tags = validated_data.get('tags', [])
-        self.validate_tags(tags)
-        ingredients = validated_data.pop('ingredients')
-        tags = validated_data.pop('tags')
-        instance.ingredients.clear()
-        self._add_tags_ingredients(ingredients, tags, instance)
+        ingredients = validated_data.pop('ingredients', None)
+        tags = validated_data.pop('tags', None)
+        if ingredients is not None:
+            self._update_ingredients(instance, ingredients)
+        if tags is not None:
+            instance.tags.set(tags)
         return super().update(instance, validated_data)
+
+
+class RecipeIdsSerializer(serializers.Serializer):
+    """
+    Класс сериализатора списка рецептов для пакетного
+    добавления (удаления) в избранное и список покупок.
+    """
+
+    recipes = serializers.ListField(
+        child=serializers.IntegerField(),
+        allow_empty=False,
+        max_length=MAX_RECIPES_IN_BATCH
+    )
+
+    def validate_recipes(self, value):
+        recipe_ids = list(dict.fromkeys(value))
+        found_ids = set(Recipe.objects.filter(
+            id__in=recipe_ids
+        ).values_list('id', flat=True))
+        missing_ids = [
+            recipe_id for recipe_id in recipe_ids
+            if recipe_id not in found_ids
+        ]
+        if missing_ids:
+            raise ValidationError(
+                f'Рецептов не существует: {missing_ids}'
+            )
+        return recipe_ids
@@ -0,0 +1,101 @@
+import csv
+import json
+from abc import ABC, abstractmethod
+
+
+class ShoppingListWriter(ABC):
+    """
+    Базовый класс для построчной выгрузки списка покупок.
+    Строки - кортежи (название, единица измерения, количество).
+    """
+
+    format = None
+    content_type = None
+
+    def header(self):
+        return ''
+
+    @abstractmethod
+    def row(self, name, unit, amount):
+        """Фрагмент файла для одной строки списка покупок."""
+
+    def footer(self):
+        return ''
+
+    def stream(self, rows):
+        """Генератор фрагментов файла для StreamingHttpResponse."""
+        yield self.header()
+        for row in rows:
+            yield self.row(*row)
+        yield self.footer()
+
+
+class TxtShoppingListWriter(ShoppingListWriter):
+    """Выгрузка списка покупок в формате txt."""
+
+    format = 'txt'
+    content_type = 'text/plain; charset=utf-8'
+
+    def header(self):
+        return 'Список покупок\n'
+
+    def row(self, name, unit, amount):
+        return f'{name}: {amount} {unit} \n'
+
+
+class _EchoBuffer:
+    """Буфер, возвращающий записанную строку вместо ее хранения."""
+
+    def write(self, value):
+        return value
+
+
+class CsvShoppingListWriter(ShoppingListWriter):
+    """Выгрузка списка покупок в формате csv."""
+
+    format = 'csv'
+    content_type = 'text/csv; charset=utf-8'
+
+    def __init__(self):
+        self.writer = csv.writer(_EchoBuffer())
+
+    def header(self):
+        return self.writer.writerow(
+            ('Ингредиент', 'Количество', 'Единица измерения')
+        )
+
+    def row(self, name, unit, amount):
+        return self.writer.writerow((name, amount, unit))
+
+
+class JsonShoppingListWriter(ShoppingListWriter):
+    """Выгрузка списка покупок в формате json."""
+
+    format = 'json'
+    content_type = 'application/json'
+
+    def __init__(self):
+        self.separator = ''
+
+    def header(self):
+        return '['
+
+    def row(self, name, unit, amount):
+        item = json.dumps(
+            {'name': name, 'measurement_unit': unit, 'amount': amount},
+            ensure_ascii=False
+        )
+        separator, self.separator = self.separator, ','
+        return separator + item
+
+    def footer(self):
+        return ']'
+
+
+SHOPPING_LIST_WRITERS = {
+    writer.format: writer for writer in (
+        TxtShoppingListWriter,
+        CsvShoppingListWriter,
+        JsonShoppingListWriter,
+    )
+}
@@ -0,0 +1,63 @@
+import shutil
+import tempfile
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from api.search import tag_slug_map
+from recipes.seeding import FoodgramSeeder
+from users.models import User
+
+TEST_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+
+class SeededAPITestCase(TestCase):
+    """
+    Тесты API на данных FoodgramSeeder: кэш в памяти,
+    файлы во временном каталоге, без замеров Server-Timing.
+    """
+
+    users = 5
+    recipes = 20
+    favorites = 10
+    carts = 10
+    follows = 5
+
+    @classmethod
+    def setUpClass(cls):
+        cls.media_root = tempfile.mkdtemp()
+        cls.test_settings = override_settings(
+            CACHES=TEST_CACHES, MEDIA_ROOT=cls.media_root,
+            DATABASE_REPLICAS=[], SERVER_TIMING_SAMPLE_RATE=0
+        )
+        cls.test_settings.enable()
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        cls.test_settings.disable()
+        shutil.rmtree(cls.media_root, ignore_errors=True)
+
+    @classmethod
+    def setUpTestData(cls):
+        user_ids, cls.recipe_ids = FoodgramSeeder(seed=0).run(
+            users=cls.users,
+            recipes=cls.recipes,
+            favorites=cls.favorites,
+            carts=cls.carts,
+            follows=cls.follows,
+        )
+        cls.user = User.objects.get(id=user_ids[0])
+
+    def setUp(self):
+        cache.clear()
+        tag_slug_map.loaded_at = None
+        self.anon = APIClient()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
@@ -0,0 +1,86 @@
+from api.tests.base import SeededAPITestCase
+from recipes.models import (Favorite, Recipe, ShoppingCart,
+                            ShoppingListIngredient)
+
+FAVORITE_URL = '/api/recipes/favorite/'
+CART_URL = '/api/recipes/shopping_cart/'
+
+
+class RecipeListBatchTest(SeededAPITestCase):
+    """Пакетное добавление и удаление в избранное и список покупок."""
+
+    def setUp(self):
+        super().setUp()
+        self.ids = list(Recipe.objects.order_by('id').values_list(
+            'id', flat=True
+        )[:6])
+
+    def assertCountersConsistent(self):
+        self.assertEqual(
+            Recipe.reconcile_counters(),
+            {'favorites_count': 0, 'in_carts_count': 0}
+        )
+        self.assertEqual(ShoppingListIngredient.check_consistency(), [])
+
+    def listed(self, model):
+        return set(model.objects.filter(
+            user=self.user, recipe_id__in=self.ids
+        ).values_list('recipe_id', flat=True))
+
+    def test_add_with_partial_duplicates(self):
+        for model, url in ((Favorite, FAVORITE_URL), (ShoppingCart, CART_URL)):
+            with self.subTest(model=model.__name__):
+                self.client.delete(url, {'recipes': self.ids}, format='json')
+                self.client.post(
+                    url, {'recipes': self.ids[:2]}, format='json'
+                )
+                response = self.client.post(
+                    url, {'recipes': self.ids + self.ids[:1]}, format='json'
+                )
+                self.assertEqual(response.status_code, 201)
+                self.assertEqual(
+                    {recipe['id'] for recipe in response.json()},
+                    set(self.ids)
+                )
+                self.assertEqual(self.listed(model), set(self.ids))
+                self.assertCountersConsistent()
+
+    def test_remove_partial(self):
+        for model, url in ((Favorite, FAVORITE_URL), (ShoppingCart, CART_URL)):
+            with self.subTest(model=model.__name__):
+                self.client.delete(url, {'recipes': self.ids}, format='json')
+                self.client.post(
+                    url, {'recipes': self.ids[:3]}, format='json'
+                )
+                response = self.client.delete(
+                    url, {'recipes': self.ids}, format='json'
+                )
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response.json()['deleted'], 3)
+                self.assertEqual(self.listed(model), set())
+                self.assertCountersConsistent()
+
+    def test_unknown_ids(self):
+        before = self.listed(Favorite)
+        response = self.client.post(
+            FAVORITE_URL, {'recipes': [self.ids[0], 10 ** 9]}, format='json'
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn(str(10 ** 9), str(response.json()))
+        self.assertEqual(self.listed(Favorite), before)
+
+    def test_single_and_batch_counters(self):
+        recipe_id = self.ids[0]
+        self.client.delete(CART_URL, {'recipes': [recipe_id]}, format='json')
+        self.assertEqual(self.client.post(
+            f'/api/recipes/{recipe_id}/shopping_cart/'
+        ).status_code, 201)
+        self.client.post(CART_URL, {'recipes': self.ids}, format='json')
+        self.assertEqual(self.client.delete(
+            f'/api/recipes/{recipe_id}/shopping_cart/'
+        ).status_code, 204)
+        self.assertCountersConsistent()
+        response = self.client.delete('/api/recipes/shopping_cart/clear/')
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(ShoppingCart.objects.filter(user=self.user).exists())
+        self.assertCountersConsistent()
@@ -0,0 +1,127 @@
+import base64
+from io import BytesIO
+from unittest import mock
+
+from django.db import connection
+from django.test import skipUnlessDBFeature
+from django.test.utils import CaptureQueriesContext
+from PIL import Image
+
+from api.tests.base import SeededAPITestCase
+from recipes.models import (Ingredient, IngredientsAmountInRecipe, Recipe,
+                            Tag)
+from users.models import User
+
+BULK_URL = '/api/recipes/bulk/'
+
+
+def image_data():
+    buffer = BytesIO()
+    Image.new('RGB', (8, 8), (230, 160, 60)).save(buffer, 'PNG')
+    return 'data:image/png;base64,' + base64.b64encode(
+        buffer.getvalue()
+    ).decode()
+
+
+class RecipesBulkCreateTest(SeededAPITestCase):
+    """Пакетное создание рецептов: проверка и вставка одной транзакцией."""
+
+    def setUp(self):
+        super().setUp()
+        self.ingredient_ids = list(
+            Ingredient.objects.values_list('pk', flat=True)[:3]
+        )
+        self.tag_ids = list(Tag.objects.values_list('pk', flat=True)[:2])
+        self.image = image_data()
+
+    def payload(self, count, **changes):
+        return [
+            {
+                'name': f'Пакетный рецепт {number}',
+                'text': 'Описание',
+                'cooking_time': 10,
+                'image': self.image,
+                'tags': self.tag_ids,
+                'ingredients': [
+                    {'id': ingredient_id, 'amount': number + 1}
+                    for ingredient_id in self.ingredient_ids
+                ],
+                **changes,
+            }
+            for number in range(count)
+        ]
+
+    def usage(self):
+        return dict(Ingredient.objects.filter(
+            pk__in=self.ingredient_ids
+        ).values_list('pk', 'usage_count'))
+
+    def test_create(self):
+        usage = self.usage()
+        recipes_count = self.user.recipes_count
+        response = self.client.post(BULK_URL, self.payload(3), format='json')
+        self.assertEqual(response.status_code, 201)
+        recipe_ids = [item['id'] for item in response.json()]
+        self.assertEqual(len(recipe_ids), 3)
+        recipes = Recipe.objects.filter(pk__in=recipe_ids, author=self.user)
+        self.assertEqual(recipes.count(), 3)
+        self.assertEqual(
+            IngredientsAmountInRecipe.objects.filter(
+                recipe__in=recipe_ids
+            ).count(),
+            3 * len(self.ingredient_ids)
+        )
+        for recipe in recipes:
+            self.assertCountEqual(
+                recipe.tags.values_list('pk', flat=True), self.tag_ids
+            )
+        self.assertEqual(
+            self.usage(),
+            {pk: count + 3 for pk, count in usage.items()}
+        )
+        self.assertEqual(
+            User.objects.get(pk=self.user.pk).recipes_count,
+            recipes_count + 3
+        )
+
+    @skipUnlessDBFeature('can_return_rows_from_bulk_insert')
+    def test_queries_do_not_depend_on_size(self):
+        queries = []
+        for count in (2, 6):
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.post(
+                    BULK_URL, self.payload(count), format='json'
+                )
+            self.assertEqual(response.status_code, 201)
+            queries.append(len(context))
+        self.assertEqual(queries[0], queries[1])
+
+    def test_invalid_item_creates_nothing(self):
+        recipes = self.payload(3)
+        recipes[1]['ingredients'][0]['id'] = 0
+        recipes[2]['tags'] = [self.tag_ids[0], self.tag_ids[0]]
+        usage = self.usage()
+        response = self.client.post(BULK_URL, recipes, format='json')
+        self.assertEqual(response.status_code, 400)
+        errors = response.json()
+        self.assertEqual(errors[0], {})
+        self.assertIn('ingredients', errors[1])
+        self.assertIn('tags', errors[2])
+        self.assertEqual(Recipe.objects.count(), self.recipes)
+        self.assertEqual(self.usage(), usage)
+
+    def test_failure_rolls_back(self):
+        with mock.patch.object(
+            Recipe.tags.through.objects, 'bulk_create',
+            side_effect=RuntimeError
+        ):
+            with self.assertRaises(RuntimeError):
+                self.client.post(BULK_URL, self.payload(2), format='json')
+        self.assertEqual(Recipe.objects.count(), self.recipes)
+        self.assertFalse(IngredientsAmountInRecipe.objects.filter(
+            recipe__name__startswith='Пакетный'
+        ).exists())
+
+    def test_anonymous(self):
+        response = self.anon.post(BULK_URL, self.payload(1), format='json')
+        self.assertEqual(response.status_code, 401)
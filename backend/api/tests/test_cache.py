@@ -0,0 +1,58 @@
+from api.cache import get_recipes_generation, recipes_list_cache_stats
+from api.tests.base import SeededAPITestCase
+from recipes.models import Recipe
+from users.models import User
+
+RECIPES_URL = '/api/recipes/'
+
+
+class RecipesListCacheTest(SeededAPITestCase):
+    """Кэш страниц списка рецептов для анонимных пользователей."""
+
+    def test_cache_hit(self):
+        first = self.anon.get(RECIPES_URL)
+        with self.assertNumQueries(0):
+            second = self.anon.get(RECIPES_URL)
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(second.json(), first.json())
+        self.assertEqual(
+            recipes_list_cache_stats(), {'hits': 1, 'misses': 1}
+        )
+
+    def test_authenticated_not_cached(self):
+        self.client.get(RECIPES_URL)
+        self.client.get(RECIPES_URL)
+        self.assertEqual(
+            recipes_list_cache_stats(), {'hits': 0, 'misses': 0}
+        )
+
+    def test_invalidated_after_edit(self):
+        params = {'limit': self.recipes}
+        self.anon.get(RECIPES_URL, params)
+        recipe = Recipe.objects.filter(author=self.user).first()
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch(
+                f'{RECIPES_URL}{recipe.pk}/', {'name': 'Новое название'},
+                format='json'
+            )
+        self.assertEqual(response.status_code, 200)
+        names = {
+            item['id']: item['name']
+            for item in self.anon.get(RECIPES_URL, params).json()['results']
+        }
+        self.assertEqual(names[recipe.pk], 'Новое название')
+        self.assertEqual(recipes_list_cache_stats()['hits'], 0)
+
+    def test_clicks_keep_cache(self):
+        generation = get_recipes_generation()
+        recipe = Recipe.objects.exclude(author=self.user).first()
+        author = User.objects.exclude(pk=self.user.pk).first()
+        for url in (f'{RECIPES_URL}{recipe.pk}/favorite/',
+                    f'{RECIPES_URL}{recipe.pk}/shopping_cart/',
+                    f'/api/users/{author.pk}/subscribe/'):
+            with self.subTest(url=url):
+                self.client.delete(url)
+                with self.captureOnCommitCallbacks(execute=True):
+                    response = self.client.post(url)
+                self.assertEqual(response.status_code, 201)
+                self.assertEqual(get_recipes_generation(), generation)
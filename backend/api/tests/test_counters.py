@@ -0,0 +1,45 @@
+from django.db.models import F
+from rest_framework.test import APIRequestFactory
+
+from api.serializers import RecipeWriteSerializer
+from api.tests.base import SeededAPITestCase
+from recipes.models import Favorite, Recipe
+from users.models import User
+
+
+class CounterFullSaveTest(SeededAPITestCase):
+    """Полное сохранение объекта не затирает счетчики."""
+
+    def test_recipe_patch_after_counter_bump(self):
+        recipe = Recipe.objects.exclude(author=self.user).first()
+        stale = Recipe.objects.get(pk=recipe.pk)
+        self.client.delete(f'/api/recipes/{recipe.pk}/favorite/')
+        response = self.client.post(f'/api/recipes/{recipe.pk}/favorite/')
+        self.assertEqual(response.status_code, 201)
+        request = APIRequestFactory().patch('/')
+        request.user = stale.author
+        serializer = RecipeWriteSerializer(
+            stale, data={'name': 'Новое название'}, partial=True,
+            context={'request': request}
+        )
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        serializer.save()
+        recipe.refresh_from_db()
+        self.assertEqual(recipe.name, 'Новое название')
+        self.assertEqual(
+            recipe.favorites_count,
+            Favorite.objects.filter(recipe=recipe).count()
+        )
+
+    def test_user_save_keeps_counters(self):
+        author = User.objects.get(pk=self.user.pk)
+        User.objects.filter(pk=author.pk).update(
+            recipes_count=F('recipes_count') + 1,
+            followers_count=F('followers_count') + 1,
+        )
+        author.first_name = 'Имя'
+        author.save()
+        fresh = User.objects.get(pk=author.pk)
+        self.assertEqual(fresh.first_name, 'Имя')
+        self.assertEqual(fresh.recipes_count, author.recipes_count + 1)
+        self.assertEqual(fresh.followers_count, author.followers_count + 1)
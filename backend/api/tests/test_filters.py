@@ -0,0 +1,154 @@
+from api.search import tag_slug_map
+from api.tests.base import SeededAPITestCase
+from recipes.constants import TAGS_MODE_ALL, TAGS_MODE_ANY
+from recipes.models import Favorite, Recipe, ShoppingCart, Tag
+
+RECIPES_URL = '/api/recipes/'
+
+
+class RecipeFavoritesFilterTest(SeededAPITestCase):
+    """Фильтры is_favorited и is_in_shopping_cart."""
+
+    def assertFiltered(self, param, model):
+        expected = set(model.objects.filter(
+            user=self.user
+        ).values_list('recipe_id', flat=True))
+        response = self.client.get(
+            RECIPES_URL, {param: 1, 'limit': self.recipes}
+        )
+        self.assertEqual(
+            {recipe['id'] for recipe in response.json()['results']},
+            expected
+        )
+
+    def test_is_favorited(self):
+        self.assertFiltered('is_favorited', Favorite)
+
+    def test_is_in_shopping_cart(self):
+        self.assertFiltered('is_in_shopping_cart', ShoppingCart)
+
+    def test_anonymous_ignores_filter(self):
+        response = self.anon.get(RECIPES_URL, {'is_favorited': 1})
+        self.assertEqual(response.json()['count'], self.recipes)
+
+
+class RecipeTagsFilterTest(SeededAPITestCase):
+    """Фильтр по тегам в режимах any и all."""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        tags = dict(Tag.objects.values_list('slug', 'id'))
+        tag_sets = (
+            ('breakfast',),
+            ('lunch',),
+            ('breakfast', 'lunch'),
+            ('breakfast', 'lunch', 'dinner'),
+            (),
+        )
+        cls.recipe_tags = {}
+        through = Recipe.tags.through
+        through.objects.all().delete()
+        for number, recipe_id in enumerate(cls.recipe_ids):
+            slugs = tag_sets[number % len(tag_sets)]
+            cls.recipe_tags[recipe_id] = set(slugs)
+            through.objects.bulk_create(
+                through(recipe_id=recipe_id, tag_id=tags[slug])
+                for slug in slugs
+            )
+
+    def get_ids(self, slugs, mode=None):
+        params = {'tags': slugs, 'limit': self.recipes}
+        if mode:
+            params['tags_mode'] = mode
+        response = self.anon.get(RECIPES_URL, params)
+        self.assertEqual(response.status_code, 200)
+        ids = [recipe['id'] for recipe in response.json()['results']]
+        self.assertEqual(len(ids), len(set(ids)), 'Рецепты повторяются')
+        self.assertEqual(len(ids), response.json()['count'])
+        return set(ids)
+
+    def expected(self, slugs, match):
+        return {
+            recipe_id for recipe_id, tags in self.recipe_tags.items()
+            if match(slug in tags for slug in slugs)
+        }
+
+    def test_any(self):
+        slugs = ['breakfast', 'lunch']
+        self.assertEqual(self.get_ids(slugs), self.expected(slugs, any))
+        self.assertEqual(
+            self.get_ids(slugs, TAGS_MODE_ANY), self.expected(slugs, any)
+        )
+
+    def test_all(self):
+        for slugs in (['breakfast'], ['breakfast', 'lunch'],
+                      ['breakfast', 'lunch', 'dinner']):
+            with self.subTest(slugs=slugs):
+                self.assertEqual(
+                    self.get_ids(slugs, TAGS_MODE_ALL),
+                    self.expected(slugs, all)
+                )
+
+    def test_unknown_slug(self):
+        self.assertEqual(self.get_ids(['unknown']), set())
+        self.assertEqual(
+            self.get_ids(['breakfast', 'unknown']),
+            self.expected(['breakfast'], any)
+        )
+        self.assertEqual(
+            self.get_ids(['breakfast', 'unknown'], TAGS_MODE_ALL), set()
+        )
+
+    def test_queries(self):
+        tag_slug_map.get_ids(())
+        for mode in (TAGS_MODE_ANY, TAGS_MODE_ALL):
+            with self.subTest(mode=mode), self.assertNumQueries(5):
+                self.anon.get(RECIPES_URL, {
+                    'tags': ['breakfast', 'lunch'], 'tags_mode': mode,
+                    'limit': self.recipes,
+                })
+
+
+class RecipeSearchTest(SeededAPITestCase):
+    """Поиск по рецептам."""
+
+    def test_cursor_pagination_keeps_relevance_order(self):
+        params = {'search': 'суп', 'limit': self.recipes}
+        expected = self.anon.get(RECIPES_URL, params).json()
+        self.assertTrue(expected['results'])
+        response = self.anon.get(
+            RECIPES_URL, {**params, 'pagination': 'cursor'}
+        )
+        self.assertEqual(response.json(), expected)
+
+    def test_ranking_and_headline(self):
+        recipes = Recipe.objects.all()[:3]
+        for recipe, name, text in zip(recipes, (
+            'Тыквенный суп', 'Пирог тыквенный', 'Пирог',
+        ), (
+            'Суп тыквенный с перцем.',
+            'Простой рецепт.',
+            'Подать тыквенный соус & <b>сахар</b>.',
+        )):
+            recipe.name, recipe.text = name, text
+            recipe.save()
+        response = self.anon.get(RECIPES_URL, {'search': 'тыквенный'})
+        self.assertEqual(response.status_code, 200)
+        results = response.json()['results']
+        self.assertEqual(
+            [item['id'] for item in results],
+            [recipe.pk for recipe in recipes]
+        )
+        self.assertIn('<mark>тыквенный</mark>', results[0]['search_headline'])
+        self.assertIn('&lt;b&gt;', results[2]['search_headline'])
+        self.assertNotIn('<b>', results[2]['search_headline'])
+
+    def test_all_words_required(self):
+        recipe = Recipe.objects.first()
+        recipe.name, recipe.text = 'Тыквенный суп', 'Без перца.'
+        recipe.save()
+        response = self.anon.get(
+            RECIPES_URL, {'search': 'тыквенный пирог'}
+        )
+        self.assertEqual(response.json()['results'], [])
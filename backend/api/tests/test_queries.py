@@ -0,0 +1,37 @@
+from django.core.cache import cache
+
+from api.tests.base import SeededAPITestCase
+
+RECIPES_URL = '/api/recipes/'
+
+
+class RecipeQueriesTest(SeededAPITestCase):
+    """Количество запросов к БД не зависит от размера страницы."""
+
+    recipes = 60
+
+    def assertListQueries(self, client, number):
+        for limit in (1, 50):
+            with self.subTest(limit=limit):
+                cache.clear()
+                with self.assertNumQueries(number):
+                    response = client.get(RECIPES_URL, {'limit': limit})
+                self.assertEqual(len(response.json()['results']), limit)
+
+    def test_list_anonymous(self):
+        self.assertListQueries(self.anon, 5)
+
+    def test_list_authenticated(self):
+        self.assertListQueries(self.client, 5)
+
+    def test_detail_anonymous(self):
+        with self.assertNumQueries(5):
+            response = self.anon.get(f'{RECIPES_URL}{self.recipe_ids[0]}/')
+        self.assertEqual(response.status_code, 200)
+
+    def test_detail_authenticated(self):
+        with self.assertNumQueries(5):
+            response = self.client.get(
+                f'{RECIPES_URL}{self.recipe_ids[0]}/'
+            )
+        self.assertEqual(response.status_code, 200)
@@ -0,0 +1,97 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api.tests.base import SeededAPITestCase
+from recipes.models import (Ingredient, IngredientsAmountInRecipe, Recipe,
+                            ShoppingCart, ShoppingListIngredient)
+
+RECIPES_URL = '/api/recipes/'
+ROWS_TABLE = IngredientsAmountInRecipe._meta.db_table
+
+
+class RecipeIngredientsDiffTest(SeededAPITestCase):
+    """Обновление ингредиентов рецепта по разнице с текущими строками."""
+
+    def setUp(self):
+        super().setUp()
+        self.recipe = Recipe.objects.filter(author=self.user).first()
+        self.url = f'{RECIPES_URL}{self.recipe.pk}/'
+        ShoppingCart.objects.get_or_create(
+            user=self.user, recipe=self.recipe
+        )
+        ShoppingListIngredient.rebuild([self.user.pk])
+        self.rows = {
+            row.ingredients_id: row
+            for row in self.recipe.ingredients_in_recipe.all()
+        }
+        self.assertGreaterEqual(len(self.rows), 3)
+
+    def current_rows(self):
+        return {
+            row.ingredients_id: (row.pk, row.amount)
+            for row in self.recipe.ingredients_in_recipe.all()
+        }
+
+    def usage(self, ingredient_ids):
+        return dict(Ingredient.objects.filter(
+            pk__in=ingredient_ids
+        ).values_list('pk', 'usage_count'))
+
+    def patch(self, ingredients):
+        return self.client.patch(
+            self.url, {'ingredients': ingredients}, format='json'
+        )
+
+    def test_diff(self):
+        kept, changed, removed, *_ = self.rows
+        added = Ingredient.objects.exclude(pk__in=self.rows).first().pk
+        ingredient_ids = (kept, changed, removed, added)
+        usage = self.usage(ingredient_ids)
+        response = self.patch([
+            {'id': kept, 'amount': self.rows[kept].amount},
+            {'id': changed, 'amount': self.rows[changed].amount + 5},
+            {'id': added, 'amount': 7},
+        ])
+        self.assertEqual(response.status_code, 200)
+        rows = self.current_rows()
+        self.assertEqual(set(rows), {kept, changed, added})
+        self.assertEqual(
+            rows[kept], (self.rows[kept].pk, self.rows[kept].amount)
+        )
+        self.assertEqual(
+            rows[changed],
+            (self.rows[changed].pk, self.rows[changed].amount + 5)
+        )
+        self.assertEqual(rows[added][1], 7)
+        self.assertEqual(self.usage(ingredient_ids), {
+            kept: usage[kept],
+            changed: usage[changed],
+            removed: usage[removed] - 1,
+            added: usage[added] + 1,
+        })
+        self.assertEqual(
+            ShoppingListIngredient.check_consistency([self.user.pk]), []
+        )
+
+    def test_unchanged_ingredients_not_written(self):
+        rows = self.current_rows()
+        with CaptureQueriesContext(connection) as context:
+            response = self.patch([
+                {'id': ingredient_id, 'amount': row.amount}
+                for ingredient_id, row in self.rows.items()
+            ])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.current_rows(), rows)
+        self.assertFalse([
+            query['sql'] for query in context.captured_queries
+            if ROWS_TABLE in query['sql']
+            and not query['sql'].startswith('SELECT')
+        ])
+
+    def test_patch_without_ingredients(self):
+        rows = self.current_rows()
+        response = self.client.patch(
+            self.url, {'name': 'Новое название'}, format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.current_rows(), rows)
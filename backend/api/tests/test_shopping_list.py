@@ -0,0 +1,66 @@
+import csv
+import io
+import json
+
+from django.db.models import Sum
+
+from api.tests.base import SeededAPITestCase
+from recipes.models import IngredientsAmountInRecipe, Recipe
+
+RECIPES_URL = '/api/recipes/'
+DOWNLOAD_URL = f'{RECIPES_URL}download_shopping_cart/'
+
+
+class DownloadShoppingCartTest(SeededAPITestCase):
+    """Потоковая выгрузка списка покупок в разных форматах."""
+
+    def setUp(self):
+        super().setUp()
+        for recipe in Recipe.objects.exclude(
+                shoppingcart__user=self.user
+        )[:3]:
+            self.client.post(f'{RECIPES_URL}{recipe.pk}/shopping_cart/')
+        self.expected = {
+            (name, unit): total
+            for name, unit, total in IngredientsAmountInRecipe.objects.filter(
+                recipe__shoppingcart__user=self.user
+            ).values_list(
+                'ingredients__name',
+                'ingredients__measurement_unit__abbreviation'
+            ).annotate(total=Sum('amount'))
+        }
+        self.assertTrue(self.expected)
+
+    def download(self, file_format):
+        response = self.client.get(DOWNLOAD_URL, {'format': file_format})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertIn(
+            f'shopping.{file_format}', response['Content-Disposition']
+        )
+        return b''.join(response.streaming_content).decode()
+
+    def test_csv_totals(self):
+        header, *rows = csv.reader(io.StringIO(self.download('csv')))
+        self.assertEqual(len(header), 3)
+        self.assertEqual(
+            {(name, unit): int(amount) for name, amount, unit in rows},
+            self.expected
+        )
+
+    def test_json_totals(self):
+        items = json.loads(self.download('json'))
+        self.assertEqual(
+            {(item['name'], item['measurement_unit']): item['amount']
+             for item in items},
+            self.expected
+        )
+
+    def test_txt_rows(self):
+        lines = self.download('txt').splitlines()
+        self.assertEqual(len(lines), len(self.expected) + 1)
+
+    def test_unknown_format(self):
+        response = self.client.get(DOWNLOAD_URL, {'format': 'pdf'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('errors', response.json())
@@ -0,0 +1,40 @@
+from api.tests.base import SeededAPITestCase
+from recipes.models import Recipe, ShortLink
+
+RECIPES_URL = '/api/recipes/'
+
+
+class ShortLinkTest(SeededAPITestCase):
+    """Короткие ссылки на рецепты и переадресация по ним."""
+
+    def setUp(self):
+        super().setUp()
+        self.recipe = Recipe.objects.first()
+        self.url = f'{RECIPES_URL}{self.recipe.pk}/get-link/'
+
+    def test_link_reused(self):
+        first = self.anon.get(self.url)
+        second = self.client.get(self.url)
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first.data, second.data)
+        self.assertEqual(
+            ShortLink.objects.filter(recipe=self.recipe).count(), 1
+        )
+
+    def test_redirect(self):
+        short_url = self.anon.get(self.url).data['short-link']
+        code = short_url.rstrip('/').rsplit('/', 1)[-1]
+        self.assertEqual(short_url, f'http://testserver/s/{code}')
+        response = self.anon.get(f'/s/{code}')
+        self.assertRedirects(
+            response, f'/recipes/{self.recipe.pk}',
+            fetch_redirect_response=False
+        )
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                self.anon.get(f'/s/{code}')['Location'],
+                f'/recipes/{self.recipe.pk}'
+            )
+
+    def test_unknown_code(self):
+        self.assertEqual(self.anon.get('/s/unknown').status_code, 404)
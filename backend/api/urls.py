@@ -1,7 +1,8 @@
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
-from api.views import IngredientViewSet, RecipeViewSet, TagViewSet
+from api.views import (IngredientViewSet, RecipeViewSet, TagViewSet,
+                       metrics, short_link_redirect)
 
 router_v1 = DefaultRouter()
 
@@ -11,4 +12,6 @@ router_v1.register('tags', TagViewSet, basename='tags')
 
 urlpatterns = [
     path('api/', include(router_v1.urls)),
+    path('s/<str:code>', short_link_redirect, name='short-link'),
+    path('metrics', metrics, name='metrics'),
 ]
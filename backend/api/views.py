@@ -1,36 +1,59 @@
-import pyshorteners
-from django.db.models import Sum
-from django.http import HttpResponse
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Prefetch
+from django.http import (Http404, HttpResponse, HttpResponseRedirect,
+                         StreamingHttpResponse)
+from django.urls import reverse
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import viewsets
-from rest_framework.decorators import action
+from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.permissions import SAFE_METHODS, IsAuthenticated
 from rest_framework.response import Response
-from rest_framework.status import (HTTP_201_CREATED, HTTP_204_NO_CONTENT,
-                                   HTTP_400_BAD_REQUEST)
+from rest_framework.status import (HTTP_200_OK, HTTP_201_CREATED,
+                                   HTTP_204_NO_CONTENT, HTTP_400_BAD_REQUEST)
 
+from api.cache import (bump_recipes_generation, cache_recipes_list,
+                       get_cached_recipes_list, recipes_list_cache_key)
 from api.filters import IngredientFilter, RecipeFilter
 from api.serializers import (IngredientSerializer, RecipeGetSerializer,
-                             RecipeWriteSerializer, TagSerializer)
-from core.paginations import ApiPagination
-from core.permissions import (IsAdminOrReadOnly,
+                             RecipeIdsSerializer, RecipeWriteSerializer,
+                             TagSerializer)
+from api.shopping_list import SHOPPING_LIST_WRITERS
+from core.metrics import CACHE_REQUESTS, export
+from core.mixins import ConditionalRetrieveMixin, ReplicaReadMixin
+from core.constants import CURSOR_PAGINATION_PARAM, CURSOR_PAGINATION_VALUE
+from core.paginations import ApiPagination, RecipeCursorPagination
+from core.permissions import (IsAdmin, IsAdminOrReadOnly,
                               IsOwnerAdminOrReadOnlyPermission)
+from recipes.constants import (INGREDIENTS_SEARCH_LIMIT, MAX_RECIPES_IN_BULK,
+                               SHOPPING_LIST_CHUNK_SIZE,
+                               SHOPPING_LIST_DEFAULT_FORMAT,
+                               SHORT_LINK_CACHE_TIMEOUT)
 from recipes.models import (Favorite, Ingredient, IngredientsAmountInRecipe,
-                            Recipe, ShoppingCart, Tag)
+                            Recipe, ShoppingCart, ShoppingListIngredient,
+                            ShortLink, Tag)
+from users.models import Follow, User
 from users.serializers import RecipeSerializerForSubscriptions
 
 
-class IngredientViewSet(viewsets.ModelViewSet):
+class IngredientViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
     """Вьюсет для управления ингредиентами - объектами модели Ingredient."""
 
-    queryset = Ingredient.objects.all()
+    queryset = Ingredient.objects.select_related('measurement_unit')
     permission_classes = (IsAdminOrReadOnly,)
     serializer_class = IngredientSerializer
     filter_backends = (DjangoFilterBackend,)
     filterset_class = IngredientFilter
 
+    def filter_queryset(self, queryset):
+        """Поиск по названию возвращает не больше заданного числа записей."""
+        queryset = super().filter_queryset(queryset)
+        if self.action == 'list' and self.request.query_params.get('name'):
+            return queryset[:INGREDIENTS_SEARCH_LIMIT]
+        return queryset
 
-class TagViewSet(viewsets.ModelViewSet):
+
+class TagViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
     """Вьюсет для управления тэгами - объектами модели Tag."""
 
     queryset = Tag.objects.all()
@@ -38,15 +61,94 @@ class TagViewSet(viewsets.ModelViewSet):
     serializer_class = TagSerializer
 
 
-class RecipeViewSet(viewsets.ModelViewSet):
+class RecipeViewSet(ReplicaReadMixin, ConditionalRetrieveMixin,
+                    viewsets.ModelViewSet):
     """Вьюсет для управления рецептами - объектами модели Recipe."""
 
-    queryset = Recipe.objects.all().order_by('-pub_date')
+    queryset = Recipe.objects.defer('search_vector').order_by(
+        '-pub_date', '-id'
+    )
     permission_classes = (IsOwnerAdminOrReadOnlyPermission,)
     filter_backends = (DjangoFilterBackend,)
     filterset_class = RecipeFilter
     pagination_class = ApiPagination
 
+    def get_queryset(self):
+        """
+        Рецепты с аннотациями is_favorited, is_in_shopping_cart
+        и предзагруженными связями: количество запросов к БД
+        не зависит от размера страницы.
+        """
+        user = self.request.user
+        authors = User.objects.all()
+        queryset = super().get_queryset()
+        if self.action not in ('list', 'retrieve'):
+            return queryset
+        if user.is_authenticated:
+            authors = authors.annotate(is_subscribed=Exists(
+                Follow.objects.filter(
+                    user_id=user.pk, following=OuterRef('pk')
+                )
+            ))
+            queryset = queryset.annotate(
+                is_favorited=Exists(Favorite.objects.filter(
+                    user_id=user.pk, recipe=OuterRef('pk')
+                )),
+                is_in_shopping_cart=Exists(ShoppingCart.objects.filter(
+                    user_id=user.pk, recipe=OuterRef('pk')
+                )),
+            )
+        return queryset.prefetch_related(
+            Prefetch('author', queryset=authors),
+            'tags',
+            Prefetch(
+                'ingredients_in_recipe',
+                queryset=IngredientsAmountInRecipe.objects.select_related(
+                    'ingredients__measurement_unit'
+                )
+            ),
+        )
+
+    @property
+    def paginator(self):
+        """
+        Постраничная пагинация по умолчанию,
+        курсорная - при ?pagination=cursor. Результаты поиска
+        упорядочены по релевантности, а курсор - по дате публикации,
+        поэтому при поиске всегда используется постраничная.
+        """
+        query_params = self.request.query_params
+        if (query_params.get(CURSOR_PAGINATION_PARAM)
+                == CURSOR_PAGINATION_VALUE
+                and not query_params.get('search', '').strip()):
+            self.pagination_class = RecipeCursorPagination
+        return super().paginator
+
+    def get_version_queryset(self):
+        queryset = self.get_queryset()
+        user = self.request.user
+        if user.is_authenticated:
+            queryset = queryset.annotate(is_subscribed=Exists(
+                Follow.objects.filter(
+                    user_id=user.pk, following=OuterRef('author')
+                )
+            ))
+        return queryset
+
+    def get_version_fields(self):
+        """
+        Версия рецепта учитывает автора и отметки текущего пользователя,
+        которые входят в представление рецепта.
+        """
+        fields = (
+            'updated_at', 'favorites_count', 'in_carts_count',
+            'author__updated_at', 'author__recipes_count',
+            'author__followers_count'
+        )
+        if self.request.user.is_authenticated:
+            fields += ('is_favorited', 'is_in_shopping_cart', 'is_subscribed')
+        return fields
+
     def get_serializer_class(self):
         """
         Выбор сериализатора для разных запросов:
@@ -57,15 +159,70 @@ class RecipeViewSet(viewsets.ModelViewSet):
             return RecipeGetSerializer
         return RecipeWriteSerializer
 
-    def _get_absolute_url(self, recipe):
-        return f'/recipes/{self.get_object()}'
+    def list(self, request, *args, **kwargs):
+        """
+        Список рецептов; для анонимных пользователей
+        страницы кэшируются до ближайшего изменения рецептов.
+        Счетчики избранного, покупок и подписчиков в закэшированной
+        странице не сбрасывают кэш и могут отставать не дольше
+        RECIPES_LIST_CACHE_TIMEOUT.
+        """
+        if request.user.is_authenticated:
+            return super().list(request, *args, **kwargs)
+        cache_key = recipes_list_cache_key(request)
+        data = get_cached_recipes_list(cache_key)
+        if data is not None:
+            return Response(data)
+        response = super().list(request, *args, **kwargs)
+        if response.status_code == HTTP_200_OK:
+            cache_recipes_list(cache_key, response.data)
+        return response
+
+    def perform_create(self, serializer):
+        super().perform_create(serializer)
+        bump_recipes_generation()
+
+    def perform_update(self, serializer):
+        super().perform_update(serializer)
+        bump_recipes_generation()
+
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        # Итоги списков покупок и счетчики автора и ингредиентов
+        # обновляются обработчиками удаления рецепта.
+        instance.delete()
+        bump_recipes_generation()
+
+    @action(
+        methods=('post',),
+        detail=False,
+        permission_classes=(IsAuthenticated,)
+    )
+    def bulk(self, request):
+        """Пакетное создание рецептов одним запросом."""
+        serializer = RecipeWriteSerializer(
+            data=request.data,
+            many=True,
+            max_length=MAX_RECIPES_IN_BULK,
+            context=self.get_serializer_context()
+        )
+        serializer.is_valid(raise_exception=True)
+        recipes = serializer.save()
+        bump_recipes_generation()
+        return Response(
+            RecipeSerializerForSubscriptions(
+                recipes, many=True, context={'request': request}
+            ).data,
+            status=HTTP_201_CREATED
+        )
 
     @action(methods=('get',), detail=True, url_path='get-link')
     def get_link(self, request, pk=None):
         """Получение короткой ссылки на рецепт."""
-        recipe = self.get_object()
-        full_url = request.build_absolute_uri(self._get_absolute_url(recipe))
-        short_url = pyshorteners.Shortener().clckru.short(full_url)
+        short_link = ShortLink.for_recipe(self.get_object())
+        short_url = request.build_absolute_uri(
+            reverse('short-link', args=(short_link.code,))
+        )
         return Response({'short-link': short_url})
 
     def _write_favorite_and_in_shopping_cart(
@@ -79,30 +236,53 @@ class RecipeViewSet(viewsets.ModelViewSet):
         recipe = self.get_object()
         user = request.user
         if request.method == 'POST':
-            if model.objects.filter(user=user, recipe=recipe).exists():
+            if not model.add_recipe(user, recipe):
                 return Response(
                     {'errors': 'Рецепт ранее уже добавлен!'},
                     status=HTTP_400_BAD_REQUEST
                 )
-            model.objects.create(user=user, recipe=recipe)
             serializer = RecipeSerializerForSubscriptions(
                 recipe,
                 context={'request': request}
             )
             return Response(serializer.data, status=HTTP_201_CREATED)
         if request.method == 'DELETE':
-            instance = model.objects.filter(user=user, recipe=recipe)
-            if not instance.exists():
+            if not model.remove_recipe(user, recipe):
                 return Response(
                     {'errors': 'Данного рецепта нет!'},
                     status=HTTP_400_BAD_REQUEST
                 )
-            instance.delete()
             return Response(
                 {'detail': success_remove_message},
                 status=HTTP_204_NO_CONTENT
             )
 
+    def _write_favorite_and_in_shopping_cart_batch(
+            self, request, model, success_remove_message
+    ):
+        """
+        Базовый метод для пакетного добавления (удаления)
+        рецептов в избранное и список покупок.
+        """
+        serializer = RecipeIdsSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        recipe_ids = serializer.validated_data['recipes']
+        if request.method == 'POST':
+            model.add_recipes(request.user, recipe_ids)
+            return Response(
+                RecipeSerializerForSubscriptions(
+                    Recipe.objects.filter(id__in=recipe_ids),
+                    many=True,
+                    context={'request': request}
+                ).data,
+                status=HTTP_201_CREATED
+            )
+        removed_ids = model.remove_recipes(request.user, recipe_ids)
+        return Response(
+            {'detail': success_remove_message, 'deleted': len(removed_ids)},
+            status=HTTP_200_OK
+        )
+
     @action(
         methods=('post', 'delete'),
         detail=True,
@@ -117,6 +297,19 @@ class RecipeViewSet(viewsets.ModelViewSet):
             'Рецепт успешно удален из избранного!'
         )
 
+    @action(
+        methods=('post', 'delete'),
+        detail=False,
+        url_path='favorite',
+        url_name='favorite-batch',
+        permission_classes=(IsAuthenticated,)
+    )
+    def favorite_batch(self, request):
+        """Пакетное добавление (удаление) рецептов в избранное."""
+        return self._write_favorite_and_in_shopping_cart_batch(
+            request, Favorite, 'Рецепты успешно удалены из избранного!'
+        )
+
     @action(
         methods=('post', 'delete'),
         detail=True,
@@ -131,27 +324,105 @@ class RecipeViewSet(viewsets.ModelViewSet):
             'Рецепт успешно удален из списка покупок!'
         )
 
+    @action(
+        methods=('post', 'delete'),
+        detail=False,
+        url_path='shopping_cart',
+        url_name='shopping-cart-batch',
+        permission_classes=(IsAuthenticated,)
+    )
+    def shopping_cart_batch(self, request):
+        """Пакетное добавление (удаление) рецептов в список покупок."""
+        return self._write_favorite_and_in_shopping_cart_batch(
+            request, ShoppingCart, 'Рецепты успешно удалены из списка покупок!'
+        )
+
+    @action(
+        methods=('delete',),
+        detail=False,
+        url_path='shopping_cart/clear',
+        url_name='shopping-cart-clear',
+        permission_classes=(IsAuthenticated,)
+    )
+    def clear_shopping_cart(self, request):
+        """Очистка списка покупок."""
+        deleted = ShoppingCart.clear(request.user)
+        return Response(
+            {'detail': 'Список покупок очищен!', 'deleted': deleted},
+            status=HTTP_200_OK
+        )
+
     @action(
         methods=('get', ),
         detail=False,
         permission_classes=(IsAuthenticated,)
     )
     def download_shopping_cart(self, request):
-        """Скачать список покупок в формате txt."""
-        ingredients = IngredientsAmountInRecipe.objects.filter(
-            recipe__shoppingcart__user=request.user
-        ).values(
-            'ingredients__name',
-            'ingredients__measurement_unit__abbreviation'
+        """
+        Скачать список покупок в формате txt, csv или json.
+        Формат выбирается параметром ?format=, файл отдается потоком.
+        """
+        file_format = request.query_params.get(
+            'format', SHOPPING_LIST_DEFAULT_FORMAT
+        )
+        if file_format not in SHOPPING_LIST_WRITERS:
+            return Response(
+                {'errors': f'Неизвестный формат файла: {file_format}!'},
+                status=HTTP_400_BAD_REQUEST
+            )
+        writer = SHOPPING_LIST_WRITERS[file_format]()
+        rows = ShoppingListIngredient.objects.filter(
+            user=request.user
         ).order_by(
-            'ingredients__name'
-        ).annotate(ingredient_total=Sum('amount'))
-        response = HttpResponse(content_type='text/plain')
-        response['Content-Disposition'] = 'attachment; filename="shopping.txt"'
-        response.write('Список покупок\n')
-        for ingredient in ingredients:
-            abb = ingredient['ingredients__measurement_unit__abbreviation']
-            response.write(
-                f"{ingredient['ingredients__name']}: "
-                f"{ingredient['ingredient_total']} {abb} \n")
+            'ingredient__name'
+        ).values_list(
+            'ingredient__name',
+            'ingredient__measurement_unit__abbreviation',
+            'total_amount'
+        ).iterator(chunk_size=SHOPPING_LIST_CHUNK_SIZE)
+        response = StreamingHttpResponse(
+            writer.stream(rows),
+            content_type=writer.content_type
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename="shopping.{writer.format}"'
+        )
         return response
+
+    def perform_content_negotiation(self, request, force=False):
+        """
+        Параметр ?format= у выгрузки списка покупок задает формат файла,
+        а не рендерер DRF, поэтому неизвестный формат не приводит к 404.
+        """
+        return super().perform_content_negotiation(
+            request,
+            force=force or self.action == 'download_shopping_cart'
+        )
+
+
+def short_link_redirect(request, code):
+    """
+    Переадресация с короткой ссылки на страницу рецепта.
+    Соответствие кода рецепту берется из кэша, таблица рецептов не читается.
+    """
+    cache_key = f'short-link:{code}'
+    recipe_id = cache.get(cache_key)
+    CACHE_REQUESTS.labels(
+        'short_link', 'miss' if recipe_id is None else 'hit'
+    ).inc()
+    if recipe_id is None:
+        recipe_id = ShortLink.objects.filter(
+            code=code
+        ).values_list('recipe_id', flat=True).first()
+        if recipe_id is None:
+            raise Http404
+        cache.set(cache_key, recipe_id, SHORT_LINK_CACHE_TIMEOUT)
+    return HttpResponseRedirect(f'/recipes/{recipe_id}')
+
+
+@api_view(('GET',))
+@permission_classes((IsAdmin,))
+def metrics(request):
+    """Метрики в формате Prometheus; доступны только роли admin."""
+    content, content_type = export()
+    return HttpResponse(content, content_type=content_type)
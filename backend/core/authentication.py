@@ -0,0 +1,92 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core import signing
+from django.core.cache import cache
+from django.utils.functional import SimpleLazyObject
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.exceptions import AuthenticationFailed
+
+SIGNED_TOKEN_SALT = 'core.authentication.SignedTokenAuthentication'
+
+SIGNED_TOKEN_SEPARATOR = ':'
+
+TOKEN_STATE_CACHE_KEY = 'auth:token-state:{}'
+
+User = get_user_model()
+
+
+def issue_signed_token(user):
+    """
+    Подписанный HMAC токен с id пользователя, временем выдачи
+    и текущей версией токенов пользователя.
+    """
+    return signing.dumps(
+        {'id': user.pk, 'version': user.token_version},
+        salt=SIGNED_TOKEN_SALT
+    )
+
+
+def cache_token_state(user):
+    """Версия токенов и активность пользователя для проверки токенов."""
+    cache.set(
+        TOKEN_STATE_CACHE_KEY.format(user.pk),
+        (user.token_version, user.is_active),
+        settings.TOKEN_STATE_CACHE_TIMEOUT
+    )
+
+
+def forget_token_state(user_id):
+    cache.delete(TOKEN_STATE_CACHE_KEY.format(user_id))
+
+
+class LazyUser(SimpleLazyObject):
+    """
+    Аутентифицированный пользователь, который загружается из БД
+    только при обращении к его полям; id и признаки аутентификации
+    известны без запроса.
+    """
+
+    is_authenticated = True
+    is_anonymous = False
+
+    def __init__(self, user_id):
+        super().__init__(lambda: User.objects.get(pk=user_id))
+        self.__dict__['pk'] = self.__dict__['id'] = user_id
+
+    def __bool__(self):
+        return True
+
+
+class SignedTokenAuthentication(TokenAuthentication):
+    """
+    Аутентификация по подписанным токенам: подпись и срок действия
+    проверяются в процессе без обращения к таблице токенов,
+    версия токенов сверяется с кэшем, пользователь загружается
+    лениво; к БД обращение идет только при промахе кэша.
+    Токены из БД, выданные ранее, по-прежнему принимаются.
+    """
+
+    def authenticate_credentials(self, key):
+        if SIGNED_TOKEN_SEPARATOR not in key:
+            return super().authenticate_credentials(key)
+        try:
+            payload = signing.loads(
+                key,
+                salt=SIGNED_TOKEN_SALT,
+                max_age=settings.SIGNED_TOKEN_MAX_AGE
+            )
+        except signing.BadSignature:
+            raise AuthenticationFailed('Недействительный токен.')
+        state = cache.get(TOKEN_STATE_CACHE_KEY.format(payload['id']))
+        if state is not None:
+            token_version, is_active = state
+            if not is_active or token_version != payload['version']:
+                raise AuthenticationFailed('Недействительный токен.')
+            return LazyUser(payload['id']), key
+        user = User.objects.filter(pk=payload['id']).first()
+        if user is None:
+            raise AuthenticationFailed('Недействительный токен.')
+        cache_token_state(user)
+        if not user.is_active or user.token_version != payload['version']:
+            raise AuthenticationFailed('Недействительный токен.')
+        return user, key
@@ -0,0 +1,18 @@
+class HealthCheckMixin:
+    """
+    Проверка постоянного соединения перед первым запросом к базе
+    в рамках HTTP-запроса (как CONN_HEALTH_CHECKS в Django 4.1):
+    базы, к которым запрос не обращался, не проверяются.
+    Флаг сбрасывает core.routers.check_connections.
+    """
+
+    health_check_done = True
+
+    def ensure_connection(self):
+        if not self.health_check_done:
+            self.health_check_done = True
+            if (self.connection is not None
+                    and not self.in_atomic_block
+                    and not self.is_usable()):
+                self.close()
+        super().ensure_connection()
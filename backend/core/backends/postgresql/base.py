@@ -0,0 +1,7 @@
+from django.db.backends.postgresql import base
+
+from core.backends import HealthCheckMixin
+
+
+class DatabaseWrapper(HealthCheckMixin, base.DatabaseWrapper):
+    """PostgreSQL с отложенной проверкой постоянного соединения."""
@@ -0,0 +1,50 @@
+PAGE_SIZE = 6
+
+MAX_PAGE_SIZE = 100
+
+CURSOR_PAGINATION_PARAM = 'pagination'
+
+CURSOR_PAGINATION_VALUE = 'cursor'
+
+IMAGE_MAX_SIZE = (1920, 1920)
+
+IMAGE_JPEG_QUALITY = 85
+
+IMAGE_WEBP_QUALITY = 80
+
+IMAGE_DERIVATIVES_DIR = 'derivatives'
+
+IMAGE_DERIVATIVES = {
+    'thumbnail': (480, 480),
+    'detail': (1200, 1200),
+}
+
+IMAGE_UPLOAD_DIRS = ('recipes/images/', 'users/avatars/')
+
+ADMIN_LIST_PER_PAGE = 50
+
+ADMIN_EXACT_COUNT_LIMIT = 10000
+
+ADMIN_MAX_QUERIES = 10
+
+METRICS_LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10,
+)
+
+METRICS_QUERIES_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 20, 50, 100, 200)
+
+METRICS_BYTES_BUCKETS = (
+    256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304,
+)
+
+METRICS_PAGE_BUCKETS = (1, 2, 3, 5, 10, 20, 50, 100, 500, 1000)
+
+METRICS_UNRESOLVED_VIEW = 'unresolved'
+
+METRICS_HTTP_METHODS = frozenset((
+    'GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS',
+))
+
+METRICS_OTHER_METHOD = 'other'
+
+PRIMARY_PIN_CACHE_KEY = 'db:primary-pin:{}'
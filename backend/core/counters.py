@@ -0,0 +1,65 @@
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+
+
+def update_counter(queryset, field, delta):
+    """Атомарное изменение счетчика одним UPDATE без ухода ниже нуля."""
+    if delta:
+        queryset.update(**{field: Greatest(F(field) + delta, Value(0))})
+
+
+def count_subquery(model, field):
+    """Подзапрос с количеством строк model, ссылающихся на запись по field."""
+    return Coalesce(
+        Subquery(
+            model.objects.filter(
+                **{field: OuterRef('pk')}
+            ).order_by().values(field).annotate(
+                count=Count('pk')
+            ).values('count')
+        ),
+        Value(0)
+    )
+
+
+def reconcile_counters(model, counters, pks=None):
+    """
+    Исправление расхождений счетчиков с реальными данными.
+    counters: {поле счетчика: (связанная модель, поле связи)};
+    pks ограничивает сверку указанными записями.
+    Обновляются только строки с расхождением, по одному UPDATE
+    на счетчик. Возвращает {поле счетчика: число исправленных строк}.
+    """
+    rows = model.objects.all()
+    if pks is not None:
+        rows = rows.filter(pk__in=pks)
+    fixed = {}
+    for field, (related_model, related_field) in counters.items():
+        drifted = rows.annotate(
+            actual=count_subquery(related_model, related_field)
+        ).exclude(**{field: F('actual')}).values('pk')
+        fixed[field] = model.objects.filter(pk__in=drifted).update(
+            **{field: count_subquery(related_model, related_field)}
+        )
+    return fixed
+
+
+class CounterFieldsMixin:
+    """
+    Модель со счетчиками, которые меняются только атомарными UPDATE.
+    Полное сохранение уже созданного объекта не записывает счетчики:
+    значения в памяти могли устареть и затерли бы чужие изменения.
+    """
+
+    counter_fields = ()
+
+    def save(self, *args, update_fields=None, **kwargs):
+        if update_fields is None and not self._state.adding:
+            deferred = self.get_deferred_fields()
+            update_fields = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.attname not in deferred
+                and field.name not in self.counter_fields
+            ]
+        super().save(*args, update_fields=update_fields, **kwargs)
@@ -0,0 +1,129 @@
+import os
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps, features
+
+from core.constants import (IMAGE_DERIVATIVES, IMAGE_DERIVATIVES_DIR,
+                            IMAGE_JPEG_QUALITY, IMAGE_MAX_SIZE,
+                            IMAGE_WEBP_QUALITY)
+
+WEBP_SUPPORTED = features.check('webp')
+
+
+def _has_alpha(image):
+    return image.mode in ('RGBA', 'LA') or (
+        image.mode == 'P' and 'transparency' in image.info
+    )
+
+
+def _encode(image, image_format):
+    """Кодирование изображения в байты в указанном формате."""
+    buffer = BytesIO()
+    if image_format == 'JPEG':
+        if _has_alpha(image):
+            image = image.convert('RGBA')
+            background = Image.new('RGB', image.size, (255, 255, 255))
+            background.paste(image, mask=image.getchannel('A'))
+            image = background
+        image.convert('RGB').save(
+            buffer, 'JPEG', quality=IMAGE_JPEG_QUALITY,
+            optimize=True, progressive=True
+        )
+    elif image_format == 'WEBP':
+        image.save(buffer, 'WEBP', quality=IMAGE_WEBP_QUALITY, method=6)
+    else:
+        image.save(buffer, 'PNG', optimize=True)
+    return buffer.getvalue()
+
+
+def _open(file):
+    """Открытие изображения с учетом поворота из EXIF."""
+    file.seek(0)
+    image = Image.open(file)
+    image = ImageOps.exif_transpose(image)
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if _has_alpha(image) else 'RGB')
+    return image
+
+
+def normalize_image(file):
+    """
+    Приведение загруженного изображения к единому виду:
+    поворот по EXIF, ограничение размеров и перекодирование
+    в JPEG (или PNG, если есть прозрачность) без метаданных.
+    """
+    image = _open(file)
+    image.thumbnail(IMAGE_MAX_SIZE, Image.LANCZOS)
+    if _has_alpha(image):
+        ext, image_format = 'png', 'PNG'
+    else:
+        ext, image_format = 'jpg', 'JPEG'
+    return ContentFile(_encode(image, image_format), name=f'image.{ext}')
+
+
+def derivative_name(name, variant, ext):
+    """Путь производного изображения рядом с оригиналом."""
+    directory, filename = os.path.split(name)
+    stem = os.path.splitext(filename)[0]
+    return os.path.join(
+        directory, IMAGE_DERIVATIVES_DIR, f'{stem}_{variant}.{ext}'
+    )
+
+
+def derivative_names(name):
+    """Пути всех производных изображений: {вариант: путь}."""
+    names = {}
+    for variant in IMAGE_DERIVATIVES:
+        names[variant] = derivative_name(name, variant, 'jpg')
+        if WEBP_SUPPORTED:
+            names[f'{variant}_webp'] = derivative_name(name, variant, 'webp')
+    return names
+
+
+def create_derivatives(name, storage=default_storage, force=False):
+    """
+    Создание уменьшенных копий изображения (JPEG и WebP)
+    для каждого размера из IMAGE_DERIVATIVES.
+    Возвращает количество созданных файлов.
+    """
+    names = derivative_names(name)
+    if not force and all(storage.exists(path) for path in names.values()):
+        return 0
+    with storage.open(name, 'rb') as file:
+        original = _open(file)
+    created = 0
+    for variant, size in IMAGE_DERIVATIVES.items():
+        image = original.copy()
+        image.thumbnail(size, Image.LANCZOS)
+        formats = {variant: 'JPEG'}
+        if WEBP_SUPPORTED:
+            formats[f'{variant}_webp'] = 'WEBP'
+        for key, image_format in formats.items():
+            path = names[key]
+            if storage.exists(path):
+                if not force:
+                    continue
+                storage.delete(path)
+            storage.save(path, ContentFile(_encode(image, image_format)))
+            created += 1
+    return created
+
+
+def image_srcset(field_file):
+    """
+    Карта ссылок на оригинал и производные изображения.
+    Пока копии не созданы фоновой задачей, отдается только оригинал.
+    """
+    if not field_file:
+        return None
+    storage = field_file.storage
+    names = derivative_names(field_file.name)
+    srcset = {}
+    if storage.exists(next(iter(names.values()))):
+        srcset = {
+            variant: storage.url(path) for variant, path in names.items()
+        }
+    srcset['original'] = field_file.url
+    return srcset
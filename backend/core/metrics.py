@@ -0,0 +1,62 @@
+import os
+
+from prometheus_client import (CONTENT_TYPE_LATEST, REGISTRY,
+                               CollectorRegistry, Counter, Histogram,
+                               generate_latest, multiprocess)
+
+from core.constants import (METRICS_BYTES_BUCKETS, METRICS_LATENCY_BUCKETS,
+                            METRICS_PAGE_BUCKETS, METRICS_QUERIES_BUCKETS)
+
+REQUESTS = Counter(
+    'foodgram_requests_total',
+    'Запросы по обработчику, методу и коду ответа.',
+    ('view', 'method', 'status')
+)
+REQUEST_LATENCY = Histogram(
+    'foodgram_request_duration_seconds',
+    'Время обработки запроса.',
+    ('view', 'method'),
+    buckets=METRICS_LATENCY_BUCKETS
+)
+REQUEST_QUERIES = Histogram(
+    'foodgram_request_db_queries',
+    'Количество SQL-запросов на запрос.',
+    ('view',),
+    buckets=METRICS_QUERIES_BUCKETS
+)
+REQUEST_DB_TIME = Histogram(
+    'foodgram_request_db_duration_seconds',
+    'Суммарное время SQL-запросов на запрос.',
+    ('view',),
+    buckets=METRICS_LATENCY_BUCKETS
+)
+RESPONSE_BYTES = Histogram(
+    'foodgram_response_bytes',
+    'Размер тела ответа (без потоковых ответов).',
+    ('view',),
+    buckets=METRICS_BYTES_BUCKETS
+)
+PAGINATION_PAGE = Histogram(
+    'foodgram_pagination_page',
+    'Номер запрошенной страницы списка.',
+    ('view',),
+    buckets=METRICS_PAGE_BUCKETS
+)
+CACHE_REQUESTS = Counter(
+    'foodgram_cache_requests_total',
+    'Обращения к кэшу по назначению и результату.',
+    ('cache', 'result')
+)
+
+
+def export():
+    """
+    Метрики в текстовом формате Prometheus. Если задан
+    PROMETHEUS_MULTIPROC_DIR, значения собираются из файлов
+    всех процессов gunicorn.
+    """
+    registry = REGISTRY
+    if os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    return generate_latest(registry), CONTENT_TYPE_LATEST
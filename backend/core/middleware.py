@@ -0,0 +1,174 @@
+import json
+import logging
+import random
+from contextlib import ExitStack
+from contextvars import ContextVar
+from time import perf_counter
+
+from django.conf import settings
+from django.db import connections
+
+from core.constants import (METRICS_HTTP_METHODS, METRICS_OTHER_METHOD,
+                            METRICS_UNRESOLVED_VIEW)
+from core.metrics import (REQUEST_DB_TIME, REQUEST_LATENCY, REQUEST_QUERIES,
+                          REQUESTS, RESPONSE_BYTES)
+
+logger = logging.getLogger('foodgram.requests')
+
+_timings = ContextVar('request_timings', default=None)
+
+
+class RequestTimings:
+    """
+    Замеры одного запроса. Экземпляр служит и оберткой выполнения
+    SQL (connection.execute_wrapper): считает запросы и их время.
+    """
+
+    def __init__(self):
+        self.started = perf_counter()
+        self.queries = 0
+        self.db = 0.0
+        self.serializer = 0.0
+        self.serializing = False
+        self.view_started = None
+        self.view_finished = None
+
+    def __call__(self, execute, sql, params, many, context):
+        started = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db += perf_counter() - started
+            self.queries += 1
+
+    def metrics(self, finished):
+        """Длительности этапов в миллисекундах."""
+        total = finished - self.started
+        view = render = 0.0
+        if self.view_started is not None:
+            view_finished = self.view_finished or finished
+            view = view_finished - self.view_started
+            render = finished - view_finished
+        return {
+            'db': self.db * 1000,
+            'serializer': self.serializer * 1000,
+            'view': view * 1000,
+            'render': render * 1000,
+            'app': (total - view - render) * 1000,
+            'total': total * 1000,
+        }
+
+
+def current_timings():
+    """Замеры текущего запроса или None, если запрос не попал в выборку."""
+    return _timings.get()
+
+
+def http_method(request):
+    """Метод запроса; нестандартные методы объединяются в other."""
+    if request.method in METRICS_HTTP_METHODS:
+        return request.method
+    return METRICS_OTHER_METHOD
+
+
+def view_name(request):
+    """Имя обработчика: Вьюсет.действие для DRF, иначе путь к функции."""
+    match = request.resolver_match
+    if match is None:
+        return None
+    view_class = getattr(match.func, 'cls', None)
+    actions = getattr(match.func, 'actions', None)
+    if view_class is not None and actions:
+        method = http_method(request)
+        action = actions.get(method.lower(), method.lower())
+        return f'{view_class.__name__}.{action}'
+    return match.view_name or match._func_path
+
+
+class ServerTimingMiddleware:
+    """
+    Замеры доли запросов (SERVER_TIMING_SAMPLE_RATE): количество
+    и время SQL-запросов, время представления, сериализаторов
+    и отрисовки, размер ответа. Результат отдается в заголовке
+    Server-Timing и пишется одной JSON-строкой в лог foodgram.requests.
+    Тело потоковых ответов формируется позже и в замеры не входит.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if random.random() >= settings.SERVER_TIMING_SAMPLE_RATE:
+            return self.get_response(request)
+        timings = RequestTimings()
+        token = _timings.set(timings)
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(timings))
+                response = self.get_response(request)
+        finally:
+            _timings.reset(token)
+        metrics = timings.metrics(perf_counter())
+        response['Server-Timing'] = ', '.join(
+            f'{name};dur={duration:.1f}'
+            + (f';desc="{timings.queries} queries"' if name == 'db' else '')
+            for name, duration in metrics.items()
+        )
+        logger.info(json.dumps({
+            'view': view_name(request),
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'queries': timings.queries,
+            **{
+                f'{name}_ms': round(duration, 2)
+                for name, duration in metrics.items()
+            },
+            'bytes': (
+                None if response.streaming else len(response.content)
+            ),
+        }, ensure_ascii=False))
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        timings = _timings.get()
+        if timings is not None:
+            timings.view_started = perf_counter()
+
+    def process_template_response(self, request, response):
+        """Ответы DRF отрисовываются после этого вызова."""
+        timings = _timings.get()
+        if timings is not None:
+            timings.view_finished = perf_counter()
+        return response
+
+
+class MetricsMiddleware:
+    """
+    Метрики Prometheus для каждого запроса: время обработки,
+    количество и время SQL-запросов, размер ответа и коды ответов
+    с разбивкой по обработчику (Вьюсет.действие). Нестандартные
+    HTTP-методы объединяются в метку other, чтобы число рядов
+    метрик не зависело от клиентов.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timings = RequestTimings()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(timings))
+            response = self.get_response(request)
+        elapsed = perf_counter() - timings.started
+        view = view_name(request) or METRICS_UNRESOLVED_VIEW
+        method = http_method(request)
+        REQUESTS.labels(view, method, response.status_code).inc()
+        REQUEST_LATENCY.labels(view, method).observe(elapsed)
+        REQUEST_QUERIES.labels(view).observe(timings.queries)
+        REQUEST_DB_TIME.labels(view).observe(timings.db)
+        if not response.streaming:
+            RESPONSE_BYTES.labels(view).observe(len(response.content))
+        return response
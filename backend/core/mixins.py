@@ -0,0 +1,100 @@
+from datetime import datetime
+from hashlib import md5
+
+from django.core.exceptions import ValidationError
+from django.utils.cache import (get_conditional_response, patch_cache_control,
+                                patch_vary_headers)
+from django.utils.http import http_date, quote_etag
+from rest_framework.permissions import SAFE_METHODS
+
+from core.routers import (is_pinned_to_primary, pin_to_primary,
+                          read_from_replica, reset_read_from_replica)
+
+
+class ConditionalRetrieveMixin:
+    """
+    Условный GET для retrieve: ETag и Last-Modified вычисляются
+    одним запросом версии объекта, и на If-None-Match/If-Modified-Since
+    возвращается 304 без запуска сериализаторов. Last-Modified
+    отдается только для версий из одних дат.
+    """
+
+    def get_version_queryset(self):
+        """Queryset, из которого берутся поля версии объекта."""
+        return self.get_queryset()
+
+    def get_version_fields(self):
+        """Поля, изменение которых меняет представление объекта."""
+        return ('updated_at',)
+
+    def get_version(self):
+        """
+        Версия объекта или None, если объект не найден или значение
+        из URL некорректно: тогда 404 вернет get_object().
+        """
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            return self.get_version_queryset().filter(
+                **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+            ).values_list(*self.get_version_fields()).first()
+        except (TypeError, ValueError, ValidationError):
+            return None
+
+    def retrieve(self, request, *args, **kwargs):
+        version = self.get_version()
+        if version is None:
+            return super().retrieve(request, *args, **kwargs)
+        etag = quote_etag(md5(repr(version).encode()).hexdigest())
+        last_modified = None
+        # Last-Modified отдается, только если версия состоит из дат:
+        # изменение счетчиков и отметок не меняет время изменения,
+        # и If-Modified-Since вернул бы 304 на устаревшее представление.
+        if request.user.is_anonymous and all(
+                isinstance(value, datetime) for value in version
+        ):
+            last_modified = int(max(value.timestamp() for value in version))
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = super().retrieve(request, *args, **kwargs)
+        response['ETag'] = etag
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified)
+        patch_cache_control(response, no_cache=True)
+        patch_vary_headers(response, ('Authorization',))
+        return response
+
+
+class ReplicaReadMixin:
+    """
+    Чтение с реплик для безопасных запросов к вьюсету
+    (для действий из replica_actions, если они заданы).
+    После изменяющего запроса пользователь закрепляется за основной
+    базой, чтобы сразу видеть свои изменения.
+    """
+
+    replica_actions = None
+
+    def dispatch(self, request, *args, **kwargs):
+        token = read_from_replica(False)
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        finally:
+            reset_read_from_replica(token)
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if request.method not in SAFE_METHODS:
+            return
+        if (self.replica_actions is None
+                or self.action in self.replica_actions):
+            read_from_replica(not is_pinned_to_primary(request.user))
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(
+            request, response, *args, **kwargs
+        )
+        if request.method not in SAFE_METHODS and response.status_code < 400:
+            pin_to_primary(request.user)
+        return response
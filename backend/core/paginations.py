@@ -1,6 +1,99 @@
-from rest_framework.pagination import PageNumberPagination
+import json
+from hashlib import md5
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.core.exceptions import EmptyResultSet
+from django.db import connections
+from django.utils.functional import cached_property
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+
+from core.constants import ADMIN_EXACT_COUNT_LIMIT, MAX_PAGE_SIZE, PAGE_SIZE
+from core.metrics import PAGINATION_PAGE
+from core.middleware import view_name
+
+
+class CachedCountPaginator(Paginator):
+    """
+    Пагинатор, кэширующий COUNT(*) по тексту запроса
+    на PAGINATION_COUNT_CACHE_TIMEOUT секунд (0 - без кэширования).
+    """
+
+    @cached_property
+    def count(self):
+        timeout = settings.PAGINATION_COUNT_CACHE_TIMEOUT
+        query = getattr(self.object_list, 'query', None)
+        if not timeout or query is None:
+            return super().count
+        try:
+            sql = str(query)
+        except EmptyResultSet:
+            return 0
+        key = f'pagination:count:{md5(sql.encode()).hexdigest()}'
+        count = cache.get(key)
+        if count is None:
+            count = self.object_list.count()
+            cache.set(key, count, timeout)
+        return count
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Пагинатор для админ-зоны: в Postgres количество строк берется
+    из оценки планировщика (EXPLAIN по статистике таблиц),
+    точный COUNT(*) выполняется, только если строк меньше
+    ADMIN_EXACT_COUNT_LIMIT.
+    """
+
+    @cached_property
+    def count(self):
+        query = getattr(self.object_list, 'query', None)
+        if query is None:
+            return super().count
+        connection = connections[self.object_list.db]
+        if connection.vendor != 'postgresql':
+            return super().count
+        try:
+            sql, params = self.object_list.order_by().values(
+                'pk'
+            ).query.sql_with_params()
+        except EmptyResultSet:
+            return 0
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        estimate = int(plan[0]['Plan']['Plan Rows'])
+        if estimate < ADMIN_EXACT_COUNT_LIMIT:
+            return super().count
+        return estimate
 
 
 class ApiPagination(PageNumberPagination):
     page_size_query_param = 'limit'
-    page_size = 6
+    page_size = PAGE_SIZE
+    max_page_size = MAX_PAGE_SIZE
+    django_paginator_class = CachedCountPaginator
+
+    def paginate_queryset(self, queryset, request, view=None):
+        """Номер запрошенной страницы попадает в метрики глубины."""
+        page = super().paginate_queryset(queryset, request, view)
+        if page is not None:
+            PAGINATION_PAGE.labels(view_name(request)).observe(
+                self.page.number
+            )
+        return page
+
+
+class RecipeCursorPagination(CursorPagination):
+    """
+    Курсорная пагинация ленты рецептов без COUNT(*) и OFFSET,
+    опирается на составной индекс (pub_date, id).
+    """
+
+    ordering = ('-pub_date', '-id')
+    page_size_query_param = 'limit'
+    page_size = PAGE_SIZE
+    max_page_size = MAX_PAGE_SIZE
@@ -31,3 +31,10 @@ class IsOwnerAdminOrReadOnlyPermission(permissions.BasePermission):
         return (request.method in permissions.SAFE_METHODS
                 or obj.author == request.user
                 or request.user.admin)
+
+
+class IsAdmin(permissions.BasePermission):
+    """Все запросы только для администратора (роль admin)."""
+
+    def has_permission(self, request, view):
+        return request.user.is_authenticated and request.user.admin
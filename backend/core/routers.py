@@ -0,0 +1,76 @@
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from core.constants import PRIMARY_PIN_CACHE_KEY
+
+_read_from_replica = ContextVar('read_from_replica', default=False)
+
+
+def read_from_replica(enabled=True):
+    """
+    Разрешает (или запрещает) чтение с реплик в текущем контексте;
+    возвращает токен для сброса через reset_read_from_replica.
+    """
+    return _read_from_replica.set(enabled)
+
+
+def reset_read_from_replica(token):
+    _read_from_replica.reset(token)
+
+
+def pin_to_primary(user):
+    """
+    После записи пользователь читает с основной базы
+    REPLICA_PIN_SECONDS секунд, пока реплики догоняют изменения.
+    """
+    if user.is_authenticated and settings.DATABASE_REPLICAS:
+        cache.set(
+            PRIMARY_PIN_CACHE_KEY.format(user.pk), True,
+            settings.REPLICA_PIN_SECONDS
+        )
+
+
+def is_pinned_to_primary(user):
+    return user.is_authenticated and bool(
+        cache.get(PRIMARY_PIN_CACHE_KEY.format(user.pk))
+    )
+
+
+class ReplicaRouter:
+    """
+    Чтение с одной из реплик DATABASE_REPLICAS, если это разрешено
+    в текущем контексте (read_from_replica), иначе - с основной базы.
+    Запись и миграции - только в основную базу.
+    """
+
+    def db_for_read(self, model, **hints):
+        replicas = settings.DATABASE_REPLICAS
+        if replicas and _read_from_replica.get():
+            return random.choice(replicas)
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
+
+
+def check_connections(**kwargs):
+    """
+    Начало запроса: постоянные соединения будут проверены перед первым
+    обращением к своей базе (core.backends.HealthCheckMixin), чтобы
+    разорванное соединение было открыто заново, а не дало ошибку
+    в середине обработки. Сам сигнал к базе не обращается.
+    """
+    if not settings.DB_CONN_HEALTH_CHECKS:
+        return
+    for connection in connections.all():
+        connection.health_check_done = False
@@ -1,13 +1,38 @@
 import base64
+from time import perf_counter
 
 from django.core.files.base import ContentFile
 from rest_framework import serializers
 
+from core.authentication import issue_signed_token
+from core.images import image_srcset
+from core.middleware import current_timings
+
+
+class TimedRepresentationMixin:
+    """
+    Учет времени сериализации в замерах запроса; вложенные
+    сериализаторы входят во время внешнего и отдельно не считаются.
+    """
+
+    def to_representation(self, instance):
+        timings = current_timings()
+        if timings is None or timings.serializing:
+            return super().to_representation(instance)
+        timings.serializing = True
+        started = perf_counter()
+        try:
+            return super().to_representation(instance)
+        finally:
+            timings.serializer += perf_counter() - started
+            timings.serializing = False
+
 
 class Base64ImageField(serializers.ImageField):
     """
     Пользовательское поле сериализатора
     для обработки изображений в формате Base64.
+    Нормализация и уменьшенные копии создаются фоновой задачей.
     """
 
     def to_internal_value(self, data):
@@ -16,3 +41,29 @@ class Base64ImageField(serializers.ImageField):
             ext = format.split('/')[-1]
             data = ContentFile(base64.b64decode(imgstr), name='temp.' + ext)
         return super().to_internal_value(data)
+
+
+class ImageSrcsetField(serializers.ReadOnlyField):
+    """
+    Поле со ссылками на оригинал изображения
+    и его уменьшенные копии: {вариант: ссылка}.
+    """
+
+    def to_representation(self, value):
+        srcset = image_srcset(value)
+        request = self.context.get('request')
+        if srcset is None or request is None:
+            return srcset
+        return {
+            variant: request.build_absolute_uri(url)
+            for variant, url in srcset.items()
+        }
+
+
+class SignedTokenSerializer(serializers.Serializer):
+    """Сериализатор ответа на вход с подписанным токеном."""
+
+    auth_token = serializers.SerializerMethodField()
+
+    def get_auth_token(self, token):
+        return issue_signed_token(token.user)
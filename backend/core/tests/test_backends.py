@@ -0,0 +1,95 @@
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from django.db import connections
+from django.db.backends.sqlite3.base import DatabaseWrapper
+from django.test import SimpleTestCase, override_settings
+
+from core.backends import HealthCheckMixin
+from core.routers import check_connections
+
+SETTINGS = {
+    'OPTIONS': {}, 'TIME_ZONE': None,
+    'CONN_MAX_AGE': 60, 'AUTOCOMMIT': True, 'ATOMIC_REQUESTS': False,
+    'USER': '', 'PASSWORD': '', 'HOST': '', 'PORT': '', 'TEST': {},
+}
+
+
+class HealthCheckWrapper(HealthCheckMixin, DatabaseWrapper):
+    """SQLite с отложенной проверкой соединения."""
+
+
+class HealthCheckTest(SimpleTestCase):
+    """
+    Соединение проверяется один раз за запрос и только перед
+    обращением к базе; разорванное соединение открывается заново.
+    """
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.wrapper = HealthCheckWrapper(
+            {**SETTINGS, 'NAME': str(Path(directory.name) / 'health.db')},
+            alias='health'
+        )
+        self.wrapper.ensure_connection()
+        self.addCleanup(self.wrapper.close)
+
+    def query(self):
+        with self.wrapper.cursor() as cursor:
+            cursor.execute('SELECT 1')
+
+    def test_checked_once_per_request(self):
+        self.wrapper.health_check_done = False
+        with mock.patch.object(
+            self.wrapper, 'is_usable', return_value=True
+        ) as is_usable:
+            self.query()
+            self.query()
+        is_usable.assert_called_once()
+
+    def test_not_checked_without_request(self):
+        with mock.patch.object(self.wrapper, 'is_usable') as is_usable:
+            self.query()
+        is_usable.assert_not_called()
+
+    def test_broken_connection_reopened(self):
+        connection = self.wrapper.connection
+        self.wrapper.health_check_done = False
+        with mock.patch.object(
+            self.wrapper, 'is_usable', return_value=False
+        ):
+            self.query()
+        self.assertIsNot(self.wrapper.connection, connection)
+
+    def test_not_checked_in_atomic_block(self):
+        self.wrapper.health_check_done = False
+        with mock.patch.object(self.wrapper, 'is_usable') as is_usable:
+            self.wrapper.in_atomic_block = True
+            try:
+                self.query()
+            finally:
+                self.wrapper.in_atomic_block = False
+        is_usable.assert_not_called()
+
+
+class CheckConnectionsTest(SimpleTestCase):
+    """Сигнал начала запроса только помечает соединения."""
+
+    def test_marks_without_queries(self):
+        connection = connections['default']
+        with mock.patch.object(
+            type(connection), 'is_usable'
+        ) as is_usable:
+            check_connections()
+        is_usable.assert_not_called()
+        self.assertFalse(connection.health_check_done)
+        connection.health_check_done = True
+
+    @override_settings(DB_CONN_HEALTH_CHECKS=False)
+    def test_disabled(self):
+        connection = connections['default']
+        connection.health_check_done = True
+        check_connections()
+        self.assertTrue(connection.health_check_done)
@@ -0,0 +1,50 @@
+from api.tests.base import SeededAPITestCase
+from recipes.models import Recipe
+
+RECIPES_URL = '/api/recipes/'
+
+
+class ConditionalRetrieveTest(SeededAPITestCase):
+    """ETag и условный GET для рецептов и пользователей."""
+
+    def setUp(self):
+        super().setUp()
+        self.recipe = Recipe.objects.filter(author=self.user).first()
+        self.url = f'{RECIPES_URL}{self.recipe.pk}/'
+
+    def test_etag_and_vary(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['ETag'])
+        self.assertIn('Authorization', response['Vary'])
+        self.assertIn('no-cache', response['Cache-Control'])
+
+    def test_if_none_match(self):
+        etag = self.client.get(self.url)['ETag']
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        self.assertFalse(response.content)
+
+    def test_etag_changes_after_edit(self):
+        etag = self.client.get(self.url)['ETag']
+        response = self.client.patch(
+            self.url, {'name': 'Новое название'}, format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_etag_changes_after_favorite(self):
+        self.client.delete(f'{self.url}favorite/')
+        etag = self.client.get(self.url)['ETag']
+        self.client.post(f'{self.url}favorite/')
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_invalid_lookup_returns_404(self):
+        for url in (f'{RECIPES_URL}abc/', '/api/users/abc/',
+                    f'{RECIPES_URL}0/'):
+            with self.subTest(url=url):
+                self.assertEqual(self.client.get(url).status_code, 404)
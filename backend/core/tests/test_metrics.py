@@ -0,0 +1,42 @@
+from prometheus_client import REGISTRY
+from rest_framework.test import APIClient
+
+from api.tests.base import SeededAPITestCase
+from core.constants import METRICS_OTHER_METHOD
+from users.models import User
+
+METRICS_URL = '/metrics'
+TAGS_URL = '/api/tags/'
+
+
+class MetricsTest(SeededAPITestCase):
+    """Метрики Prometheus: доступ и метки запросов."""
+
+    def test_access(self):
+        admin = User.objects.exclude(pk=self.user.pk).first()
+        admin.role = User.Roles.ADMIN
+        admin.save(update_fields=('role',))
+        admin_client = APIClient()
+        admin_client.force_authenticate(admin)
+        self.assertEqual(self.anon.get(METRICS_URL).status_code, 401)
+        self.assertEqual(self.client.get(METRICS_URL).status_code, 403)
+        response = admin_client.get(METRICS_URL)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('text/plain', response['Content-Type'])
+        self.assertIn(b'foodgram_requests_total', response.content)
+
+    def test_unknown_method_label(self):
+        labels = {'view': 'TagViewSet.other', 'status': '405'}
+
+        def requests(method):
+            return REGISTRY.get_sample_value(
+                'foodgram_requests_total', {**labels, 'method': method}
+            ) or 0
+
+        before = requests(METRICS_OTHER_METHOD)
+        for method in ('PROPFIND', 'BREW'):
+            response = self.anon.generic(method, TAGS_URL)
+            self.assertEqual(response.status_code, 405)
+        self.assertEqual(requests(METRICS_OTHER_METHOD), before + 2)
+        self.assertEqual(requests('PROPFIND'), 0)
+        self.assertEqual(requests('BREW'), 0)
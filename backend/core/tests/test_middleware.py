@@ -0,0 +1,27 @@
+import json
+
+from django.test import override_settings
+
+from api.tests.base import SeededAPITestCase
+
+TAGS_URL = '/api/tags/'
+
+
+class ServerTimingMiddlewareTest(SeededAPITestCase):
+    """Замеры только для доли запросов SERVER_TIMING_SAMPLE_RATE."""
+
+    @override_settings(SERVER_TIMING_SAMPLE_RATE=1)
+    def test_sampled(self):
+        with self.assertLogs('foodgram.requests') as logs:
+            response = self.anon.get(TAGS_URL)
+        self.assertIn('db;dur=', response['Server-Timing'])
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(record['path'], TAGS_URL)
+        self.assertEqual(record['status'], 200)
+        self.assertEqual(record['bytes'], len(response.content))
+
+    @override_settings(SERVER_TIMING_SAMPLE_RATE=0)
+    def test_not_sampled(self):
+        with self.assertNoLogs('foodgram.requests'):
+            response = self.anon.get(TAGS_URL)
+        self.assertNotIn('Server-Timing', response)
@@ -0,0 +1,83 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test import override_settings
+
+from api.tests.base import SeededAPITestCase
+from core.routers import ReplicaRouter
+
+REPLICA = 'replica'
+RECIPES_URL = '/api/recipes/'
+
+
+class RecordingRouter(ReplicaRouter):
+    """ReplicaRouter, запоминающий базы для чтения."""
+
+    reads = []
+
+    def db_for_read(self, model, **hints):
+        alias = super().db_for_read(model, **hints)
+        self.reads.append(alias)
+        return alias
+
+
+class ReplicaRoutingTest(SeededAPITestCase):
+    """
+    Чтение с реплики для безопасных запросов и закрепление
+    пользователя за основной базой после записи. Реплика - то же
+    соединение, что и основная база, поэтому видит данные теста.
+    """
+
+    def setUp(self):
+        super().setUp()
+        replica_settings = override_settings(
+            DATABASES={
+                **settings.DATABASES,
+                REPLICA: {
+                    **settings.DATABASES[DEFAULT_DB_ALIAS],
+                    'TEST': {'MIRROR': DEFAULT_DB_ALIAS},
+                },
+            },
+            DATABASE_ROUTERS=[
+                f'{RecordingRouter.__module__}.RecordingRouter'
+            ],
+            DATABASE_REPLICAS=[REPLICA],
+        )
+        replica_settings.enable()
+        self.addCleanup(replica_settings.disable)
+        connections[REPLICA] = connections[DEFAULT_DB_ALIAS]
+        self.addCleanup(connections.__delitem__, REPLICA)
+        RecordingRouter.reads.clear()
+
+    def get_reads(self, client, url):
+        RecordingRouter.reads.clear()
+        response = client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return set(RecordingRouter.reads)
+
+    def test_safe_read_uses_replica(self):
+        self.assertEqual(self.get_reads(self.anon, RECIPES_URL), {REPLICA})
+        self.assertEqual(self.get_reads(self.client, RECIPES_URL), {REPLICA})
+
+    def test_write_pins_to_primary(self):
+        recipe_id = self.recipe_ids[-1]
+        url = f'{RECIPES_URL}{recipe_id}/shopping_cart/'
+        self.client.delete(url)
+        RecordingRouter.reads.clear()
+        response = self.client.post(url)
+        self.assertEqual(response.status_code, 201)
+        self.assertNotIn(REPLICA, RecordingRouter.reads)
+        self.assertEqual(
+            self.get_reads(self.client, RECIPES_URL), {DEFAULT_DB_ALIAS}
+        )
+        self.assertEqual(self.get_reads(self.anon, RECIPES_URL), {REPLICA})
+
+    def test_reads_replica_after_pin_expires(self):
+        url = f'{RECIPES_URL}{self.recipe_ids[-1]}/favorite/'
+        self.client.delete(url)
+        self.assertEqual(self.client.post(url).status_code, 201)
+        self.assertEqual(
+            self.get_reads(self.client, RECIPES_URL), {DEFAULT_DB_ALIAS}
+        )
+        cache.clear()
+        self.assertEqual(self.get_reads(self.client, RECIPES_URL), {REPLICA})
@@ -28,10 +28,13 @@ INSTALLED_APPS = [
     'users.apps.UsersConfig',
     'api.apps.ApiConfig',
     'core.apps.CoreConfig',
+    'jobs.apps.JobsConfig',
     'import_export',
 ]
 
 MIDDLEWARE = [
+    'core.middleware.MetricsMiddleware',
+    'core.middleware.ServerTimingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -64,15 +67,87 @@ WSGI_APPLICATION = 'foodgram_backend.wsgi.application'
 
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.postgresql',
+        'ENGINE': 'core.backends.postgresql',
         'NAME': os.getenv('POSTGRES_DB', 'foodgram'),
         'USER': os.getenv('POSTGRES_USER', 'foodgram_user'),
         'PASSWORD': os.getenv('POSTGRES_PASSWORD', 'foodgram_password'),
         'HOST': os.getenv('DB_HOST', 'localhost'),
-        'PORT': os.getenv('DB_PORT', 5432)
+        'PORT': os.getenv('DB_PORT', 5432),
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', 60)),
     }
 }
 
+# Реплики для чтения: DB_REPLICA_HOSTS=host1,host2:5433. В тестах
+# реплики указывают на тестовую копию основной базы (MIRROR).
+DATABASE_REPLICAS = []
+for number, address in enumerate(
+        filter(None, os.getenv('DB_REPLICA_HOSTS', '').split(',')), 1
+):
+    host, _, port = address.strip().partition(':')
+    alias = f'replica_{number}'
+    DATABASES[alias] = {
+        **DATABASES['default'],
+        'HOST': host,
+        'PORT': port or DATABASES['default']['PORT'],
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ['core.routers.ReplicaRouter']
+
+# Проверка постоянного соединения перед первым обращением к базе
+# в каждом запросе (core.backends.HealthCheckMixin).
+DB_CONN_HEALTH_CHECKS = os.getenv(
+    'DB_CONN_HEALTH_CHECKS', 'True'
+).lower() in ('true', '1')
+
+# Сколько секунд после записи пользователь читает с основной базы.
+REPLICA_PIN_SECONDS = int(os.getenv('REPLICA_PIN_SECONDS', 5))
+
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv(
+            'CACHE_BACKEND',
+            'django.core.cache.backends.filebased.FileBasedCache'
+        ),
+        'LOCATION': os.getenv('CACHE_LOCATION', '/tmp/foodgram_cache'),
+    }
+}
+
+RECIPES_LIST_CACHE_TIMEOUT = int(os.getenv('RECIPES_LIST_CACHE_TIMEOUT', 60))
+
+PAGINATION_COUNT_CACHE_TIMEOUT = int(
+    os.getenv('PAGINATION_COUNT_CACHE_TIMEOUT', 0)
+)
+
+# Доля запросов с заголовком Server-Timing и записью в лог
+# foodgram.requests: 0 - выключено, 1 - каждый запрос (включается
+# явно, например SERVER_TIMING_SAMPLE_RATE=1 при локальной отладке).
+SERVER_TIMING_SAMPLE_RATE = float(
+    os.getenv('SERVER_TIMING_SAMPLE_RATE', 0.05)
+)
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'message': {'format': '%(message)s'},
+    },
+    'handlers': {
+        'requests': {
+            'class': 'logging.StreamHandler',
+            'formatter': 'message',
+        },
+    },
+    'loggers': {
+        'foodgram.requests': {
+            'handlers': ['requests'],
+            'level': os.getenv('REQUESTS_LOG_LEVEL', 'INFO'),
+            'propagate': False,
+        },
+    },
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
@@ -128,14 +203,21 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.IsAuthenticated',
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'core.authentication.SignedTokenAuthentication',
     ],
 }
 
+SIGNED_TOKEN_MAX_AGE = int(os.getenv('SIGNED_TOKEN_MAX_AGE', 60 * 60 * 24 * 30))
+
+TOKEN_STATE_CACHE_TIMEOUT = int(os.getenv('TOKEN_STATE_CACHE_TIMEOUT', 300))
+
 DJOSER = {
     'PERMISSIONS': {
         'token_create': ['rest_framework.permissions.AllowAny'],
         'user': ['core.permissions.IsOwnerAdminOrReadOnlyPermission'],
         'user_list': ['core.permissions.IsOwnerAdminOrReadOnlyPermission'],
-    }
+    },
+    'SERIALIZERS': {
+        'token': 'core.serializers.SignedTokenSerializer',
+    },
 }
@@ -0,0 +1,22 @@
+from django.contrib import admin
+from django.contrib.admin import ModelAdmin
+
+from jobs.models import Job
+from recipes.mixins import ScalableAdminMixin
+
+
+@admin.register(Job)
+class JobAdmin(ScalableAdminMixin, ModelAdmin):
+    """Класс для настройки админ-зоны модели Job."""
+
+    list_display = (
+        'id',
+        'name',
+        'status',
+        'attempts',
+        'run_at',
+        'created_at',
+    )
+    list_filter = ('status',)
+    search_fields = ('name',)
+    readonly_fields = ('created_at', 'locked_at', 'last_error')
@@ -0,0 +1,15 @@
+LENGTH_JOB_NAME = 150
+
+LENGTH_JOB_STATUS = 16
+
+MAX_DISPLAY_LENGTH = 50
+
+JOB_MAX_ATTEMPTS = 5
+
+JOB_RETRY_DELAY = 10
+
+JOB_LOCK_TIMEOUT = 600
+
+JOB_POLL_INTERVAL = 1
+
+WORKERS_CONCURRENCY = 2
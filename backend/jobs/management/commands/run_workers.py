@@ -0,0 +1,73 @@
+import multiprocessing
+import signal
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from django.core.management.base import BaseCommand
+
+from jobs.constants import JOB_POLL_INTERVAL, WORKERS_CONCURRENCY
+from jobs.models import Job
+from jobs.worker import init_worker, run_job
+
+
+class Command(BaseCommand):
+    help = 'Запускает обработчики фоновых задач из очереди.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=WORKERS_CONCURRENCY,
+            help='Количество процессов-обработчиков.'
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=JOB_POLL_INTERVAL,
+            help='Пауза между опросами пустой очереди, секунд.'
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Завершиться, когда очередь опустеет.'
+        )
+
+    def handle(self, *args, concurrency, poll_interval, once, **options):
+        self.stopping = False
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        done = failed = 0
+        running = {}
+        with ProcessPoolExecutor(
+            max_workers=concurrency,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=init_worker
+        ) as pool:
+            while not self.stopping or running:
+                free = concurrency - len(running)
+                if free > 0 and not self.stopping:
+                    for job_id in Job.claim(free):
+                        running[pool.submit(run_job, job_id)] = job_id
+                if not running:
+                    if once:
+                        break
+                    time.sleep(poll_interval)
+                    continue
+                finished, _ = wait(
+                    running, timeout=poll_interval,
+                    return_when=FIRST_COMPLETED
+                )
+                for future in finished:
+                    job_id = running.pop(future)
+                    if future.exception() is None and future.result():
+                        done += 1
+                    else:
+                        failed += 1
+                        self.stderr.write(f'Задача #{job_id} не выполнена.')
+        self.stdout.write(self.style.SUCCESS(
+            f'Выполнено задач: {done}, с ошибкой: {failed}.'
+        ))
+
+    def stop(self, signum, frame):
+        """Остановка приема новых задач с ожиданием запущенных."""
+        self.stopping = True
@@ -0,0 +1,155 @@
+import traceback
+from datetime import timedelta
+
+from django.db import models, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from jobs.constants import (JOB_LOCK_TIMEOUT, JOB_MAX_ATTEMPTS,
+                            JOB_RETRY_DELAY, LENGTH_JOB_NAME,
+                            LENGTH_JOB_STATUS, MAX_DISPLAY_LENGTH)
+from jobs.registry import TASKS
+
+
+class Job(models.Model):
+    """
+    Модель, описывающая фоновую задачу в очереди.
+    Задачи забираются обработчиками через SELECT ... FOR UPDATE
+    SKIP LOCKED и при ошибке повторяются с растущей задержкой.
+    """
+
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUSES = (
+        (PENDING, 'Ожидает'),
+        (RUNNING, 'Выполняется'),
+        (DONE, 'Выполнена'),
+        (FAILED, 'Ошибка'),
+    )
+
+    name = models.CharField(
+        max_length=LENGTH_JOB_NAME,
+        verbose_name='Задача'
+    )
+    payload = models.JSONField(
+        default=dict,
+        verbose_name='Параметры'
+    )
+    status = models.CharField(
+        max_length=LENGTH_JOB_STATUS,
+        choices=STATUSES,
+        default=PENDING,
+        verbose_name='Статус'
+    )
+    attempts = models.PositiveSmallIntegerField(
+        default=0,
+        verbose_name='Попыток'
+    )
+    max_attempts = models.PositiveSmallIntegerField(
+        default=JOB_MAX_ATTEMPTS,
+        verbose_name='Максимум попыток'
+    )
+    run_at = models.DateTimeField(
+        default=timezone.now,
+        verbose_name='Запустить после'
+    )
+    locked_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Взята в работу'
+    )
+    last_error = models.TextField(
+        blank=True,
+        verbose_name='Последняя ошибка'
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Дата создания'
+    )
+
+    class Meta:
+        verbose_name = 'Фоновая задача'
+        verbose_name_plural = 'Фоновые задачи'
+        ordering = ('run_at', 'id')
+        indexes = (
+            models.Index(
+                fields=('status', 'run_at'),
+                name='job_status_run_at_idx'
+            ),
+        )
+
+    def __str__(self):
+        return f'{self.name} #{self.id} {self.status}'[:MAX_DISPLAY_LENGTH]
+
+    @classmethod
+    def enqueue(cls, name, **payload):
+        """Постановка задачи в очередь."""
+        return cls.objects.create(name=name, payload=payload)
+
+    @classmethod
+    def enqueue_many(cls, name, payloads):
+        """Постановка в очередь пачки задач одним запросом."""
+        return cls.objects.bulk_create(
+            cls(name=name, payload=payload) for payload in payloads
+        )
+
+    @classmethod
+    def claim(cls, limit):
+        """
+        Захват до limit готовых к запуску задач.
+        Задачи, заблокированные другими обработчиками, пропускаются;
+        зависшие дольше JOB_LOCK_TIMEOUT задачи забираются повторно.
+        """
+        now = timezone.now()
+        with transaction.atomic():
+            ids = list(
+                cls.objects.select_for_update(skip_locked=True).filter(
+                    Q(status=cls.PENDING, run_at__lte=now)
+                    | Q(
+                        status=cls.RUNNING,
+                        locked_at__lt=now - timedelta(
+                            seconds=JOB_LOCK_TIMEOUT
+                        )
+                    )
+                ).order_by('run_at', 'id').values_list('id', flat=True)[
+                    :limit
+                ]
+            )
+            cls.objects.filter(id__in=ids).update(
+                status=cls.RUNNING,
+                locked_at=now,
+                attempts=F('attempts') + 1
+            )
+        return ids
+
+    def retry_delay(self):
+        """Задержка перед повтором: удваивается с каждой попыткой."""
+        return timedelta(
+            seconds=JOB_RETRY_DELAY * 2 ** max(self.attempts - 1, 0)
+        )
+
+    def run(self):
+        """
+        Выполнение задачи с сохранением результата.
+        При ошибке задача возвращается в очередь с задержкой,
+        а после исчерпания попыток помечается как ошибочная.
+        """
+        try:
+            TASKS[self.name](**self.payload)
+        except Exception:
+            self.last_error = traceback.format_exc()
+            if self.attempts < self.max_attempts:
+                self.status = self.PENDING
+                self.run_at = timezone.now() + self.retry_delay()
+            else:
+                self.status = self.FAILED
+        else:
+            self.status = self.DONE
+            self.last_error = ''
+        self.locked_at = None
+        self.save(
+            update_fields=('status', 'run_at', 'locked_at', 'last_error')
+        )
+        return self.status == self.DONE
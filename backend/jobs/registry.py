@@ -0,0 +1,12 @@
+TASKS = {}
+
+
+def task(name):
+    """
+    Регистрация функции как фоновой задачи под именем name.
+    Модули с задачами (tasks.py приложений) загружаются при старте.
+    """
+    def decorator(func):
+        TASKS[name] = func
+        return func
+    return decorator
@@ -0,0 +1,94 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase
+from django.utils import timezone
+
+from jobs.constants import JOB_LOCK_TIMEOUT, JOB_RETRY_DELAY
+from jobs.models import Job
+from jobs.registry import TASKS
+
+TASK = 'tests.task'
+
+
+class JobQueueTest(TestCase):
+    """Захват, повтор и ошибка фоновых задач."""
+
+    def setUp(self):
+        self.calls = []
+        patcher = mock.patch.dict(TASKS, {TASK: self.task})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def task(self, fail=False):
+        self.calls.append(fail)
+        if fail:
+            raise RuntimeError('сбой задачи')
+
+    def test_claim(self):
+        Job.enqueue_many(TASK, [{}, {}, {}])
+        first, second, third = Job.objects.all()
+        Job.objects.filter(pk=third.pk).update(
+            run_at=timezone.now() + timedelta(minutes=1)
+        )
+        self.assertEqual(Job.claim(1), [first.pk])
+        self.assertEqual(Job.claim(10), [second.pk])
+        self.assertEqual(Job.claim(10), [])
+        first.refresh_from_db()
+        self.assertEqual(first.status, Job.RUNNING)
+        self.assertEqual(first.attempts, 1)
+        self.assertIsNotNone(first.locked_at)
+
+    def test_stale_job_reclaimed(self):
+        job = Job.enqueue(TASK)
+        Job.claim(1)
+        self.assertEqual(Job.claim(1), [])
+        Job.objects.filter(pk=job.pk).update(
+            locked_at=timezone.now() - timedelta(
+                seconds=JOB_LOCK_TIMEOUT + 1
+            )
+        )
+        self.assertEqual(Job.claim(1), [job.pk])
+        job.refresh_from_db()
+        self.assertEqual(job.attempts, 2)
+
+    def test_run(self):
+        job = Job.enqueue(TASK)
+        Job.claim(1)
+        job.refresh_from_db()
+        self.assertTrue(job.run())
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.DONE)
+        self.assertIsNone(job.locked_at)
+        self.assertEqual(self.calls, [False])
+
+    def test_retry_then_fail(self):
+        job = Job.enqueue(TASK, fail=True)
+        Job.objects.filter(pk=job.pk).update(max_attempts=2)
+        Job.claim(1)
+        job.refresh_from_db()
+        started = timezone.now()
+        self.assertFalse(job.run())
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.PENDING)
+        self.assertIn('сбой задачи', job.last_error)
+        self.assertGreaterEqual(
+            job.run_at, started + timedelta(seconds=JOB_RETRY_DELAY)
+        )
+        self.assertEqual(Job.claim(1), [])
+        Job.objects.filter(pk=job.pk).update(run_at=timezone.now())
+        self.assertEqual(Job.claim(1), [job.pk])
+        job.refresh_from_db()
+        self.assertFalse(job.run())
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.FAILED)
+        self.assertEqual(job.attempts, 2)
+        self.assertEqual(Job.claim(1), [])
+        self.assertEqual(self.calls, [True, True])
+
+    def test_retry_delay_doubles(self):
+        self.assertEqual(
+            [Job(attempts=attempts).retry_delay().seconds
+             for attempts in (1, 2, 3)],
+            [JOB_RETRY_DELAY, JOB_RETRY_DELAY * 2, JOB_RETRY_DELAY * 4]
+        )
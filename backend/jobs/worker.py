@@ -0,0 +1,17 @@
+import signal
+
+import django
+
+
+def init_worker():
+    """Подготовка процесса-обработчика: настройка Django."""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    django.setup()
+
+
+def run_job(job_id):
+    """Выполнение задачи в процессе-обработчике."""
+    from jobs.models import Job
+
+    job = Job.objects.filter(id=job_id).first()
+    return job is not None and job.run()
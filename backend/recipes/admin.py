@@ -3,9 +3,11 @@ from django.contrib.admin import ModelAdmin
 from import_export import resources
 from import_export.admin import ImportExportModelAdmin
 
-from recipes.mixins import AdminUserPermissionMixin
+from recipes.mixins import (AdminUserPermissionMixin, CounterAdminMixin,
+                            ScalableAdminMixin, ShoppingListAdminMixin)
 from recipes.models import (Favorite, Ingredient, IngredientsAmountInRecipe,
                             MeasurementUnit, Recipe, ShoppingCart, Tag)
+from users.models import User
 
 
 @admin.register(MeasurementUnit)
@@ -28,7 +30,8 @@ class IngredientResource(resources.ModelResource):
 
 
 @admin.register(Ingredient)
-class IngredientAdmin(ImportExportModelAdmin, AdminUserPermissionMixin):
+class IngredientAdmin(ScalableAdminMixin, ImportExportModelAdmin,
+                      AdminUserPermissionMixin):
     """Класс для настройки админ-зоны модели Ingredient."""
 
     resource_class = IngredientResource
@@ -37,7 +40,9 @@ class IngredientAdmin(ImportExportModelAdmin, AdminUserPermissionMixin):
         'name',
         'measurement_unit',
     )
-    search_fields = ('name',)
+    list_select_related = ('measurement_unit',)
+    autocomplete_fields = ('measurement_unit',)
+    search_fields = ('^name',)
     list_display_links = ('name',)
     empty_value_display = '-пусто-'
 
@@ -57,25 +62,34 @@ class TagAdmin(ModelAdmin, AdminUserPermissionMixin):
 
 
 @admin.register(IngredientsAmountInRecipe)
-class IngredientsAmountInRecipeAdmin(ModelAdmin):
+class IngredientsAmountInRecipeAdmin(CounterAdminMixin,
+                                     ShoppingListAdminMixin,
+                                     ScalableAdminMixin, ModelAdmin):
     """Класс для настройки админ-зоны модели IngredientsAmountInRecipe."""
 
+    counter_owners = {'ingredients_id': Ingredient}
+
+    shopping_list_user_field = 'recipe__shoppingcart__user'
+
     list_display = (
         'id',
         'recipe',
         'ingredients',
         'amount',
     )
-    list_filter = ('recipe', 'ingredients')
-    search_fields = ('recipe',)
+    list_select_related = ('recipe__author', 'ingredients')
+    autocomplete_fields = ('recipe', 'ingredients')
+    search_fields = ('^recipe__name', '^ingredients__name')
     list_display_links = ('recipe',)
     empty_value_display = '-пусто-'
 
 
 @admin.register(Recipe)
-class RecipeAdmin(ModelAdmin):
+class RecipeAdmin(CounterAdminMixin, ScalableAdminMixin, ModelAdmin):
     """Класс для настройки админ-зоны модели Recipe."""
 
+    counter_owners = {'author_id': User}
+
     ingredients = (IngredientAdmin, )
 
     list_display = (
@@ -84,39 +98,53 @@ class RecipeAdmin(ModelAdmin):
         'author',
         'name',
         'in_favorite',
+        'in_carts_count',
     )
-    search_fields = ('author', 'name')
+    list_select_related = ('author',)
+    autocomplete_fields = ('author',)
+    ordering = ('-pub_date', '-id')
+    search_fields = ('^name', '^author__username')
     list_filter = ('tags', )
     list_display_links = ('name',)
     empty_value_display = '-пусто-'
 
     def in_favorite(self, obj):
-        return obj.favorite.all().count()
+        return obj.favorites_count
 
     in_favorite.short_description = 'Количество добавлений в избранное'
 
 
 @admin.register(Favorite)
-class FavoriteAdmin(ModelAdmin):
+class FavoriteAdmin(CounterAdminMixin, ScalableAdminMixin, ModelAdmin):
     """Класс для настройки админ-зоны модели Favorite."""
 
+    counter_owners = {'recipe_id': Recipe}
+
     list_display = (
         'id',
         'recipe',
         'user',
     )
-    search_fields = ('recipe', 'user')
+    list_select_related = ('recipe__author', 'user')
+    autocomplete_fields = ('recipe', 'user')
+    search_fields = ('^recipe__name', '^user__username')
     empty_value_display = '-пусто-'
 
 
 @admin.register(ShoppingCart)
-class ShoppingCartAdmin(ModelAdmin):
+class ShoppingCartAdmin(CounterAdminMixin, ShoppingListAdminMixin,
+                        ScalableAdminMixin, ModelAdmin):
     """Класс для настройки админ-зоны модели ShoppingCart."""
 
+    counter_owners = {'recipe_id': Recipe}
+    shopping_list_user_field = 'user'
+
     list_display = (
         'id',
         'recipe',
         'user',
     )
-    search_fields = ('recipe', 'user')
+    list_select_related = ('recipe__author', 'user')
+    autocomplete_fields = ('recipe', 'user')
+    search_fields = ('^recipe__name', '^user__username')
     empty_value_display = '-пусто-'
@@ -17,3 +17,55 @@ MAX_DISPLAY_LENGTH = 64
 MIN_INGRDEINTS_AMOUNT = 1
 
 MAX_INGRDEINTS_AMOUNT = 32000
+
+LENGTH_SHORT_LINK_CODE = 16
+
+SHORT_LINK_ALPHABET = (
+    '0123456789abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ'
+)
+
+SHORT_LINK_CACHE_TIMEOUT = 60 * 60 * 24
+
+SHOPPING_LIST_CHUNK_SIZE = 2000
+
+SHOPPING_LIST_DEFAULT_FORMAT = 'txt'
+
+SHOPPING_LIST_BATCH_SIZE = 1000
+
+INGREDIENTS_SEARCH_LIMIT = 20
+
+MAX_RECIPES_IN_BULK = 1000
+
+MAX_RECIPES_IN_BATCH = 100
+
+RECIPES_BULK_BATCH_SIZE = 1000
+
+INGREDIENTS_LOAD_BATCH_SIZE = 10000
+
+INGREDIENTS_LOAD_READ_SIZE = 1 << 16
+
+RECIPE_SEARCH_CONFIGS = ('russian', 'simple')
+
+RECIPE_SEARCH_HEADLINE_WORDS = (15, 35)
+
+RECIPE_SEARCH_HIGHLIGHT = ('<mark>', '</mark>')
+
+RECIPE_SEARCH_NAME_WEIGHT = 1.0
+
+RECIPE_SEARCH_TEXT_WEIGHT = 0.4
+
+TAGS_MODE_ANY = 'any'
+
+TAGS_MODE_ALL = 'all'
+
+TAG_SLUGS_CACHE_TIMEOUT = 300
+
+TAG_SLUGS_MISS_REFRESH_INTERVAL = 5
+
+SEED_BATCH_SIZE = 5000
+
+SEED_IMAGE_NAME = 'recipes/images/seed.jpg'
+
+SEED_INGREDIENTS_PER_RECIPE = (3, 8)
+
+SEED_TAGS_PER_RECIPE = (1, 3)
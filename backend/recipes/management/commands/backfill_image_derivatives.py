@@ -0,0 +1,39 @@
+import os
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from PIL import UnidentifiedImageError
+
+from core.constants import IMAGE_UPLOAD_DIRS
+from core.images import create_derivatives
+
+
+class Command(BaseCommand):
+    help = (
+        'Создает уменьшенные копии для уже загруженных '
+        'изображений рецептов и аватаров.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Пересоздать уже существующие копии.'
+        )
+
+    def handle(self, *args, force=False, **options):
+        created = failed = 0
+        for directory in IMAGE_UPLOAD_DIRS:
+            if not default_storage.exists(directory):
+                continue
+            _, files = default_storage.listdir(directory)
+            for filename in files:
+                name = os.path.join(directory, filename)
+                try:
+                    created += create_derivatives(name, force=force)
+                except (OSError, UnidentifiedImageError) as error:
+                    failed += 1
+                    self.stderr.write(f'{name}: {error}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Создано копий: {created}, ошибок: {failed}.'
+        ))
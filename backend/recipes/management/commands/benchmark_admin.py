@@ -0,0 +1,88 @@
+from time import perf_counter
+
+from django.contrib import admin
+from django.contrib.messages.storage.fallback import FallbackStorage
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+
+from core.constants import ADMIN_MAX_QUERIES
+from users.models import User
+
+BENCHMARK_APPS = ('recipes', 'users', 'jobs')
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет количество запросов и время отрисовки списков '
+        'и форм объектов админ-зоны; завершается с ошибкой, '
+        'если страница делает больше --max-queries запросов.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--email', help='Email администратора; по умолчанию первый.'
+        )
+        parser.add_argument(
+            '--search', default='а',
+            help='Строка поиска для проверки search_fields.'
+        )
+        parser.add_argument(
+            '--max-queries', type=int, default=ADMIN_MAX_QUERIES,
+            help='Допустимое количество запросов на страницу.'
+        )
+
+    def _render(self, view, user, params=None, **kwargs):
+        request = RequestFactory().get('/', params or {})
+        request.user = user
+        request.session = {}
+        request._messages = FallbackStorage(request)
+        with CaptureQueriesContext(connection) as queries:
+            started = perf_counter()
+            response = view(request, **kwargs)
+            response.render()
+            elapsed = perf_counter() - started
+        if response.status_code != 200:
+            raise CommandError(
+                f'{view.__qualname__}: ответ {response.status_code}'
+            )
+        return elapsed * 1000, len(queries)
+
+    def _pages(self, model, model_admin, search):
+        yield 'список', model_admin.changelist_view, None, {}
+        if model_admin.search_fields:
+            yield 'поиск', model_admin.changelist_view, {'q': search}, {}
+        obj = model._default_manager.order_by('pk').only('pk').first()
+        if obj is not None:
+            yield 'объект', model_admin.change_view, None, {
+                'object_id': str(obj.pk)
+            }
+
+    def handle(self, *args, email=None, search='а', max_queries=None,
+               **options):
+        admins = User.objects.filter(is_superuser=True, is_active=True)
+        user = (admins.filter(email=email) if email else admins).first()
+        if user is None:
+            raise CommandError('Нет подходящего администратора.')
+        exceeded = []
+        for model, model_admin in admin.site._registry.items():
+            if model._meta.app_label not in BENCHMARK_APPS:
+                continue
+            for page, view, params, kwargs in self._pages(
+                    model, model_admin, search
+            ):
+                milliseconds, queries = self._render(
+                    view, user, params, **kwargs
+                )
+                name = f'{model._meta.label} ({page})'
+                self.stdout.write(
+                    f'{name}: {queries} запросов, {milliseconds:.1f} мс'
+                )
+                if queries > max_queries:
+                    exceeded.append(name)
+        if exceeded:
+            raise CommandError(
+                f'Больше {max_queries} запросов: {", ".join(exceeded)}'
+            )
+        self.stdout.write(self.style.SUCCESS('Все страницы в пределах.'))
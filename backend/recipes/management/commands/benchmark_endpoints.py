@@ -0,0 +1,349 @@
+import json
+import tracemalloc
+from statistics import median
+from tempfile import TemporaryDirectory
+from time import perf_counter
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import (CaptureQueriesContext, override_settings,
+                               setup_test_environment,
+                               teardown_test_environment)
+from rest_framework.test import APIClient
+
+from core.constants import PAGE_SIZE
+from recipes.constants import SEED_INGREDIENTS_PER_RECIPE
+from recipes.models import Favorite, Ingredient, Recipe, ShoppingCart, Tag
+from recipes.seeding import FoodgramSeeder
+from users.models import Follow, User
+
+BUDGETS_PATH = settings.BASE_DIR / 'benchmarks' / 'budgets.json'
+
+BENCHMARK_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+VOLUMES = ('users', 'recipes', 'ingredients', 'ingredients_per_recipe',
+           'favorites', 'carts', 'follows')
+
+METRICS = ('queries', 'bytes', 'milliseconds', 'memory_kb')
+
+# Метрики, по которым бюджеты проверяются всегда; время и память
+# зависят от машины и проверяются только с --check-timings.
+STABLE_METRICS = ('queries', 'bytes')
+
+# Номер страницы для замера глубокой пагинации,
+# если рецептов хватает на столько страниц.
+DEEP_PAGE = 50
+
+BENCHMARK_IMAGE = (
+    'data:image/png;base64,iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAIAAACQd1Pe'
+    'AAAADElEQVR4nGP4z8AAAAMBAQDJ/pLvAAAAAElFTkSuQmCC'
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Заполняет тестовую базу данными заданного объема и замеряет '
+        'количество запросов, размер ответа, время и выделенную память '
+        'для эндпоинтов API; завершается с ошибкой, если превышен бюджет '
+        'из budgets.json (время и память - только с --check-timings).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--budgets', default=str(BUDGETS_PATH),
+            help='Файл с объемами данных и бюджетами эндпоинтов.'
+        )
+        for volume in VOLUMES:
+            parser.add_argument(
+                f'--{volume.replace("_", "-")}', type=int,
+                help='Объем данных; по умолчанию берется из файла бюджетов.'
+            )
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--repeat', type=int, default=5,
+            help='Количество замеров каждого эндпоинта.'
+        )
+        parser.add_argument(
+            '--output', help='Файл для результатов в формате JSON.'
+        )
+        parser.add_argument(
+            '--keepdb', action='store_true',
+            help='Не удалять тестовую базу после замеров.'
+        )
+        parser.add_argument(
+            '--current-db', action='store_true',
+            help='Не создавать отдельную базу, а заполнять текущую; '
+                 'для запуска из тестов, где база уже тестовая.'
+        )
+        parser.add_argument(
+            '--check-timings', action='store_true',
+            help='Сравнивать с бюджетами также время и память.'
+        )
+        parser.add_argument(
+            '--no-budgets', action='store_true',
+            help='Только замерить, не сравнивая с бюджетами.'
+        )
+
+    def _load_budgets(self, path):
+        try:
+            with open(path, encoding='utf-8') as file:
+                return json.load(file)
+        except FileNotFoundError:
+            return {'volumes': {}, 'endpoints': {}}
+        except ValueError as error:
+            raise CommandError(f'{path}: {error}')
+
+    def _scenarios(self, user, seed):
+        """
+        Запросы к эндпоинтам в порядке выполнения: пары вида
+        добавление/удаление идут подряд, чтобы каждый повтор
+        начинался с одинакового состояния базы.
+        """
+        free = Recipe.objects.exclude(
+            id__in=Favorite.objects.filter(user=user).values('recipe')
+        ).exclude(
+            id__in=ShoppingCart.objects.filter(user=user).values('recipe')
+        ).order_by('id')
+        recipe = free.exclude(author=user).first()
+        if recipe is None:
+            raise CommandError(
+                'Все рецепты уже в избранном или списке покупок '
+                'пользователя: уменьшите --favorites и --carts.'
+            )
+        own = Recipe.objects.filter(author=user).order_by('id').first()
+        author = User.objects.exclude(id=user.id).exclude(
+            id__in=Follow.objects.filter(user=user).values('following')
+        ).order_by('id').first()
+        batch = list(
+            free.exclude(id=recipe.id).values_list('id', flat=True)[:10]
+        )
+        ingredients = list(
+            Ingredient.objects.order_by('id').values_list('id', flat=True)[:3]
+        )
+        tags = list(Tag.objects.order_by('id').values_list('id', 'slug'))
+        created = {
+            'ingredients': [
+                {'id': ingredient_id, 'amount': 100}
+                for ingredient_id in ingredients
+            ],
+            'tags': [tag_id for tag_id, _ in tags],
+            'image': BENCHMARK_IMAGE,
+            'name': 'Рецепт для замеров',
+            'text': 'Описание рецепта для замеров',
+            'cooking_time': 30,
+        }
+        detail = f'/api/recipes/{recipe.id}/'
+        deep_page = max(1, min(DEEP_PAGE, Recipe.objects.count() // PAGE_SIZE))
+        slugs = '&'.join(f'tags={slug}' for _, slug in tags[:2])
+        return (
+            ('recipes-list', 'anon', 'get', '/api/recipes/', None),
+            ('recipes-list-auth', 'auth', 'get', '/api/recipes/', None),
+            ('recipes-list-deep', 'anon', 'get',
+             f'/api/recipes/?page={deep_page}', None),
+            ('recipes-list-cursor', 'auth', 'get',
+             '/api/recipes/?pagination=cursor', None),
+            ('recipes-list-tags-all', 'auth', 'get',
+             f'/api/recipes/?{slugs}&tags_mode=all', None),
+            ('recipes-list-favorited', 'auth', 'get',
+             '/api/recipes/?is_favorited=1', None),
+            ('recipes-list-author', 'anon', 'get',
+             f'/api/recipes/?author={recipe.author_id}', None),
+            ('recipes-search', 'anon', 'get',
+             '/api/recipes/?search=суп домашний', None),
+            ('recipes-detail', 'anon', 'get', detail, None),
+            ('recipes-detail-auth', 'auth', 'get', detail, None),
+            ('recipes-create', 'auth', 'post', '/api/recipes/', created),
+            ('recipes-update', 'auth', 'patch', f'/api/recipes/{own.id}/',
+             created),
+            ('recipes-get-link', 'anon', 'get', f'{detail}get-link/', None),
+            ('recipes-favorite-add', 'auth', 'post', f'{detail}favorite/',
+             None),
+            ('recipes-favorite-remove', 'auth', 'delete',
+             f'{detail}favorite/', None),
+            ('recipes-favorite-batch-add', 'auth', 'post',
+             '/api/recipes/favorite/', {'recipes': batch}),
+            ('recipes-favorite-batch-remove', 'auth', 'delete',
+             '/api/recipes/favorite/', {'recipes': batch}),
+            ('recipes-cart-add', 'auth', 'post', f'{detail}shopping_cart/',
+             None),
+            ('recipes-cart-remove', 'auth', 'delete',
+             f'{detail}shopping_cart/', None),
+            ('recipes-cart-batch-add', 'auth', 'post',
+             '/api/recipes/shopping_cart/', {'recipes': batch}),
+            ('recipes-cart-download', 'auth', 'get',
+             '/api/recipes/download_shopping_cart/', None),
+            ('recipes-cart-batch-remove', 'auth', 'delete',
+             '/api/recipes/shopping_cart/', {'recipes': batch}),
+            ('ingredients-list', 'anon', 'get', '/api/ingredients/', None),
+            ('ingredients-search', 'anon', 'get',
+             '/api/ingredients/?name=Ингр', None),
+            ('ingredients-detail', 'anon', 'get',
+             f'/api/ingredients/{ingredients[0]}/', None),
+            ('tags-list', 'anon', 'get', '/api/tags/', None),
+            ('tags-detail', 'anon', 'get', f'/api/tags/{tags[0][0]}/', None),
+            ('users-list', 'anon', 'get', '/api/users/', None),
+            ('users-list-auth', 'auth', 'get', '/api/users/', None),
+            ('users-detail', 'auth', 'get', f'/api/users/{author.id}/',
+             None),
+            ('users-me', 'auth', 'get', '/api/users/me/', None),
+            ('users-subscriptions', 'auth', 'get',
+             '/api/users/subscriptions/?recipes_limit=3', None),
+            ('users-subscribe', 'auth', 'post',
+             f'/api/users/{author.id}/subscribe/', None),
+            ('users-unsubscribe', 'auth', 'delete',
+             f'/api/users/{author.id}/subscribe/', None),
+            ('auth-token-login', 'anon', 'post', '/api/auth/token/login/',
+             {'email': user.email, 'password': f'seed-{seed}'}),
+        )
+
+    def _request(self, client, method, url, data):
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            started = perf_counter()
+            response = getattr(client, method)(url, data, format='json')
+            content = (
+                b''.join(response.streaming_content) if response.streaming
+                else response.content
+            )
+            elapsed = perf_counter() - started
+        if response.status_code >= 400:
+            raise CommandError(
+                f'{method.upper()} {url}: ответ {response.status_code} '
+                f'{response.content[:200]!r}'
+            )
+        return elapsed * 1000, len(queries), len(content)
+
+    def _measure(self, scenarios, clients, repeat):
+        samples = {name: {metric: [] for metric in METRICS}
+                   for name, *_ in scenarios}
+        # Последний проход - с tracemalloc: он замедляет выполнение,
+        # поэтому время в этом проходе не учитывается.
+        for run in range(repeat + 1):
+            traced = run == repeat
+            for name, client, method, url, data in scenarios:
+                if traced:
+                    tracemalloc.start()
+                milliseconds, queries, size = self._request(
+                    clients[client], method, url, data
+                )
+                if traced:
+                    samples[name]['memory_kb'].append(
+                        tracemalloc.get_traced_memory()[1] / 1024
+                    )
+                    tracemalloc.stop()
+                    continue
+                samples[name]['queries'].append(queries)
+                samples[name]['bytes'].append(size)
+                samples[name]['milliseconds'].append(milliseconds)
+        return {
+            name: {
+                'queries': max(values['queries']),
+                'bytes': max(values['bytes']),
+                'milliseconds': round(median(values['milliseconds']), 2),
+                'memory_kb': round(values['memory_kb'][0], 1),
+            } for name, values in samples.items()
+        }
+
+    def _compare(self, results, budgets, metrics=STABLE_METRICS):
+        exceeded = []
+        for name, result in results.items():
+            budget = budgets.get(name)
+            if budget is None:
+                self.stdout.write(
+                    self.style.WARNING(f'{name}: бюджет не задан')
+                )
+                continue
+            for metric in metrics:
+                if metric in budget and result[metric] > budget[metric]:
+                    exceeded.append(
+                        f'{name}: {metric} {result[metric]} > '
+                        f'{budget[metric]}'
+                    )
+        return exceeded
+
+    def _run(self, volumes, seed, repeat):
+        """Заполнение базы и замеры в текущей базе данных."""
+        per_recipe = volumes['ingredients_per_recipe']
+        with TemporaryDirectory() as media_root, override_settings(
+                CACHES=BENCHMARK_CACHES, MEDIA_ROOT=media_root,
+                ALLOWED_HOSTS=['*'], DATABASE_REPLICAS=[]
+        ):
+            user_ids, _ = FoodgramSeeder(seed=seed, stdout=self.stdout).run(
+                users=volumes['users'],
+                recipes=volumes['recipes'],
+                follows=volumes['follows'],
+                favorites=volumes['favorites'],
+                carts=volumes['carts'],
+                ingredients=volumes['ingredients'],
+                ingredients_per_recipe=(
+                    (per_recipe, per_recipe) if per_recipe
+                    else SEED_INGREDIENTS_PER_RECIPE
+                ),
+            )
+            user = User.objects.get(id=user_ids[0])
+            authenticated = APIClient()
+            authenticated.force_authenticate(user)
+            return self._measure(
+                self._scenarios(user, seed),
+                {'anon': APIClient(), 'auth': authenticated},
+                repeat
+            )
+
+    def handle(self, *args, budgets=None, seed=0, repeat=5, output=None,
+               keepdb=False, current_db=False, check_timings=False,
+               no_budgets=False, **options):
+        budgets = self._load_budgets(budgets)
+        volumes = {
+            volume: (
+                options[volume] if options[volume] is not None
+                else budgets['volumes'].get(volume, 0)
+            ) for volume in VOLUMES
+        }
+        if volumes['users'] < 2 or volumes['recipes'] < 2:
+            raise CommandError(
+                'Нужно не меньше двух пользователей и рецептов.'
+            )
+        if current_db:
+            results = self._run(volumes, seed, repeat)
+        else:
+            setup_test_environment()
+            old_name = connection.settings_dict['NAME']
+            connection.creation.create_test_db(
+                verbosity=0, autoclobber=True, keepdb=keepdb
+            )
+            try:
+                results = self._run(volumes, seed, repeat)
+            finally:
+                connection.creation.destroy_test_db(
+                    old_name, verbosity=0, keepdb=keepdb
+                )
+                teardown_test_environment()
+        for name, result in results.items():
+            self.stdout.write(
+                f'{name}: {result["queries"]} запросов, '
+                f'{result["bytes"]} байт, {result["milliseconds"]} мс, '
+                f'{result["memory_kb"]} КБ'
+            )
+        if output:
+            with open(output, 'w', encoding='utf-8') as file:
+                json.dump(
+                    {'volumes': volumes, 'seed': seed, 'endpoints': results},
+                    file, ensure_ascii=False, indent=2
+                )
+        if no_budgets:
+            return
+        exceeded = self._compare(
+            results, budgets['endpoints'],
+            METRICS if check_timings else STABLE_METRICS
+        )
+        if exceeded:
+            raise CommandError(
+                'Превышены бюджеты:\n' + '\n'.join(exceeded)
+            )
+        self.stdout.write(self.style.SUCCESS('Все эндпоинты в пределах.'))
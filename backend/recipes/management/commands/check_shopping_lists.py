@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from recipes.models import ShoppingListIngredient
+
+
+class Command(BaseCommand):
+    help = (
+        'Сверяет итоговые количества ингредиентов в списках покупок '
+        'с рецептами в корзинах пользователей.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user',
+            type=int,
+            action='append',
+            dest='user_ids',
+            help='id пользователя; по умолчанию проверяются все.'
+        )
+        parser.add_argument(
+            '--fix',
+            action='store_true',
+            help='Пересчитать списки пользователей с расхождениями.'
+        )
+
+    def handle(self, *args, user_ids=None, fix=False, **options):
+        mismatches = ShoppingListIngredient.check_consistency(user_ids)
+        for user_id, ingredient_id, expected, stored in mismatches:
+            self.stdout.write(
+                f'user={user_id} ingredient={ingredient_id}: '
+                f'ожидается {expected}, хранится {stored}'
+            )
+        if not mismatches:
+            self.stdout.write(self.style.SUCCESS('Расхождений нет.'))
+            return
+        if fix:
+            ShoppingListIngredient.rebuild(
+                {user_id for user_id, *_ in mismatches}
+            )
+            self.stdout.write(self.style.SUCCESS(
+                f'Исправлено расхождений: {len(mismatches)}.'
+            ))
+            return
+        raise CommandError(f'Найдено расхождений: {len(mismatches)}.')
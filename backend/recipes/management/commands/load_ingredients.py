@@ -0,0 +1,150 @@
+import csv
+import json
+import os
+from itertools import islice
+from time import perf_counter
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from recipes.constants import (INGREDIENTS_LOAD_BATCH_SIZE,
+                               INGREDIENTS_LOAD_READ_SIZE,
+                               LENGTH_ABB_MEASUREMENT_UNIT,
+                               LENGTH_NAME_INGREDIENT)
+from recipes.models import Ingredient, MeasurementUnit
+
+FORMATS_BY_EXTENSION = {
+    '.csv': 'csv',
+    '.json': 'json',
+    '.jsonl': 'jsonl',
+    '.ndjson': 'jsonl',
+}
+
+
+def read_csv(file):
+    """Строки CSV «название,единица измерения»; заголовок пропускается."""
+    for row in csv.reader(file):
+        if len(row) < 2 or row[:2] == ['name', 'measurement_unit']:
+            continue
+        yield row[0], row[1]
+
+
+def read_jsonl(file):
+    """Объекты JSON по одному в строке."""
+    for line in file:
+        if line.strip():
+            item = json.loads(line)
+            yield item.get('name'), item.get('measurement_unit')
+
+
+def read_json(file):
+    """
+    Объекты из JSON-массива, разбираемые по мере чтения файла
+    без загрузки всего массива в память.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ''
+    started = False
+    for chunk in iter(lambda: file.read(INGREDIENTS_LOAD_READ_SIZE), ''):
+        buffer += chunk
+        while True:
+            buffer = buffer.lstrip(', \t\r\n' if started else ' \t\r\n')
+            if not buffer:
+                break
+            if not started:
+                if buffer[0] != '[':
+                    raise CommandError('Ожидается массив JSON.')
+                buffer = buffer[1:]
+                started = True
+                continue
+            if buffer[0] == ']':
+                return
+            try:
+                item, end = decoder.raw_decode(buffer)
+            except json.JSONDecodeError:
+                break
+            buffer = buffer[end:]
+            yield item.get('name'), item.get('measurement_unit')
+    if buffer.strip():
+        raise CommandError('Файл JSON обрывается на середине.')
+
+
+READERS = {
+    'csv': read_csv,
+    'json': read_json,
+    'jsonl': read_jsonl,
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Загружает каталог ингредиентов из CSV, JSON или JSON Lines '
+        'пачками; повторная загрузка того же файла ничего не меняет.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Путь к файлу с ингредиентами.')
+        parser.add_argument(
+            '--format', choices=tuple(READERS),
+            help='Формат файла; по умолчанию определяется по расширению.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=INGREDIENTS_LOAD_BATCH_SIZE,
+            help='Количество строк в одной транзакции.'
+        )
+
+    def handle(self, *args, path, format=None, batch_size=None, **options):
+        format = format or FORMATS_BY_EXTENSION.get(
+            os.path.splitext(path)[1].lower()
+        )
+        if format is None:
+            raise CommandError('Не удалось определить формат файла.')
+        units = {}
+        read = inserted = updated = skipped = 0
+        units_before = MeasurementUnit.objects.count()
+        started = perf_counter()
+        with open(path, encoding='utf-8-sig', newline='') as file:
+            items = READERS[format](file)
+            while True:
+                batch = list(islice(items, batch_size))
+                if not batch:
+                    break
+                read += len(batch)
+                rows = {}
+                for name, unit in batch:
+                    name = (name or '').strip()
+                    unit = (unit or '').strip()
+                    if (
+                        not name or not unit
+                        or len(name) > LENGTH_NAME_INGREDIENT
+                        or len(unit) > LENGTH_ABB_MEASUREMENT_UNIT
+                    ):
+                        skipped += 1
+                        continue
+                    rows[name] = unit
+                with transaction.atomic():
+                    missing = set(rows.values()) - set(units)
+                    if missing:
+                        units.update(
+                            MeasurementUnit.ids_by_abbreviation(missing)
+                        )
+                    batch_inserted, batch_updated = Ingredient.upsert({
+                        name: units[unit] for name, unit in rows.items()
+                    })
+                inserted += batch_inserted
+                updated += batch_updated
+                if self.stdout.isatty():
+                    self.stdout.write(
+                        f'Обработано строк: {read}', ending='\r'
+                    )
+        elapsed = perf_counter() - started
+        self.stdout.write(
+            f'Прочитано: {read}, добавлено: {inserted}, '
+            f'обновлено: {updated}, пропущено: {skipped}, '
+            f'новых единиц измерения: '
+            f'{MeasurementUnit.objects.count() - units_before}'
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Готово за {elapsed:.1f} с '
+            f'({read / elapsed if elapsed else read:.0f} строк/с).'
+        ))
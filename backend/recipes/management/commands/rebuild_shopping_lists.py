@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from recipes.models import ShoppingListIngredient
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает итоговые количества ингредиентов в списках покупок.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user',
+            type=int,
+            action='append',
+            dest='user_ids',
+            help='id пользователя; по умолчанию пересчитываются все.'
+        )
+
+    def handle(self, *args, user_ids=None, **options):
+        with transaction.atomic():
+            ShoppingListIngredient.rebuild(user_ids)
+        self.stdout.write(self.style.SUCCESS('Списки покупок пересчитаны.'))
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from recipes.models import Ingredient, Recipe
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        'Сверяет счетчики избранного, списков покупок, рецептов, '
+        'подписчиков и использований ингредиентов с данными '
+        'и исправляет расхождения.'
+    )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            fixed = {
+                **Recipe.reconcile_counters(),
+                **User.reconcile_counters(),
+                **Ingredient.reconcile_counters(),
+            }
+        for field, count in fixed.items():
+            self.stdout.write(f'{field}: исправлено {count}')
+        self.stdout.write(self.style.SUCCESS('Счетчики сверены.'))
@@ -0,0 +1,74 @@
+from time import perf_counter
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from recipes.constants import SEED_BATCH_SIZE, SEED_INGREDIENTS_PER_RECIPE
+from recipes.seeding import FoodgramSeeder, SeedingError
+
+
+class Command(BaseCommand):
+    help = (
+        'Создает воспроизводимые тестовые данные: пользователей, подписки, '
+        'рецепты с ингредиентами и тэгами, избранное и списки покупок. '
+        'Один и тот же --seed дает одни и те же данные.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100)
+        parser.add_argument('--recipes', type=int, default=1000)
+        parser.add_argument('--follows', type=int, default=0)
+        parser.add_argument('--favorites', type=int, default=0)
+        parser.add_argument('--carts', type=int, default=0)
+        parser.add_argument(
+            '--ingredients', type=int, default=0,
+            help='Сколько ингредиентов должно быть в каталоге; '
+                 'недостающие создаются.'
+        )
+        parser.add_argument(
+            '--ingredients-per-recipe', type=int,
+            help='Ингредиентов в каждом рецепте; по умолчанию от '
+                 f'{SEED_INGREDIENTS_PER_RECIPE[0]} '
+                 f'до {SEED_INGREDIENTS_PER_RECIPE[1]}.'
+        )
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--batch-size', type=int, default=SEED_BATCH_SIZE,
+            help='Количество строк в одной вставке.'
+        )
+
+    def handle(self, *args, users, recipes, follows, favorites, carts,
+               ingredients, ingredients_per_recipe, seed, batch_size,
+               **options):
+        if users < 1:
+            raise CommandError('Нужен хотя бы один пользователь.')
+        if min(recipes, follows, favorites, carts, ingredients) < 0:
+            raise CommandError('Объемы данных не могут быть отрицательными.')
+        if ingredients_per_recipe is not None and ingredients_per_recipe < 1:
+            raise CommandError(
+                'В рецепте должен быть хотя бы один ингредиент.'
+            )
+        started = perf_counter()
+        seeder = FoodgramSeeder(
+            seed=seed, batch_size=batch_size, stdout=self.stdout
+        )
+        try:
+            with transaction.atomic():
+                seeder.run(
+                    users=users,
+                    recipes=recipes,
+                    follows=follows,
+                    favorites=favorites,
+                    carts=carts,
+                    ingredients=ingredients,
+                    ingredients_per_recipe=(
+                        (ingredients_per_recipe, ingredients_per_recipe)
+                        if ingredients_per_recipe
+                        else SEED_INGREDIENTS_PER_RECIPE
+                    ),
+                )
+        except SeedingError as error:
+            raise CommandError(error)
+        self.stdout.write(self.style.SUCCESS(
+            f'Готово за {perf_counter() - started:.1f} с.'
+        ))
@@ -0,0 +1,65 @@
+# Generated by Django 3.2.3 on 2026-10-18 03:40
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+INGREDIENT_NAME_INDEXES = (
+    ('recipes_ingredient_name_trgm_idx',
+     'USING gin (UPPER("name"::text) gin_trgm_ops)'),
+    ('recipes_ingredient_name_prefix_idx',
+     '(UPPER("name"::text) text_pattern_ops)'),
+)
+
+
+def fill_usage_count(apps, schema_editor):
+    Ingredient = apps.get_model('recipes', 'Ingredient')
+    IngredientsAmountInRecipe = apps.get_model(
+        'recipes', 'IngredientsAmountInRecipe'
+    )
+    Ingredient.objects.update(usage_count=Coalesce(
+        Subquery(
+            IngredientsAmountInRecipe.objects.filter(
+                ingredients=OuterRef('pk')
+            ).order_by().values('ingredients').annotate(
+                count=Count('pk')
+            ).values('count')
+        ),
+        0
+    ))
+
+
+def create_name_indexes(apps, schema_editor):
+    """Индексы для поиска по подстроке и префиксу доступны только в Postgres."""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for name, definition in INGREDIENT_NAME_INDEXES:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {name} '
+            f'ON recipes_ingredient {definition}'
+        )
+
+
+def drop_name_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, _ in INGREDIENT_NAME_INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0023_shoppinglistingredient'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ingredient',
+            name='usage_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Количество рецептов с ингредиентом'),
+        ),
+        migrations.RunPython(fill_usage_count, migrations.RunPython.noop),
+        migrations.RunPython(create_name_indexes, drop_name_indexes),
+    ]
@@ -1,3 +1,10 @@
+from django.db import transaction
+
+from core.constants import ADMIN_LIST_PER_PAGE
+from core.paginations import EstimatedCountPaginator
+from recipes.models import ShoppingListIngredient
+
+
 class AdminUserPermissionMixin:
 
     def has_view_permission(self, request, obj=None):
@@ -14,3 +21,101 @@ class AdminUserPermissionMixin:
 
     def has_module_permission(self, request):
         return request.user.admin
+
+
+class ScalableAdminMixin:
+    """
+    Настройки списка объектов админ-зоны для больших таблиц:
+    без полного COUNT(*) для ссылки «Показать все»
+    и с оценкой количества строк вместо точного подсчета.
+    """
+
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    list_per_page = ADMIN_LIST_PER_PAGE
+
+
+class ShoppingListAdminMixin:
+    """
+    Пересчет итогов списков покупок после изменений в админ-зоне.
+    API поддерживает итоги инкрементально, здесь же итоги
+    затронутых пользователей пересчитываются полностью.
+    shopping_list_user_field - путь от объекта к пользователю,
+    в чей список покупок входит рецепт.
+    """
+
+    shopping_list_user_field = None
+
+    def _shopping_list_user_ids(self, pks):
+        field = self.shopping_list_user_field
+        return set(self.model.objects.filter(
+            pk__in=pks, **{f'{field}__isnull': False}
+        ).values_list(field, flat=True))
+
+    def _rebuild_shopping_lists(self, user_ids):
+        if user_ids:
+            ShoppingListIngredient.rebuild(user_ids)
+
+    @transaction.atomic
+    def save_model(self, request, obj, form, change):
+        user_ids = self._shopping_list_user_ids((obj.pk,)) if change else set()
+        super().save_model(request, obj, form, change)
+        self._rebuild_shopping_lists(
+            user_ids | self._shopping_list_user_ids((obj.pk,))
+        )
+
+    @transaction.atomic
+    def delete_model(self, request, obj):
+        user_ids = self._shopping_list_user_ids((obj.pk,))
+        super().delete_model(request, obj)
+        self._rebuild_shopping_lists(user_ids)
+
+    @transaction.atomic
+    def delete_queryset(self, request, queryset):
+        user_ids = self._shopping_list_user_ids(queryset.values('pk'))
+        super().delete_queryset(request, queryset)
+        self._rebuild_shopping_lists(user_ids)
+
+
+class CounterAdminMixin:
+    """
+    Сверка счетчиков после изменений в админ-зоне: API меняет
+    их атомарными UPDATE, здесь же счетчики затронутых записей
+    пересчитываются по данным. counter_owners - {поле объекта:
+    модель с методом reconcile_counters(pks)}.
+    """
+
+    counter_owners = {}
+
+    def _counter_owner_ids(self, pks):
+        return {
+            field: set(self.model.objects.filter(
+                pk__in=pks
+            ).values_list(field, flat=True))
+            for field in self.counter_owners
+        }
+
+    def _reconcile_counters(self, *owner_ids):
+        for field, model in self.counter_owners.items():
+            pks = set().union(*(ids[field] for ids in owner_ids))
+            pks.discard(None)
+            if pks:
+                model.reconcile_counters(pks)
+
+    @transaction.atomic
+    def save_model(self, request, obj, form, change):
+        before = self._counter_owner_ids((obj.pk,) if change else ())
+        super().save_model(request, obj, form, change)
+        self._reconcile_counters(before, self._counter_owner_ids((obj.pk,)))
+
+    @transaction.atomic
+    def delete_model(self, request, obj):
+        before = self._counter_owner_ids((obj.pk,))
+        super().delete_model(request, obj)
+        self._reconcile_counters(before)
+
+    @transaction.atomic
+    def delete_queryset(self, request, queryset):
+        before = self._counter_owner_ids(queryset.values('pk'))
+        super().delete_queryset(request, queryset)
+        self._reconcile_counters(before)
@@ -1,12 +1,23 @@
+import csv
+from io import StringIO
+from itertools import islice
+
+from django.contrib.postgres.search import SearchVectorField
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db import models
+from django.db import IntegrityError, connection, models, transaction
+from django.db.models import (Case, F, IntegerField, Sum, Value, When,
+                              Window)
+from django.db.models.functions import Greatest, RowNumber
 
+from core.counters import (CounterFieldsMixin, reconcile_counters,
+                           update_counter)
 from recipes.constants import (
     LENGTH_ABB_MEASUREMENT_UNIT, LENGTH_NAME_INGREDIENT,
     LENGTH_NAME_MEASUREMENT_UNIT, LENGTH_NAME_RECIPE, LENGTH_NAME_TAG,
-    MAX_COOKING_TIME, MAX_DISPLAY_LENGTH,
+    LENGTH_SHORT_LINK_CODE, MAX_COOKING_TIME, MAX_DISPLAY_LENGTH,
     MAX_INGRDEINTS_AMOUNT,
-    MIN_COOKING_TIME, MIN_INGRDEINTS_AMOUNT
+    MIN_COOKING_TIME, MIN_INGRDEINTS_AMOUNT, SHOPPING_LIST_BATCH_SIZE,
+    SHORT_LINK_ALPHABET
 )
 from users.models import User
 
@@ -34,10 +45,39 @@ class MeasurementUnit(models.Model):
     def __str__(self):
         return self.name[:MAX_DISPLAY_LENGTH]
 
+    @classmethod
+    def ids_by_abbreviation(cls, abbreviations):
+        """
+        id единиц измерения по сокращениям {сокращение: id};
+        недостающие единицы создаются одним запросом.
+        """
+        abbreviations = set(abbreviations)
+        units = dict(cls.objects.filter(
+            abbreviation__in=abbreviations
+        ).values_list('abbreviation', 'id'))
+        missing = abbreviations - set(units)
+        if missing:
+            cls.objects.bulk_create(
+                (cls(name=abbreviation, abbreviation=abbreviation)
+                 for abbreviation in missing),
+                ignore_conflicts=True
+            )
+            units.update(cls.objects.filter(
+                abbreviation__in=missing
+            ).values_list('abbreviation', 'id'))
+            units.update(
+                (name, unit_id) for name, unit_id in cls.objects.filter(
+                    name__in=missing - set(units)
+                ).values_list('name', 'id')
+            )
+        return units
 
-class Ingredient(models.Model):
+
+class Ingredient(CounterFieldsMixin, models.Model):
     """Модель, описывающая ингредиенты."""
 
+    counter_fields = ('usage_count',)
+
     name = models.CharField(
         max_length=LENGTH_NAME_INGREDIENT,
         verbose_name='Название',
@@ -49,6 +89,11 @@ class Ingredient(models.Model):
         null=True,
         related_name='ingredients',
     )
+    usage_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Количество рецептов с ингредиентом'
+    )
 
     class Meta:
         default_related_name = 'ingredients'
@@ -59,6 +104,84 @@ class Ingredient(models.Model):
     def __str__(self):
         return self.name[:MAX_DISPLAY_LENGTH]
 
+    @classmethod
+    def upsert(cls, rows):
+        """
+        Добавление ингредиентов {название: id единицы измерения}
+        и обновление единицы измерения у существующих.
+        Возвращает количество добавленных и обновленных строк.
+        """
+        if connection.vendor == 'postgresql':
+            return cls._upsert_copy(rows)
+        existing = {
+            name: (ingredient_id, unit_id)
+            for name, ingredient_id, unit_id in cls.objects.filter(
+                name__in=rows
+            ).values_list('name', 'id', 'measurement_unit_id')
+        }
+        cls.objects.bulk_create(
+            cls(name=name, measurement_unit_id=unit_id)
+            for name, unit_id in rows.items() if name not in existing
+        )
+        changed = [
+            cls(id=existing[name][0], measurement_unit_id=unit_id)
+            for name, unit_id in rows.items()
+            if name in existing and existing[name][1] != unit_id
+        ]
+        cls.objects.bulk_update(changed, ('measurement_unit',))
+        return len(rows) - len(existing), len(changed)
+
+    @classmethod
+    def _upsert_copy(cls, rows):
+        """
+        Загрузка через COPY во временную таблицу
+        и один INSERT ... ON CONFLICT в таблицу ингредиентов.
+        """
+        table = connection.ops.quote_name(cls._meta.db_table)
+        buffer = StringIO()
+        writer = csv.writer(buffer)
+        writer.writerows(rows.items())
+        buffer.seek(0)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'CREATE TEMP TABLE IF NOT EXISTS ingredient_staging '
+                '(name text, measurement_unit_id bigint)'
+            )
+            cursor.execute('TRUNCATE ingredient_staging')
+            cursor.copy_expert(
+                'COPY ingredient_staging (name, measurement_unit_id) '
+                'FROM STDIN WITH (FORMAT csv)',
+                buffer
+            )
+            cursor.execute(
+                f'INSERT INTO {table} '
+                f'(name, measurement_unit_id, usage_count) '
+                f'SELECT name, measurement_unit_id, 0 '
+                f'FROM ingredient_staging '
+                f'ON CONFLICT (name) DO UPDATE '
+                f'SET measurement_unit_id = EXCLUDED.measurement_unit_id '
+                f'WHERE {table}.measurement_unit_id '
+                f'IS DISTINCT FROM EXCLUDED.measurement_unit_id '
+                f'RETURNING (xmax = 0)'
+            )
+            inserted = [row[0] for row in cursor.fetchall()]
+        return sum(inserted), len(inserted) - sum(inserted)
+
+    @classmethod
+    def reconcile_counters(cls, pks=None):
+        """Исправление расхождений счетчика использований в рецептах."""
+        return reconcile_counters(cls, {
+            'usage_count': (IngredientsAmountInRecipe, 'ingredients'),
+        }, pks)
+
+    @classmethod
+    def update_usage(cls, ingredient_ids, delta):
+        """Атомарное изменение счетчика использований в рецептах."""
+        if ingredient_ids and delta:
+            cls.objects.filter(id__in=ingredient_ids).update(
+                usage_count=Greatest(F('usage_count') + delta, Value(0))
+            )
+
 
 class Tag(models.Model):
     """Модель, описывающая тэги для рецептов."""
@@ -82,9 +205,11 @@ class Tag(models.Model):
         return self.name[:MAX_DISPLAY_LENGTH]
 
 
-class Recipe(models.Model):
+class Recipe(CounterFieldsMixin, models.Model):
     """Модель, описываюшая рецепты."""
 
+    counter_fields = ('favorites_count', 'in_carts_count')
+
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -125,16 +250,74 @@ class Recipe(models.Model):
         db_index=True,
         verbose_name='Дата добавления'
     )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Дата изменения'
+    )
+    favorites_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Добавлений в избранное'
+    )
+    in_carts_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Добавлений в список покупок'
+    )
+    search_vector = SearchVectorField(
+        null=True,
+        editable=False,
+        verbose_name='Поисковый вектор'
+    )
 
     class Meta:
         default_related_name = 'recipes'
         verbose_name = 'Рецепт'
         verbose_name_plural = 'Рецепты'
         ordering = ('pub_date',)
+        indexes = (
+            models.Index(
+                fields=('-pub_date', '-id'),
+                name='recipe_pub_date_id_idx'
+            ),
+        )
 
     def __str__(self):
         return f'{self.name} from {self.author}'[:MAX_DISPLAY_LENGTH]
 
+    @classmethod
+    def reconcile_counters(cls, pks=None):
+        """Исправление расхождений счетчиков избранного и покупок."""
+        return reconcile_counters(cls, {
+            'favorites_count': (Favorite, 'recipe'),
+            'in_carts_count': (ShoppingCart, 'recipe'),
+        }, pks)
+
+    @classmethod
+    def by_authors(cls, author_ids, limit=None):
+        """
+        Рецепты авторов в виде {id автора: [рецепты]} одним запросом;
+        при заданном limit - не больше limit первых рецептов каждого автора
+        (ROW_NUMBER() с разбиением по автору).
+        """
+        recipes = cls.objects.filter(author_id__in=author_ids)
+        if limit is not None:
+            sql, params = recipes.annotate(row_number=Window(
+                expression=RowNumber(),
+                partition_by=F('author_id'),
+                order_by=(F('pub_date').asc(), F('id').asc())
+            )).order_by().query.sql_with_params()
+            recipes = cls.objects.raw(
+                f'SELECT * FROM ({sql}) AS ranked '
+                f'WHERE ranked.row_number <= %s '
+                f'ORDER BY ranked.author_id, ranked.row_number',
+                (*params, limit)
+            )
+        recipes_by_author = {}
+        for recipe in recipes:
+            recipes_by_author.setdefault(recipe.author_id, []).append(recipe)
+        return recipes_by_author
+
 
 class IngredientsAmountInRecipe(models.Model):
     """Промежуточная модель для связи Recipe и Ingredient."""
@@ -177,9 +360,108 @@ class IngredientsAmountInRecipe(models.Model):
         return f'{self.ingredients} {self.amount}'[:MAX_DISPLAY_LENGTH]
 
 
-class Favorite(models.Model):
+class UserRecipeListMixin:
+    """
+    Общие операции со списками рецептов пользователя:
+    избранным и списком покупок.
+    В recipe_counter указывается поле счетчика рецепта.
+    """
+
+    recipe_counter = None
+
+    @classmethod
+    def on_recipes_added(cls, user, recipe_ids):
+        """Действия после добавления рецептов в список."""
+        update_counter(
+            Recipe.objects.filter(id__in=recipe_ids), cls.recipe_counter, 1
+        )
+
+    @classmethod
+    def on_recipes_removed(cls, user, recipe_ids):
+        """Действия после удаления рецептов из списка."""
+        update_counter(
+            Recipe.objects.filter(id__in=recipe_ids), cls.recipe_counter, -1
+        )
+
+    @classmethod
+    def _lock_user(cls, user):
+        """
+        Блокировка строки пользователя до конца транзакции:
+        одиночные и пакетные изменения его списков идут по очереди,
+        и счетчики с итогами не учитывают одну строку дважды.
+        """
+        list(User.objects.select_for_update().filter(
+            id=user.id
+        ).values_list('id', flat=True))
+
+    @classmethod
+    def add_recipe(cls, user, recipe):
+        """
+        Добавление рецепта одним INSERT внутри точки сохранения.
+        Возвращает False, если рецепт уже в списке.
+        """
+        with transaction.atomic():
+            cls._lock_user(user)
+            try:
+                with transaction.atomic():
+                    cls.objects.create(user=user, recipe=recipe)
+            except IntegrityError:
+                return False
+            cls.on_recipes_added(user, (recipe.id,))
+        return True
+
+    @classmethod
+    def remove_recipe(cls, user, recipe):
+        """
+        Удаление рецепта одним DELETE.
+        Возвращает False, если рецепта не было в списке.
+        """
+        with transaction.atomic():
+            cls._lock_user(user)
+            deleted, _ = cls.objects.filter(user=user, recipe=recipe).delete()
+            if deleted:
+                cls.on_recipes_removed(user, (recipe.id,))
+        return bool(deleted)
+
+    @classmethod
+    def add_recipes(cls, user, recipe_ids):
+        """Пакетное добавление рецептов. Возвращает id добавленных."""
+        with transaction.atomic():
+            cls._lock_user(user)
+            existing = set(cls.objects.filter(
+                user=user, recipe_id__in=recipe_ids
+            ).values_list('recipe_id', flat=True))
+            added_ids = [
+                recipe_id for recipe_id in dict.fromkeys(recipe_ids)
+                if recipe_id not in existing
+            ]
+            cls.objects.bulk_create(
+                (cls(user=user, recipe_id=recipe_id)
+                 for recipe_id in added_ids),
+                ignore_conflicts=True
+            )
+            if added_ids:
+                cls.on_recipes_added(user, added_ids)
+        return added_ids
+
+    @classmethod
+    def remove_recipes(cls, user, recipe_ids):
+        """Пакетное удаление рецептов. Возвращает id удаленных."""
+        with transaction.atomic():
+            cls._lock_user(user)
+            rows = cls.objects.filter(user=user, recipe_id__in=recipe_ids)
+            removed_ids = list(rows.values_list('recipe_id', flat=True))
+            rows.delete()
+            if removed_ids:
+                cls.on_recipes_removed(user, removed_ids)
+        return removed_ids
+
+
+class Favorite(UserRecipeListMixin, models.Model):
     """Модель, описывающая параметры добавления рецептов в избранное."""
 
+    recipe_counter = 'favorites_count'
+
     recipe = models.ForeignKey(Recipe, on_delete=models.CASCADE)
     user = models.ForeignKey(User, on_delete=models.CASCADE)
 
@@ -194,9 +476,11 @@ class Favorite(models.Model):
         return f'{self.recipe} in favorites {self.user}'[:MAX_DISPLAY_LENGTH]
 
 
-class ShoppingCart(models.Model):
+class ShoppingCart(UserRecipeListMixin, models.Model):
     """Модель, описывающая параметры добавления рецептов в список покупок."""
 
+    recipe_counter = 'in_carts_count'
+
     recipe = models.ForeignKey(Recipe, on_delete=models.CASCADE)
     user = models.ForeignKey(User, on_delete=models.CASCADE)
 
@@ -211,3 +495,265 @@ class ShoppingCart(models.Model):
         return (f'{self.recipe} '
                 f'in shopping cart '
                 f'{self.user}')[:MAX_DISPLAY_LENGTH]
+
+    @classmethod
+    def on_recipes_added(cls, user, recipe_ids):
+        super().on_recipes_added(user, recipe_ids)
+        ShoppingListIngredient.add_recipes((user.id,), recipe_ids)
+
+    @classmethod
+    def on_recipes_removed(cls, user, recipe_ids):
+        super().on_recipes_removed(user, recipe_ids)
+        ShoppingListIngredient.remove_recipes((user.id,), recipe_ids)
+
+    @classmethod
+    def clear(cls, user):
+        """
+        Очистка списка покупок пользователя: по одному DELETE
+        для рецептов и итогов. Возвращает количество удаленных рецептов.
+        """
+        with transaction.atomic():
+            cls._lock_user(user)
+            rows = cls.objects.filter(user=user)
+            update_counter(
+                Recipe.objects.filter(
+                    id__in=rows.values('recipe_id')
+                ),
+                cls.recipe_counter,
+                -1
+            )
+            deleted, _ = rows.delete()
+            ShoppingListIngredient.objects.filter(user=user).delete()
+        return deleted
+
+
+class ShoppingListIngredient(models.Model):
+    """
+    Модель, описывающая суммарное количество ингредиента
+    в списке покупок пользователя.
+    Поддерживается инкрементально при изменении списка покупок
+    и состава рецептов, что избавляет выгрузку от агрегации.
+    """
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    ingredient = models.ForeignKey(Ingredient, on_delete=models.CASCADE)
+    total_amount = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Общее количество'
+    )
+
+    class Meta:
+        default_related_name = 'shopping_list_ingredients'
+        verbose_name = 'Ингредиент списка покупок'
+        verbose_name_plural = 'Ингредиенты списка покупок'
+        ordering = ('user',)
+        constraints = (
+            models.UniqueConstraint(
+                fields=('user', 'ingredient'),
+                name='unique_shopping_list_ingredient'
+            ),
+        )
+
+    def __str__(self):
+        return (f'{self.ingredient} {self.total_amount} '
+                f'for {self.user}')[:MAX_DISPLAY_LENGTH]
+
+    @staticmethod
+    def recipe_amounts(recipe):
+        """Количество каждого ингредиента рецепта: {id ингредиента: amount}."""
+        return dict(
+            IngredientsAmountInRecipe.objects.filter(
+                recipe=recipe
+            ).values_list('ingredients_id', 'amount')
+        )
+
+    @classmethod
+    def apply_delta(cls, user_ids, amounts):
+        """
+        Атомарно прибавляет к итогам пользователей изменения количества
+        ингредиентов {id ингредиента: изменение} одним UPDATE
+        и удаляет строки, в которых не осталось количества.
+        """
+        user_ids = list(user_ids)
+        amounts = {
+            ingredient_id: amount
+            for ingredient_id, amount in amounts.items() if amount
+        }
+        if not user_ids or not amounts:
+            return
+        cls.objects.bulk_create(
+            (
+                cls(user_id=user_id, ingredient_id=ingredient_id)
+                for user_id in user_ids
+                for ingredient_id, amount in amounts.items() if amount > 0
+            ),
+            batch_size=SHOPPING_LIST_BATCH_SIZE,
+            ignore_conflicts=True
+        )
+        rows = cls.objects.filter(
+            user_id__in=user_ids,
+            ingredient_id__in=amounts
+        )
+        rows.update(total_amount=Greatest(
+            F('total_amount') + Case(
+                *(
+                    When(ingredient_id=ingredient_id, then=Value(amount))
+                    for ingredient_id, amount in amounts.items()
+                ),
+                default=Value(0),
+                output_field=IntegerField()
+            ),
+            Value(0)
+        ))
+        rows.filter(total_amount=0).delete()
+
+    @staticmethod
+    def recipes_amounts(recipe_ids):
+        """Суммарное количество ингредиентов нескольких рецептов."""
+        return dict(
+            IngredientsAmountInRecipe.objects.filter(
+                recipe_id__in=recipe_ids
+            ).values('ingredients_id').annotate(
+                total=Sum('amount')
+            ).order_by().values_list('ingredients_id', 'total')
+        )
+
+    @classmethod
+    def add_recipe(cls, user_ids, recipe):
+        """Учет добавления рецепта в списки покупок пользователей."""
+        cls.apply_delta(user_ids, cls.recipe_amounts(recipe))
+
+    @classmethod
+    def add_recipes(cls, user_ids, recipe_ids):
+        """Учет добавления нескольких рецептов в списки покупок."""
+        cls.apply_delta(user_ids, cls.recipes_amounts(recipe_ids))
+
+    @classmethod
+    def remove_recipe(cls, user_ids, recipe):
+        """Учет удаления рецепта из списков покупок пользователей."""
+        cls.apply_delta(user_ids, {
+            ingredient_id: -amount
+            for ingredient_id, amount in cls.recipe_amounts(recipe).items()
+        })
+
+    @classmethod
+    def remove_recipes(cls, user_ids, recipe_ids):
+        """Учет удаления нескольких рецептов из списков покупок."""
+        cls.apply_delta(user_ids, {
+            ingredient_id: -amount for ingredient_id, amount
+            in cls.recipes_amounts(recipe_ids).items()
+        })
+
+    @staticmethod
+    def expected_totals(user_ids=None):
+        """Итоги, посчитанные по таблицам списка покупок и рецептов."""
+        lookups = {'recipe__shoppingcart__user__isnull': False}
+        if user_ids is not None:
+            lookups['recipe__shoppingcart__user__in'] = user_ids
+        return IngredientsAmountInRecipe.objects.filter(
+            **lookups
+        ).values(
+            'recipe__shoppingcart__user', 'ingredients'
+        ).annotate(
+            total=Sum('amount')
+        ).order_by().values_list(
+            'recipe__shoppingcart__user', 'ingredients', 'total'
+        )
+
+    @classmethod
+    def rebuild(cls, user_ids=None):
+        """Полный пересчет итогов для указанных или всех пользователей."""
+        rows = cls.objects.all()
+        if user_ids is not None:
+            rows = rows.filter(user_id__in=user_ids)
+        rows.delete()
+        totals = cls.expected_totals(user_ids).iterator(
+            chunk_size=SHOPPING_LIST_BATCH_SIZE
+        )
+        while True:
+            batch = [
+                cls(
+                    user_id=user_id,
+                    ingredient_id=ingredient_id,
+                    total_amount=total
+                ) for user_id, ingredient_id, total
+                in islice(totals, SHOPPING_LIST_BATCH_SIZE)
+            ]
+            if not batch:
+                return
+            cls.objects.bulk_create(batch)
+
+    @classmethod
+    def check_consistency(cls, user_ids=None):
+        """
+        Сверка итогов с таблицами списка покупок и рецептов.
+        Возвращает расхождения (user_id, ingredient_id, ожидается, хранится).
+        """
+        stored = cls.objects.all()
+        if user_ids is not None:
+            stored = stored.filter(user_id__in=user_ids)
+        actual = {
+            (user_id, ingredient_id): total
+            for user_id, ingredient_id, total in stored.values_list(
+                'user_id', 'ingredient_id', 'total_amount'
+            ).iterator(chunk_size=SHOPPING_LIST_BATCH_SIZE)
+        }
+        mismatches = []
+        for user_id, ingredient_id, total in cls.expected_totals(
+                user_ids
+        ).iterator(chunk_size=SHOPPING_LIST_BATCH_SIZE):
+            stored = actual.pop((user_id, ingredient_id), None)
+            if stored != total:
+                mismatches.append((user_id, ingredient_id, total, stored))
+        mismatches.extend(
+            (user_id, ingredient_id, None, total)
+            for (user_id, ingredient_id), total in actual.items()
+        )
+        return mismatches
+
+
+class ShortLink(models.Model):
+    """Модель, описывающая короткие ссылки на рецепты."""
+
+    recipe = models.OneToOneField(
+        Recipe,
+        on_delete=models.CASCADE,
+        related_name='short_link',
+        verbose_name='Рецепт'
+    )
+    code = models.CharField(
+        max_length=LENGTH_SHORT_LINK_CODE,
+        unique=True,
+        verbose_name='Код'
+    )
+
+    class Meta:
+        verbose_name = 'Короткая ссылка'
+        verbose_name_plural = 'Короткие ссылки'
+        ordering = ('recipe',)
+
+    def __str__(self):
+        return f'{self.code} -> {self.recipe_id}'
+
+    @staticmethod
+    def encode(number):
+        """Кодирование числа в base62."""
+        base = len(SHORT_LINK_ALPHABET)
+        code = ''
+        while True:
+            number, remainder = divmod(number, base)
+            code = SHORT_LINK_ALPHABET[remainder] + code
+            if not number:
+                return code
+
+    @classmethod
+    def for_recipe(cls, recipe):
+        """
+        Возвращает короткую ссылку рецепта, создавая ее при необходимости.
+        Код однозначно определяется первичным ключом рецепта.
+        """
+        short_link, _ = cls.objects.get_or_create(
+            recipe=recipe,
+            defaults={'code': cls.encode(recipe.pk)}
+        )
+        return short_link
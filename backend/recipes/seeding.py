@@ -0,0 +1,292 @@
+import csv
+import random
+from io import BytesIO, StringIO
+from itertools import islice
+
+from django.contrib.auth.hashers import make_password
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connection
+from django.db.models import Max
+from PIL import Image
+
+from core.counters import reconcile_counters
+from core.images import create_derivatives
+from recipes.constants import (MAX_COOKING_TIME, MAX_INGRDEINTS_AMOUNT,
+                               MIN_COOKING_TIME, MIN_INGRDEINTS_AMOUNT,
+                               SEED_BATCH_SIZE, SEED_IMAGE_NAME,
+                               SEED_INGREDIENTS_PER_RECIPE,
+                               SEED_TAGS_PER_RECIPE)
+from recipes.models import (Favorite, Ingredient, IngredientsAmountInRecipe,
+                            MeasurementUnit, Recipe, ShoppingCart,
+                            ShoppingListIngredient, Tag)
+from users.models import Follow, User
+
+DISHES = (
+    'Борщ', 'Суп', 'Салат', 'Плов', 'Рагу', 'Омлет', 'Пирог', 'Каша',
+    'Запеканка', 'Котлеты', 'Блины', 'Паста', 'Ризотто', 'Гуляш', 'Сырники',
+)
+QUALIFIERS = (
+    'по-домашнему', 'на скорую руку', 'к празднику', 'по-летнему',
+    'с перцем', 'от шефа', 'по-деревенски', 'из печи', 'на ужин',
+    'для всей семьи', 'по-бабушкиному', 'с зеленью',
+)
+WORDS = (
+    'нарезать', 'обжарить', 'добавить', 'тушить', 'посолить', 'перемешать',
+    'запечь', 'отварить', 'подавать', 'горячим', 'лук', 'морковь',
+    'картофель', 'сметана', 'зелень', 'масло', 'минут', 'на', 'медленном',
+    'огне', 'до', 'готовности', 'с', 'чесноком', 'и', 'перцем',
+)
+FIRST_NAMES = ('Анна', 'Иван', 'Мария', 'Петр', 'Ольга', 'Сергей', 'Елена')
+LAST_NAMES = ('Иванова', 'Петров', 'Смирнова', 'Кузнецов', 'Попова')
+UNITS = ('г', 'кг', 'мл', 'шт.', 'ст. л.', 'ч. л.', 'по вкусу')
+DEFAULT_TAGS = (
+    ('Завтрак', 'breakfast'),
+    ('Обед', 'lunch'),
+    ('Ужин', 'dinner'),
+)
+
+
+class SeedingError(Exception):
+    """Данные с таким seed уже созданы."""
+
+
+def batched(iterable, size=SEED_BATCH_SIZE):
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+class FoodgramSeeder:
+    """
+    Детерминированный генератор данных: при одном и том же seed
+    создаются одни и те же пользователи, рецепты и связи.
+    Ограничения моделей соблюдаются: пары в избранном, списке покупок
+    и подписках не повторяются, на себя пользователи не подписываются,
+    количества и время готовки лежат в допустимых пределах.
+    """
+
+    def __init__(self, seed=0, batch_size=SEED_BATCH_SIZE, stdout=None):
+        self.seed = seed
+        self.random = random.Random(seed)
+        self.batch_size = batch_size
+        self.stdout = stdout
+
+    def log(self, message):
+        if self.stdout is not None:
+            self.stdout.write(message)
+
+    def _new_ids(self, model, create):
+        """
+        Создание строк и получение их id: id возрастают, поэтому новые
+        строки - это строки с id больше прежнего максимума.
+        """
+        last_id = model.objects.aggregate(Max('id'))['id__max'] or 0
+        create()
+        return list(model.objects.filter(
+            id__gt=last_id
+        ).order_by('id').values_list('id', flat=True))
+
+    def _bulk_create(self, model, objects):
+        """Вставка пачками: COPY в PostgreSQL, bulk_create в остальных."""
+        for batch in batched(objects, self.batch_size):
+            if connection.vendor == 'postgresql':
+                self._copy(model, batch)
+            else:
+                model.objects.bulk_create(batch)
+
+    def _copy(self, model, objects):
+        """
+        COPY пачки объектов; значения полей готовятся так же,
+        как при bulk_create (pre_save заполняет auto_now_add).
+        """
+        fields = [
+            field for field in model._meta.concrete_fields
+            if not field.primary_key
+        ]
+        buffer = StringIO()
+        # Строки в кавычках, пустое поле без кавычек - NULL.
+        writer = csv.writer(buffer, quoting=csv.QUOTE_NONNUMERIC)
+        writer.writerows(
+            [
+                field.get_db_prep_save(field.pre_save(obj, True), connection)
+                for field in fields
+            ] for obj in objects
+        )
+        buffer.seek(0)
+        quote_name = connection.ops.quote_name
+        columns = ', '.join(quote_name(field.column) for field in fields)
+        with connection.cursor() as cursor:
+            cursor.copy_expert(
+                f'COPY {quote_name(model._meta.db_table)} ({columns}) '
+                f'FROM STDIN WITH (FORMAT csv)',
+                buffer
+            )
+
+    def image(self):
+        """
+        Одно изображение с уменьшенными копиями на все рецепты,
+        файлы записываются один раз.
+        """
+        if not default_storage.exists(SEED_IMAGE_NAME):
+            buffer = BytesIO()
+            Image.new('RGB', (64, 64), (230, 160, 60)).save(buffer, 'JPEG')
+            default_storage.save(
+                SEED_IMAGE_NAME, ContentFile(buffer.getvalue())
+            )
+        create_derivatives(SEED_IMAGE_NAME)
+        return SEED_IMAGE_NAME
+
+    def tags(self):
+        if not Tag.objects.exists():
+            Tag.objects.bulk_create(
+                Tag(name=name, slug=slug) for name, slug in DEFAULT_TAGS
+            )
+        return list(Tag.objects.values_list('id', flat=True))
+
+    def ingredients(self, count):
+        """Ингредиенты каталога; недостающие до count создаются."""
+        missing = count - Ingredient.objects.count()
+        if missing > 0:
+            units = list(MeasurementUnit.ids_by_abbreviation(UNITS).values())
+            self._bulk_create(Ingredient, (
+                Ingredient(
+                    name=f'Ингредиент {self.seed}-{number}',
+                    measurement_unit_id=self.random.choice(units)
+                ) for number in range(missing)
+            ))
+        return list(Ingredient.objects.values_list('id', flat=True))
+
+    def users(self, count):
+        if User.objects.filter(
+                username__startswith=f'seed{self.seed}_'
+        ).exists():
+            raise SeedingError(
+                f'Пользователи с seed {self.seed} уже существуют.'
+            )
+        password = make_password(f'seed-{self.seed}')
+        return self._new_ids(User, lambda: self._bulk_create(User, (
+            User(
+                username=f'seed{self.seed}_{number}',
+                email=f'seed{self.seed}_{number}@example.com',
+                first_name=self.random.choice(FIRST_NAMES),
+                last_name=self.random.choice(LAST_NAMES),
+                password=password,
+            ) for number in range(count)
+        )))
+
+    def _text(self, words):
+        return ' '.join(self.random.choices(WORDS, k=words)).capitalize()
+
+    def recipes(self, count, author_ids, ingredient_ids, tag_ids,
+                ingredients_per_recipe=SEED_INGREDIENTS_PER_RECIPE):
+        image = self.image()
+        recipe_ids = self._new_ids(Recipe, lambda: self._bulk_create(
+            Recipe, (
+                Recipe(
+                    author_id=self.random.choice(author_ids),
+                    name=(f'{self.random.choice(DISHES)} '
+                          f'{self.random.choice(QUALIFIERS)}'),
+                    text=self._text(self.random.randint(20, 60)),
+                    image=image,
+                    cooking_time=self.random.randint(
+                        MIN_COOKING_TIME, MAX_COOKING_TIME
+                    ),
+                ) for _ in range(count)
+            )
+        ))
+        low, high = ingredients_per_recipe
+        self._bulk_create(IngredientsAmountInRecipe, (
+            IngredientsAmountInRecipe(
+                recipe_id=recipe_id,
+                ingredients_id=ingredient_id,
+                amount=self.random.randint(
+                    MIN_INGRDEINTS_AMOUNT, min(MAX_INGRDEINTS_AMOUNT, 1000)
+                )
+            )
+            for recipe_id in recipe_ids
+            for ingredient_id in self.random.sample(
+                ingredient_ids,
+                min(self.random.randint(low, high), len(ingredient_ids))
+            )
+        ))
+        low, high = SEED_TAGS_PER_RECIPE
+        self._bulk_create(Recipe.tags.through, (
+            Recipe.tags.through(recipe_id=recipe_id, tag_id=tag_id)
+            for recipe_id in recipe_ids
+            for tag_id in self.random.sample(
+                tag_ids, min(self.random.randint(low, high), len(tag_ids))
+            )
+        ))
+        return recipe_ids
+
+    def _pairs(self, total, owner_ids, target_ids, exclude_self=False):
+        """
+        Пары (владелец, цель) без повторов: total делится
+        между владельцами, у каждого - разные цели.
+        """
+        if not owner_ids:
+            return
+        share, remainder = divmod(total, len(owner_ids))
+        for position, owner_id in enumerate(owner_ids):
+            count = share + (position < remainder)
+            limit = len(target_ids) - (1 if exclude_self else 0)
+            targets = self.random.sample(
+                target_ids, min(count + exclude_self, len(target_ids))
+            )
+            targets = [
+                target_id for target_id in targets
+                if not (exclude_self and target_id == owner_id)
+            ][:min(count, limit)]
+            for target_id in targets:
+                yield owner_id, target_id
+
+    def relations(self, user_ids, recipe_ids, favorites, carts, follows):
+        self._bulk_create(Favorite, (
+            Favorite(user_id=user_id, recipe_id=recipe_id)
+            for user_id, recipe_id in self._pairs(
+                favorites, user_ids, recipe_ids
+            )
+        ))
+        self._bulk_create(ShoppingCart, (
+            ShoppingCart(user_id=user_id, recipe_id=recipe_id)
+            for user_id, recipe_id in self._pairs(carts, user_ids, recipe_ids)
+        ))
+        self._bulk_create(Follow, (
+            Follow(user_id=user_id, following_id=following_id)
+            for user_id, following_id in self._pairs(
+                follows, user_ids, user_ids, exclude_self=True
+            )
+        ))
+
+    def denormalize(self, user_ids):
+        """Пересчет счетчиков и итогов списков покупок."""
+        Recipe.reconcile_counters()
+        User.reconcile_counters()
+        reconcile_counters(Ingredient, {
+            'usage_count': (IngredientsAmountInRecipe, 'ingredients'),
+        })
+        ShoppingListIngredient.rebuild(user_ids)
+
+    def run(self, users, recipes, follows=0, favorites=0, carts=0,
+            ingredients=0,
+            ingredients_per_recipe=SEED_INGREDIENTS_PER_RECIPE):
+        """Генерация всех данных; возвращает id пользователей и рецептов."""
+        tag_ids = self.tags()
+        ingredient_ids = self.ingredients(ingredients)
+        if len(ingredient_ids) < max(ingredients_per_recipe):
+            ingredient_ids = self.ingredients(max(ingredients_per_recipe))
+        self.log(f'Ингредиентов: {len(ingredient_ids)}')
+        user_ids = self.users(users)
+        self.log(f'Пользователей: {len(user_ids)}')
+        recipe_ids = self.recipes(
+            recipes, user_ids, ingredient_ids, tag_ids, ingredients_per_recipe
+        ) if user_ids else []
+        self.log(f'Рецептов: {len(recipe_ids)}')
+        self.relations(user_ids, recipe_ids, favorites, carts, follows)
+        self.denormalize(user_ids)
+        self.log('Счетчики и списки покупок пересчитаны.')
+        return user_ids, recipe_ids
@@ -0,0 +1,68 @@
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from core.counters import update_counter
+from recipes.models import (Ingredient, Recipe, ShoppingCart,
+                            ShoppingListIngredient)
+from recipes.tasks import enqueue_image_processing
+from users.models import User
+
+
+@receiver(post_save, sender=Recipe)
+def process_recipe_image(sender, instance, update_fields, **kwargs):
+    """Обработка загруженного изображения рецепта в фоне."""
+    enqueue_image_processing((instance,), 'image', update_fields)
+
+
+@receiver(pre_delete, sender=Recipe)
+def remember_recipe_shopping_lists(sender, instance, **kwargs):
+    """
+    Списки покупок с удаляемым рецептом и его ингредиенты
+    запоминаются до каскадного удаления связей.
+    """
+    instance.shopping_list_user_ids = list(
+        ShoppingCart.objects.filter(
+            recipe=instance
+        ).values_list('user_id', flat=True)
+    )
+    instance.shopping_list_amounts = (
+        ShoppingListIngredient.recipe_amounts(instance)
+        if instance.shopping_list_user_ids else {}
+    )
+
+
+@receiver(post_delete, sender=Recipe)
+def update_recipe_shopping_lists(sender, instance, **kwargs):
+    """
+    Учет удаления рецепта в итогах списков покупок при любом
+    удалении: через API, в админ-зоне или каскадом.
+    """
+    ShoppingListIngredient.apply_delta(
+        instance.shopping_list_user_ids,
+        {
+            ingredient_id: -amount for ingredient_id, amount
+            in instance.shopping_list_amounts.items()
+        }
+    )
+
+
+@receiver(post_delete, sender=Recipe)
+def update_author_recipes_count(sender, instance, **kwargs):
+    """Счетчик рецептов автора при любом удалении рецепта."""
+    update_counter(
+        User.objects.filter(id=instance.author_id), 'recipes_count', -1
+    )
+
+
+@receiver(pre_delete, sender=Recipe)
+def remember_recipe_ingredients(sender, instance, **kwargs):
+    """Ингредиенты удаляемого рецепта до каскадного удаления связей."""
+    instance.ingredient_ids = list(
+        instance.ingredients.values_list('id', flat=True)
+    )
+
+
+@receiver(post_delete, sender=Recipe)
+def update_ingredients_usage(sender, instance, **kwargs):
+    """Счетчик использований ингредиентов при любом удалении рецепта."""
+    Ingredient.update_usage(instance.ingredient_ids, -1)
@@ -0,0 +1,65 @@
+from django.apps import apps
+from django.utils import timezone
+
+from api.cache import bump_recipes_generation
+from core.images import create_derivatives, derivative_names, normalize_image
+from jobs.models import Job
+from jobs.registry import task
+
+PROCESS_IMAGE_TASK = 'images.process'
+
+
+@task(PROCESS_IMAGE_TASK)
+def process_image(model, pk, field, name):
+    """
+    Нормализация загруженного изображения (поворот по EXIF,
+    ограничение размеров, перекодирование) и создание уменьшенных копий.
+    Если изображение уже заменено или удалено, задача ничего не делает.
+    """
+    model = apps.get_model(model)
+    instance = model.objects.filter(pk=pk).first()
+    field_file = getattr(instance, field, None)
+    if not field_file or field_file.name != name:
+        return
+    storage = field_file.storage
+    with storage.open(name, 'rb') as file:
+        normalized = normalize_image(file)
+    new_name = storage.save(
+        field_file.field.generate_filename(instance, normalized.name),
+        normalized
+    )
+    create_derivatives(new_name, storage)
+    updated = model.objects.filter(pk=pk, **{field: name}).update(
+        **{field: new_name, 'updated_at': timezone.now()}
+    )
+    if not updated:
+        for path in (new_name, *derivative_names(new_name).values()):
+            storage.delete(path)
+        return
+    storage.delete(name)
+    bump_recipes_generation()
+
+
+def enqueue_image_processing(instances, field, update_fields=None):
+    """
+    Постановка в очередь обработки изображений, у которых
+    еще нет уменьшенных копий.
+    """
+    if update_fields is not None and field not in update_fields:
+        return
+    payloads = []
+    for instance in instances:
+        field_file = getattr(instance, field)
+        if not field_file:
+            continue
+        names = derivative_names(field_file.name)
+        if field_file.storage.exists(next(iter(names.values()))):
+            continue
+        payloads.append({
+            'model': instance._meta.label,
+            'pk': instance.pk,
+            'field': field,
+            'name': field_file.name,
+        })
+    if payloads:
+        Job.enqueue_many(PROCESS_IMAGE_TASK, payloads)
@@ -0,0 +1,70 @@
+import json
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase, override_settings
+
+from recipes.management.commands.benchmark_endpoints import METRICS, VOLUMES
+
+
+@override_settings(SERVER_TIMING_SAMPLE_RATE=0)
+class BenchmarkEndpointsTest(TestCase):
+    """Команда benchmark_endpoints на небольшом объеме данных."""
+
+    volumes = {
+        'users': 3, 'recipes': 15, 'ingredients': 10,
+        'ingredients_per_recipe': 3, 'favorites': 5, 'carts': 5,
+        'follows': 2,
+    }
+
+    def test_small_dataset(self):
+        volumes = self.volumes
+        with tempfile.TemporaryDirectory() as directory:
+            output = Path(directory) / 'results.json'
+            call_command(
+                'benchmark_endpoints', repeat=1, current_db=True,
+                no_budgets=True, output=str(output), stdout=StringIO(),
+                **volumes
+            )
+            results = json.loads(output.read_text(encoding='utf-8'))
+        self.assertEqual(set(results['volumes']), set(VOLUMES))
+        self.assertEqual(results['volumes'], volumes)
+        self.assertIn('recipes-list', results['endpoints'])
+        for name, result in results['endpoints'].items():
+            with self.subTest(endpoint=name):
+                self.assertEqual(set(result), set(METRICS))
+                self.assertGreater(result['queries'], 0)
+
+    def test_exceeded_budget(self):
+        with tempfile.TemporaryDirectory() as directory:
+            budgets = Path(directory) / 'budgets.json'
+            budgets.write_text(json.dumps({
+                'volumes': self.volumes,
+                'endpoints': {'recipes-list': {'queries': 0}},
+            }), encoding='utf-8')
+            with self.assertRaisesMessage(CommandError, 'recipes-list'):
+                call_command(
+                    'benchmark_endpoints', repeat=1, current_db=True,
+                    budgets=str(budgets), stdout=StringIO()
+                )
+
+    def test_timings_are_opt_in(self):
+        with tempfile.TemporaryDirectory() as directory:
+            budgets = Path(directory) / 'budgets.json'
+            budgets.write_text(json.dumps({
+                'volumes': self.volumes,
+                'endpoints': {'recipes-list': {'milliseconds': 0}},
+            }), encoding='utf-8')
+            call_command(
+                'benchmark_endpoints', repeat=1, current_db=True,
+                budgets=str(budgets), stdout=StringIO()
+            )
+            with self.assertRaises(CommandError):
+                call_command(
+                    'benchmark_endpoints', repeat=1, current_db=True,
+                    budgets=str(budgets), check_timings=True, seed=1,
+                    stdout=StringIO()
+                )
@@ -0,0 +1,118 @@
+from io import StringIO
+
+from django.contrib.admin.sites import site
+from django.core.management import call_command
+from django.db.models import F
+from django.test import RequestFactory
+
+from api.tests.base import SeededAPITestCase
+from recipes.models import (Favorite, Ingredient, IngredientsAmountInRecipe,
+                            Recipe, ShoppingCart)
+from users.models import Follow, User
+
+
+class CountersOutsideAPITest(SeededAPITestCase):
+    """Счетчики при изменениях в админ-зоне и каскадных удалениях."""
+
+    favorites = 30
+    carts = 30
+    follows = 10
+
+    def assertCountersConsistent(self):
+        self.assertEqual(
+            Recipe.reconcile_counters(),
+            {'favorites_count': 0, 'in_carts_count': 0}
+        )
+        self.assertEqual(
+            User.reconcile_counters(),
+            {'recipes_count': 0, 'followers_count': 0}
+        )
+        self.assertEqual(Ingredient.reconcile_counters(), {'usage_count': 0})
+
+    def admin_request(self):
+        request = RequestFactory().post('/')
+        request.user = User.objects.create_superuser(
+            username='admin', email='admin@example.com', password='admin'
+        )
+        return request
+
+    def test_user_cascade(self):
+        user = User.objects.filter(
+            favorite__isnull=False, shoppingcart__isnull=False,
+            subscribers__isnull=False
+        ).first() or User.objects.filter(favorite__isnull=False).first()
+        user.delete()
+        self.assertCountersConsistent()
+
+    def test_recipe_delete(self):
+        Recipe.objects.filter(favorite__isnull=False).first().delete()
+        self.assertCountersConsistent()
+
+    def test_admin_add_and_delete(self):
+        request = self.admin_request()
+        recipe = Recipe.objects.exclude(
+            favorite__user=self.user
+        ).exclude(shoppingcart__user=self.user).first()
+        author = User.objects.exclude(pk=self.user.pk).exclude(
+            subscriptions__user=self.user
+        ).first()
+        for model, fields in (
+            (Favorite, {'user': self.user, 'recipe': recipe}),
+            (ShoppingCart, {'user': self.user, 'recipe': recipe}),
+            (Follow, {'user': self.user, 'following': author}),
+        ):
+            with self.subTest(model=model.__name__):
+                model_admin = site._registry[model]
+                obj = model(**fields)
+                model_admin.save_model(request, obj, None, False)
+                self.assertCountersConsistent()
+                model_admin.delete_model(request, obj)
+                self.assertCountersConsistent()
+                model_admin.delete_queryset(
+                    request, model.objects.filter(
+                        pk__in=model.objects.values('pk')[:3]
+                    )
+                )
+                self.assertCountersConsistent()
+
+    def test_admin_recipe(self):
+        request = self.admin_request()
+        model_admin = site._registry[Recipe]
+        recipe = Recipe.objects.first()
+        recipe.author = request.user
+        model_admin.save_model(request, recipe, None, True)
+        self.assertCountersConsistent()
+        model_admin.delete_model(request, recipe)
+        self.assertCountersConsistent()
+
+    def test_admin_recipe_ingredients(self):
+        request = self.admin_request()
+        model_admin = site._registry[IngredientsAmountInRecipe]
+        recipe = Recipe.objects.first()
+        ingredient = Ingredient.objects.exclude(recipes=recipe).first()
+        amount = IngredientsAmountInRecipe(
+            recipe=recipe, ingredients=ingredient, amount=5
+        )
+        model_admin.save_model(request, amount, None, False)
+        self.assertCountersConsistent()
+        model_admin.delete_model(request, amount)
+        self.assertCountersConsistent()
+
+    def test_ingredient_save_keeps_usage(self):
+        ingredient = Ingredient.objects.first()
+        Ingredient.objects.filter(pk=ingredient.pk).update(
+            usage_count=F('usage_count') + 1
+        )
+        ingredient.name = 'Новый ингредиент'
+        ingredient.save()
+        self.assertEqual(
+            Ingredient.objects.get(pk=ingredient.pk).usage_count,
+            ingredient.usage_count + 1
+        )
+
+    def test_reconcile_command(self):
+        Ingredient.objects.update(usage_count=0)
+        stdout = StringIO()
+        call_command('reconcile_counters', stdout=stdout)
+        self.assertIn('usage_count', stdout.getvalue())
+        self.assertCountersConsistent()
@@ -0,0 +1,81 @@
+import json
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from recipes.models import Ingredient, MeasurementUnit
+
+
+class IngredientUpsertTest(TestCase):
+    """Повторная загрузка ингредиентов ничего не меняет."""
+
+    def setUp(self):
+        self.units = MeasurementUnit.ids_by_abbreviation(('г', 'шт'))
+
+    def state(self):
+        return set(Ingredient.objects.values_list(
+            'name', 'measurement_unit_id', 'usage_count'
+        ))
+
+    def test_upsert_idempotent(self):
+        rows = {'Мука': self.units['г'], 'Яйцо': self.units['шт']}
+        self.assertEqual(Ingredient.upsert(rows), (2, 0))
+        state = self.state()
+        self.assertEqual(Ingredient.upsert(rows), (0, 0))
+        self.assertEqual(self.state(), state)
+
+    def test_upsert_updates_unit(self):
+        Ingredient.upsert({'Мука': self.units['г']})
+        Ingredient.objects.update(usage_count=3)
+        self.assertEqual(
+            Ingredient.upsert({
+                'Мука': self.units['шт'], 'Сахар': self.units['г']
+            }),
+            (1, 1)
+        )
+        self.assertEqual(self.state(), {
+            ('Мука', self.units['шт'], 3),
+            ('Сахар', self.units['г'], 0),
+        })
+
+
+class LoadIngredientsCommandTest(TestCase):
+    """Команда load_ingredients для CSV и JSON."""
+
+    def load(self, path):
+        stdout = StringIO()
+        call_command('load_ingredients', str(path), stdout=stdout)
+        return stdout.getvalue()
+
+    def test_reload(self):
+        items = [
+            {'name': 'Мука', 'measurement_unit': 'г'},
+            {'name': 'Яйцо', 'measurement_unit': 'шт'},
+            {'name': '', 'measurement_unit': 'г'},
+        ]
+        with tempfile.TemporaryDirectory() as directory:
+            json_path = Path(directory) / 'ingredients.json'
+            json_path.write_text(
+                json.dumps(items, ensure_ascii=False), encoding='utf-8'
+            )
+            csv_path = Path(directory) / 'ingredients.csv'
+            csv_path.write_text(
+                'name,measurement_unit\nМука,г\nЯйцо,шт\n', encoding='utf-8'
+            )
+            first = self.load(json_path)
+            state = set(Ingredient.objects.values_list(
+                'name', 'measurement_unit__abbreviation'
+            ))
+            second = self.load(csv_path)
+        self.assertIn('добавлено: 2, обновлено: 0, пропущено: 1', first)
+        self.assertIn('добавлено: 0, обновлено: 0, пропущено: 0', second)
+        self.assertEqual(state, {('Мука', 'г'), ('Яйцо', 'шт')})
+        self.assertEqual(
+            set(Ingredient.objects.values_list(
+                'name', 'measurement_unit__abbreviation'
+            )),
+            state
+        )
@@ -0,0 +1,67 @@
+from django.contrib.admin.sites import site
+from django.test import RequestFactory
+
+from api.tests.base import SeededAPITestCase
+from recipes.models import (IngredientsAmountInRecipe, Recipe, ShoppingCart,
+                            ShoppingListIngredient)
+from users.models import User
+
+
+class ShoppingListTotalsTest(SeededAPITestCase):
+    """Итоги списков покупок при удалении в обход API."""
+
+    carts = 40
+
+    def assertConsistent(self):
+        self.assertEqual(ShoppingListIngredient.check_consistency(), [])
+
+    def cart_recipe(self):
+        return Recipe.objects.filter(shoppingcart__isnull=False).first()
+
+    def test_recipe_delete(self):
+        self.cart_recipe().delete()
+        self.assertConsistent()
+
+    def test_recipe_queryset_delete(self):
+        Recipe.objects.filter(
+            pk__in=ShoppingCart.objects.values('recipe')[:3]
+        ).delete()
+        self.assertConsistent()
+
+    def test_author_cascade(self):
+        User.objects.filter(id=self.cart_recipe().author_id).delete()
+        self.assertConsistent()
+
+    def test_api_delete(self):
+        recipe = self.cart_recipe()
+        self.client.force_authenticate(recipe.author)
+        response = self.client.delete(f'/api/recipes/{recipe.id}/')
+        self.assertEqual(response.status_code, 204)
+        self.assertConsistent()
+
+    def admin_request(self):
+        request = RequestFactory().post('/')
+        request.user = User.objects.create_superuser(
+            username='admin', email='admin@example.com', password='admin'
+        )
+        return request
+
+    def test_admin_cart_delete(self):
+        model_admin = site._registry[ShoppingCart]
+        request = self.admin_request()
+        model_admin.delete_model(request, ShoppingCart.objects.first())
+        model_admin.delete_queryset(
+            request, ShoppingCart.objects.filter(
+                pk__in=ShoppingCart.objects.values('pk')[:5]
+            )
+        )
+        self.assertConsistent()
+
+    def test_admin_amount_change(self):
+        model_admin = site._registry[IngredientsAmountInRecipe]
+        amount = IngredientsAmountInRecipe.objects.filter(
+            recipe=self.cart_recipe()
+        ).first()
+        amount.amount += 10
+        model_admin.save_model(self.admin_request(), amount, None, True)
+        self.assertConsistent()
@@ -1,10 +1,11 @@
 from django.contrib import admin
 
+from recipes.mixins import CounterAdminMixin, ScalableAdminMixin
 from users.models import Follow, User
 
 
 @admin.register(User)
-class UserAdmin(admin.ModelAdmin):
+class UserAdmin(ScalableAdminMixin, admin.ModelAdmin):
     """Класс для настройки админ-зоны модели User."""
 
     list_display = (
@@ -15,21 +16,36 @@ class UserAdmin(admin.ModelAdmin):
         'last_name',
         'avatar',
         'role',
-        'admin'
+        'admin',
+        'recipes_count',
+        'followers_count'
     )
-    search_fields = ('username', 'email')
-    list_filter = ('username', 'email',)
+    search_fields = ('^username', '^email')
+    list_filter = ('role', 'is_staff')
+    filter_horizontal = ('groups', 'user_permissions')
     empty_value_display = '-пусто-'
 
+    def formfield_for_manytomany(self, db_field, request=None, **kwargs):
+        """Права загружаются вместе с типами содержимого одним запросом."""
+        if db_field.name == 'user_permissions':
+            queryset = kwargs.get(
+                'queryset', db_field.remote_field.model.objects
+            )
+            kwargs['queryset'] = queryset.select_related('content_type')
+        return super().formfield_for_manytomany(db_field, request, **kwargs)
+
 
 @admin.register(Follow)
-class FollowAdmin(admin.ModelAdmin):
+class FollowAdmin(CounterAdminMixin, ScalableAdminMixin, admin.ModelAdmin):
     """Класс для настройки админ-зоны модели Follow."""
 
+    counter_owners = {'following_id': User}
+
     list_display = (
         'user',
         'following'
     )
-    search_fields = ('user', 'following')
-    list_filter = ('user', 'following')
+    list_select_related = ('user', 'following')
+    autocomplete_fields = ('user', 'following')
+    search_fields = ('^user__username', '^following__username')
     empty_value_display = '-пусто-'
@@ -0,0 +1,60 @@
+from time import perf_counter
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIRequestFactory
+
+from core.authentication import SignedTokenAuthentication, issue_signed_token
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает накладные расходы аутентификации одного запроса '
+        'для токенов из БД и подписанных токенов.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--requests', type=int, default=1000,
+            help='Количество запросов для каждого способа.'
+        )
+        parser.add_argument(
+            '--email', help='Email пользователя; по умолчанию первый.'
+        )
+
+    def _measure(self, authentication, key, requests):
+        factory = APIRequestFactory()
+        request = factory.get('/', HTTP_AUTHORIZATION=f'Token {key}')
+        with CaptureQueriesContext(connection) as queries:
+            started = perf_counter()
+            for _ in range(requests):
+                authentication.authenticate(request)
+            elapsed = perf_counter() - started
+        return elapsed / requests * 1e6, len(queries) / requests
+
+    def handle(self, *args, requests=1000, email=None, **options):
+        users = User.objects.filter(is_active=True)
+        user = (users.filter(email=email) if email else users).first()
+        if user is None:
+            raise CommandError('Нет подходящего пользователя.')
+        token, _ = Token.objects.get_or_create(user=user)
+        cases = (
+            ('TokenAuthentication', TokenAuthentication(), token.key),
+            (
+                'SignedTokenAuthentication',
+                SignedTokenAuthentication(),
+                issue_signed_token(user)
+            ),
+        )
+        for name, authentication, key in cases:
+            microseconds, queries = self._measure(
+                authentication, key, requests
+            )
+            self.stdout.write(
+                f'{name}: {microseconds:.1f} мкс/запрос, '
+                f'{queries:.1f} запросов к БД/запрос'
+            )
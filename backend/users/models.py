@@ -1,14 +1,19 @@
 from django.contrib.auth.models import AbstractUser
-from django.db import models
+from django.db import models, transaction
 from django.db.models import CheckConstraint, F, Q
 
+from core.counters import (CounterFieldsMixin, reconcile_counters,
+                           update_counter)
 from users.constants import USERNAME_LENGTH
 from users.validators import UsernameValidator
 
 
-class User (AbstractUser):
+class User (CounterFieldsMixin, AbstractUser):
     """Расширение стандартной модели User."""
 
+    # Версия токенов тоже меняется только атомарным UPDATE.
+    counter_fields = ('recipes_count', 'followers_count', 'token_version')
+
     class Roles(models.TextChoices):
         USER = 'user'
         ADMIN = 'admin'
@@ -41,6 +46,25 @@ class User (AbstractUser):
         default=Roles.USER,
         verbose_name='Права пользователя'
     )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Дата изменения'
+    )
+    token_version = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Версия токенов'
+    )
+    recipes_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Количество рецептов'
+    )
+    followers_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Количество подписчиков'
+    )
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = ('username', 'password', 'first_name', 'last_name')
 
@@ -60,6 +84,33 @@ class User (AbstractUser):
         return (self.role == self.Roles.ADMIN
                 or self.is_staff or self.is_superuser)
 
+    def revoke_tokens(self):
+        """
+        Отзыв всех выданных пользователю токенов:
+        подписанные токены старой версии перестают приниматься,
+        токены из БД удаляются.
+        """
+        from rest_framework.authtoken.models import Token
+
+        from core.authentication import cache_token_state
+
+        User.objects.filter(pk=self.pk).update(
+            token_version=F('token_version') + 1
+        )
+        Token.objects.filter(user=self).delete()
+        self.refresh_from_db(fields=('token_version',))
+        cache_token_state(self)
+
+    @classmethod
+    def reconcile_counters(cls, pks=None):
+        """Исправление расхождений счетчиков рецептов и подписчиков."""
+        from recipes.models import Recipe
+
+        return reconcile_counters(cls, {
+            'recipes_count': (Recipe, 'author'),
+            'followers_count': (Follow, 'following'),
+        }, pks)
+
 
 class Follow(models.Model):
     """
@@ -99,3 +150,29 @@ class Follow(models.Model):
 
     def __str__(self):
         return f'{self.user} following {self.following}'
+
+    @classmethod
+    @transaction.atomic
+    def subscribe(cls, user, following):
+        """Подписка с увеличением счетчика подписчиков автора."""
+        subscription = cls.objects.create(user=user, following=following)
+        update_counter(
+            User.objects.filter(id=following.id), 'followers_count', 1
+        )
+        following.refresh_from_db(fields=('followers_count',))
+        return subscription
+
+    @classmethod
+    @transaction.atomic
+    def unsubscribe(cls, user, following):
+        """
+        Отписка одним DELETE с уменьшением счетчика подписчиков.
+        Возвращает False, если подписки не было.
+        """
+        deleted, _ = cls.objects.filter(
+            user=user, following=following
+        ).delete()
+        update_counter(
+            User.objects.filter(id=following.id), 'followers_count', -deleted
+        )
+        return bool(deleted)
@@ -1,15 +1,19 @@
 from rest_framework import serializers
 from rest_framework.response import Response
 
-from core.serializers import Base64ImageField
+from core.images import image_srcset
+from core.serializers import (Base64ImageField, ImageSrcsetField,
+                              TimedRepresentationMixin)
 from recipes.models import Recipe
 from users.models import Follow, User
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(TimedRepresentationMixin,
+                     serializers.ModelSerializer):
     """Класс сериализатора для работы с пользователями."""
 
     avatar = Base64ImageField()
+    avatar_srcset = ImageSrcsetField(source='avatar')
     is_subscribed = serializers.SerializerMethodField()
 
     class Meta:
@@ -21,6 +25,9 @@ class UserSerializer(serializers.ModelSerializer):
             'first_name',
             'last_name',
             'avatar',
+            'avatar_srcset',
+            'recipes_count',
+            'followers_count',
             'is_subscribed'
         )
 
@@ -43,15 +50,19 @@ class UserSerializer(serializers.ModelSerializer):
         на выбранного пользователя.
         """
         user = self.context['request'].user
-        if not user.is_anonymous:
-            return user.subscribers.filter(following=obj).exists()
-        return False
+        if user.is_anonymous:
+            return False
+        if hasattr(obj, 'is_subscribed'):
+            return obj.is_subscribed
+        return user.subscribers.filter(following=obj).exists()
 
 
-class RecipeSerializerForSubscriptions(serializers.ModelSerializer):
+class RecipeSerializerForSubscriptions(TimedRepresentationMixin,
+                                       serializers.ModelSerializer):
     """Класс сериализатора для вывода рецептов в подписках."""
 
     image = Base64ImageField()
+    image_srcset = ImageSrcsetField(source='image')
 
     class Meta:
         model = Recipe
@@ -59,12 +70,14 @@ class RecipeSerializerForSubscriptions(serializers.ModelSerializer):
             'id',
             'name',
             'image',
+            'image_srcset',
             'cooking_time'
         )
         read_only_fields = '__all__',
 
 
-class FollowSerializer(serializers.ModelSerializer):
+class FollowSerializer(TimedRepresentationMixin,
+                       serializers.ModelSerializer):
     """Класс сериализатора для работы с подписками и подписчиками."""
 
     id = serializers.ReadOnlyField(source='following.id')
@@ -73,47 +86,55 @@ class FollowSerializer(serializers.ModelSerializer):
     first_name = serializers.ReadOnlyField(source='following.first_name')
     last_name = serializers.ReadOnlyField(source='following.last_name')
     avatar = serializers.SerializerMethodField()
+    avatar_srcset = serializers.SerializerMethodField()
     recipes = serializers.SerializerMethodField()
-    recipes_count = serializers.SerializerMethodField()
+    recipes_count = serializers.ReadOnlyField(source='following.recipes_count')
+    followers_count = serializers.ReadOnlyField(
+        source='following.followers_count'
+    )
     is_subscribed = serializers.SerializerMethodField()
 
+    @staticmethod
+    def _get_following(obj):
+        """Автор из подписки или из данных создаваемой подписки."""
+        return obj.following if hasattr(obj, 'following') \
+            else obj['following']
+
     def get_avatar(self, obj):
         """Получение ссылки на аватар."""
-        user = obj.following if hasattr(obj, 'following') else obj['following']
+        user = self._get_following(obj)
         return user.avatar.url if user.avatar else None
 
-    def get_recipes_count(self, obj):
-        """
-        Получение количества рецептов,
-        автором которого является выбранный пользователь.
-        """
-        user = obj if hasattr(obj, 'following') else obj['following']
-        return Recipe.objects.filter(author=user.id).count()
+    def get_avatar_srcset(self, obj):
+        """Получение ссылок на аватар и его уменьшенные копии."""
+        return image_srcset(self._get_following(obj).avatar)
 
     def get_recipes(self, obj):
         """
         Получение списка рецептов,
         автором которого является выбранный пользователь.
+        Рецепты берутся из контекста, если вьюсет загрузил их заранее.
         """
-        request = self.context.get('request')
-        limit = request.GET.get('recipes_limit')
-        user = obj if hasattr(obj, 'following') else obj['following']
-        recipes = Recipe.objects.filter(author=user.id)
-        if limit and limit.isdigit():
-            recipes = recipes[:int(limit)]
+        following = self._get_following(obj)
+        recipes_by_author = self.context.get('recipes_by_author')
+        if recipes_by_author is not None:
+            recipes = recipes_by_author.get(following.id, ())
+        else:
+            limit = self.context['request'].GET.get('recipes_limit')
+            recipes = Recipe.objects.filter(author=following)
+            if limit and limit.isdigit():
+                recipes = recipes[:int(limit)]
         return RecipeSerializerForSubscriptions(recipes, many=True).data
 
     def get_is_subscribed(self, obj):
         """
         Проверка, подписан ли текущий авторизованный пользователь
-        на выбранного пользователя.
+        на выбранного пользователя: подписка принадлежит ему самому.
         """
         user = self.context['request'].user
-        following = obj.following if hasattr(obj, 'following') \
-            else obj['following']
-        if not user.is_anonymous:
-            return user.subscribers.filter(following=following).exists()
-        return False
+        follower_id = obj.user_id if hasattr(obj, 'user_id') \
+            else obj['user'].id
+        return not user.is_anonymous and follower_id == user.id
 
     class Meta:
         model = Follow
@@ -124,8 +145,10 @@ class FollowSerializer(serializers.ModelSerializer):
             'first_name',
             'last_name',
             'avatar',
+            'avatar_srcset',
             'recipes',
             'recipes_count',
+            'followers_count',
             'is_subscribed'
         )
 
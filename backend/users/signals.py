@@ -0,0 +1,62 @@
+from django.contrib.auth.signals import user_logged_out
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from core.authentication import forget_token_state
+from core.counters import update_counter
+from recipes.models import Favorite, Recipe, ShoppingCart
+from recipes.tasks import enqueue_image_processing
+from users.models import Follow, User
+
+
+@receiver(user_logged_out)
+def revoke_tokens_on_logout(sender, user, **kwargs):
+    """При выходе из системы выданные пользователю токены отзываются."""
+    if user is not None and user.is_authenticated:
+        user.revoke_tokens()
+
+
+@receiver(post_save, sender=User)
+def process_avatar(sender, instance, update_fields, **kwargs):
+    """Обработка загруженного аватара в фоне."""
+    enqueue_image_processing((instance,), 'avatar', update_fields)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def forget_cached_token_state(sender, instance, **kwargs):
+    """Активность и версия токенов могли измениться - кэш сбрасывается."""
+    forget_token_state(instance.pk)
+
+
+@receiver(pre_delete, sender=User)
+def remember_user_counters(sender, instance, **kwargs):
+    """
+    Рецепты в избранном и списке покупок пользователя и его подписки
+    запоминаются до каскадного удаления связей.
+    """
+    instance.deleted_relations = {
+        'favorites_count': list(Favorite.objects.filter(
+            user=instance
+        ).values_list('recipe_id', flat=True)),
+        'in_carts_count': list(ShoppingCart.objects.filter(
+            user=instance
+        ).values_list('recipe_id', flat=True)),
+        'followers_count': list(Follow.objects.filter(
+            user=instance
+        ).values_list('following_id', flat=True)),
+    }
+
+
+@receiver(post_delete, sender=User)
+def update_user_counters(sender, instance, **kwargs):
+    """Счетчики рецептов и авторов после удаления пользователя."""
+    relations = instance.deleted_relations
+    for field in ('favorites_count', 'in_carts_count'):
+        update_counter(
+            Recipe.objects.filter(id__in=relations[field]), field, -1
+        )
+    update_counter(
+        User.objects.filter(id__in=relations['followers_count']),
+        'followers_count', -1
+    )
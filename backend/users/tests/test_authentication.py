@@ -0,0 +1,97 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from api.tests.base import TEST_CACHES
+from core.authentication import (SIGNED_TOKEN_SEPARATOR, LazyUser,
+                                 SignedTokenAuthentication)
+from users.models import User
+
+PASSWORD = 'Secret-password-1'
+ME_URL = '/api/users/me/'
+
+
+@override_settings(CACHES=TEST_CACHES, SERVER_TIMING_SAMPLE_RATE=0)
+class SignedTokenAuthenticationTest(TestCase):
+    """Подписанные токены, их отзыв и кэш версии токенов."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username='user', email='user@example.com', password=PASSWORD,
+            first_name='Имя', last_name='Фамилия'
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def login(self):
+        response = self.client.post('/api/auth/token/login/', {
+            'email': self.user.email, 'password': PASSWORD
+        })
+        self.assertEqual(response.status_code, 200)
+        token = response.json()['auth_token']
+        self.assertIn(SIGNED_TOKEN_SEPARATOR, token)
+        return token
+
+    def get_me(self, token):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {token}')
+        return self.client.get(ME_URL).status_code
+
+    def test_login(self):
+        self.assertEqual(self.get_me(self.login()), 200)
+
+    def test_tampered_token(self):
+        payload, _, signature = self.login().rpartition(
+            SIGNED_TOKEN_SEPARATOR
+        )
+        tampered = signature.translate(str.maketrans('ab', 'ba')) + 'x'
+        self.assertEqual(
+            self.get_me(f'{payload}{SIGNED_TOKEN_SEPARATOR}{tampered}'), 401
+        )
+
+    def test_logout_revokes_token(self):
+        token = self.login()
+        self.assertEqual(self.get_me(token), 200)
+        self.assertEqual(
+            self.client.post('/api/auth/token/logout/').status_code, 204
+        )
+        self.assertEqual(self.get_me(token), 401)
+
+    def test_set_password_revokes_token(self):
+        token = self.login()
+        self.assertEqual(self.get_me(token), 200)
+        response = self.client.post('/api/users/set_password/', {
+            'current_password': PASSWORD,
+            'new_password': 'Another-password-2',
+        })
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(self.get_me(token), 401)
+
+    def test_inactive_user(self):
+        token = self.login()
+        self.assertEqual(self.get_me(token), 200)
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.get_me(token), 401)
+
+    def test_cached_state_skips_database(self):
+        token = self.login()
+        authentication = SignedTokenAuthentication()
+        authentication.authenticate_credentials(token)
+        with self.assertNumQueries(0):
+            user, _ = authentication.authenticate_credentials(token)
+            self.assertIsInstance(user, LazyUser)
+            self.assertTrue(user.is_authenticated)
+            self.assertEqual(user.pk, self.user.pk)
+        with self.assertNumQueries(1):
+            self.assertEqual(user.email, self.user.email)
+
+    def test_stale_save_keeps_revocation(self):
+        token = self.login()
+        stale = User.objects.get(pk=self.user.pk)
+        self.user.revoke_tokens()
+        stale.first_name = 'Другое имя'
+        stale.save()
+        self.assertEqual(self.get_me(token), 401)
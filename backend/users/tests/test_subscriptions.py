@@ -0,0 +1,71 @@
+from api.tests.base import SeededAPITestCase
+from recipes.models import Recipe
+from users.models import Follow, User
+
+SUBSCRIPTIONS_URL = '/api/users/subscriptions/'
+
+
+class RecipesByAuthorsTest(SeededAPITestCase):
+    """Первые рецепты авторов подписок одним запросом."""
+
+    users = 4
+    recipes = 24
+
+    def setUp(self):
+        super().setUp()
+        self.author_ids = list(
+            User.objects.exclude(pk=self.user.pk).values_list('pk', flat=True)
+        )
+
+    def expected(self, limit=None):
+        expected = {}
+        for author_id in self.author_ids:
+            recipe_ids = list(Recipe.objects.filter(
+                author_id=author_id
+            ).order_by('pub_date', 'id').values_list('pk', flat=True))
+            if recipe_ids:
+                expected[author_id] = recipe_ids[:limit]
+        return expected
+
+    def test_limit_per_author(self):
+        self.assertGreater(max(map(len, self.expected().values())), 2)
+        with self.assertNumQueries(1):
+            recipes_by_author = Recipe.by_authors(self.author_ids, 2)
+        self.assertEqual(
+            {
+                author_id: [recipe.pk for recipe in recipes]
+                for author_id, recipes in recipes_by_author.items()
+            },
+            self.expected(2)
+        )
+
+    def test_without_limit(self):
+        recipes_by_author = Recipe.by_authors(self.author_ids)
+        self.assertEqual(
+            {
+                author_id: sorted(recipe.pk for recipe in recipes)
+                for author_id, recipes in recipes_by_author.items()
+            },
+            {
+                author_id: sorted(recipe_ids)
+                for author_id, recipe_ids in self.expected().items()
+            }
+        )
+
+    def test_subscriptions_recipes_limit(self):
+        Follow.objects.filter(user=self.user).delete()
+        Follow.objects.bulk_create(
+            Follow(user=self.user, following_id=author_id)
+            for author_id in self.author_ids
+        )
+        response = self.client.get(
+            SUBSCRIPTIONS_URL, {'recipes_limit': 1, 'limit': 10}
+        )
+        self.assertEqual(response.status_code, 200)
+        expected = self.expected(1)
+        for author in response.json()['results']:
+            with self.subTest(author=author['id']):
+                self.assertEqual(
+                    [recipe['id'] for recipe in author['recipes']],
+                    expected.get(author['id'], [])
+                )
@@ -1,4 +1,5 @@
 from django.contrib.auth import update_session_auth_hash
+from django.db.models import Exists, OuterRef
 from djoser.views import UserViewSet
 from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
@@ -6,14 +7,18 @@ from rest_framework.response import Response
 from rest_framework.status import (HTTP_201_CREATED, HTTP_204_NO_CONTENT,
                                    HTTP_400_BAD_REQUEST)
 
+from api.cache import bump_recipes_generation
+from core.mixins import ConditionalRetrieveMixin, ReplicaReadMixin
 from core.paginations import ApiPagination
 from core.permissions import IsOwnerAdminOrReadOnlyPermission
+from recipes.models import Recipe
 from users.models import Follow, User
 from users.serializers import (FollowSerializer,
                                UserSerializer, FollowCreateSerializer)
 
 
-class FoodgramUserViewSet(UserViewSet):
+class FoodgramUserViewSet(ReplicaReadMixin, ConditionalRetrieveMixin,
+                          UserViewSet):
     """
     Вьюсет для управления пользователями и его подписками
     - объектами модели User и Follow.
@@ -23,6 +28,25 @@ class FoodgramUserViewSet(UserViewSet):
     serializer_class = UserSerializer
     pagination_class = ApiPagination
     permission_classes = (IsOwnerAdminOrReadOnlyPermission,)
+    replica_actions = ('list',)
+
+    def get_queryset(self):
+        """Пользователи с аннотацией is_subscribed для текущего юзера."""
+        queryset = super().get_queryset()
+        user = self.request.user
+        if user.is_authenticated:
+            queryset = queryset.annotate(is_subscribed=Exists(
+                Follow.objects.filter(
+                    user_id=user.pk, following=OuterRef('pk')
+                )
+            ))
+        return queryset
+
+    def get_version_fields(self):
+        fields = ('updated_at', 'recipes_count', 'followers_count')
+        if self.request.user.is_authenticated:
+            fields += ('is_subscribed',)
+        return fields
 
     @action(
         detail=False,
@@ -61,17 +85,20 @@ class FoodgramUserViewSet(UserViewSet):
             )
             if serializer.is_valid():
                 serializer.save()
-                return Response(
-                    {'avatar': serializer.data['avatar']}
-                )
+                bump_recipes_generation()
+                return Response({
+                    'avatar': serializer.data['avatar'],
+                    'avatar_srcset': serializer.data['avatar_srcset']
+                })
             return Response(
                 {'errors:'},
                 status=HTTP_400_BAD_REQUEST
             )
 
         if request.method == 'DELETE':
-            user.avatar.delete()
-            user.save()
+            user.avatar.delete(save=False)
+            user.save(update_fields=('avatar', 'updated_at'))
+            bump_recipes_generation()
             return Response(
                 {'detail': 'Аватар успешно обновлен!'},
                 status=HTTP_204_NO_CONTENT
@@ -98,7 +125,8 @@ class FoodgramUserViewSet(UserViewSet):
                 status=HTTP_400_BAD_REQUEST
             )
         user.set_password(new_password)
-        user.save()
+        user.save(update_fields=('password',))
+        user.revoke_tokens()
         update_session_auth_hash(request, user)
         return Response(
             {'detail': 'Пароль успешно обновлен!'},
@@ -124,21 +152,18 @@ class FoodgramUserViewSet(UserViewSet):
                 context={'request': request}
             )
             if serializer.is_valid():
-                Follow.objects.create(
-                    user=user,
-                    following=following
+                Follow.subscribe(
+                    user, serializer.validated_data['following']
                 )
                 return Response(serializer.data, status=HTTP_201_CREATED)
             return Response(serializer.errors, status=HTTP_400_BAD_REQUEST)
 
         if request.method == 'DELETE':
-            subscription = user.subscribers.filter(following=following)
-            if not subscription.exists():
+            if not Follow.unsubscribe(user, following):
                 return Response(
                     {'errors': f'Вы не подписаны на {following}!'},
                     status=HTTP_400_BAD_REQUEST
                 )
-            subscription.delete()
             return Response(
                 {'detail': f'Вы успешно отписались от {following}!'},
                 status=HTTP_204_NO_CONTENT
@@ -153,11 +178,21 @@ class FoodgramUserViewSet(UserViewSet):
     def get_subscriptions(self, request):
         """Получает подписки текущего пользователя."""
         user = request.user
-        subscriptions = user.subscribers.all()
+        subscriptions = user.subscribers.select_related(
+            'following'
+        ).order_by('id')
         pages = self.paginate_queryset(subscriptions)
+        limit = request.query_params.get('recipes_limit')
+        recipes_by_author = Recipe.by_authors(
+            [subscription.following_id for subscription in pages],
+            int(limit) if limit and limit.isdigit() else None
+        )
         serializer = FollowSerializer(
             pages,
             many=True,
-            context={'request': request}
+            context={
+                'request': request,
+                'recipes_by_author': recipes_by_author
+            }
         )
         return self.get_paginated_response(serializer.data)